@@ -0,0 +1,214 @@
+"""
+Runs simulations without the GUI, for parameter studies on headless machines:
+
+    python batch_runner.py [--workers N] [--shards N] [--exe PATH] [--profiles DIR]
+                           [--no-cache] [--incremental] [--trajectories] [--refine LEVELS]
+                           [--refine-speed-tol M_S] [--refine-angle-tol RAD] [--no-pool] [--dry-run] MANIFEST ...
+
+Each MANIFEST is either a settings file as the GUI writes it (one run) or a
+JSON object with any of these keys:
+
+    "base":  settings object or settings file every run starts from
+    "runs":  list of settings objects or files, each merged over base
+    "sweep": {"setting": [values] or {"start": a, "stop": b, "step": c}}
+
+A manifest expands to every run crossed with every combination of the sweep
+values. Keys earlier settings menus wrote (see simulation.LEGACY_KEYS) are
+read as the simulator keys they meant. Runs are written to the usual profiles/profile_N directories, so the
+GUI lists them like its own. Runs share a pool of warm simulators, so a
+sweep of small runs doesn't pay a process launch per run; --no-pool, or a
+simulator without --serve, launches one per run instead. Nothing here
+imports PySide6.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import filemanagment
+import simulation
+from result_cache import ResultCache
+from simulation import Refinement
+from simulation_runner import SimulationRun, resolve_exe
+from simulator_pool import SimulatorError, WorkerPool
+
+MANIFEST_KEYS = ("base", "runs", "sweep")
+
+def _settings(entry, directory: Path):
+    """A manifest entry is a settings object or the path of a settings file."""
+    if isinstance(entry, dict):
+        return dict(entry)
+    with open(directory / entry) as f:
+        return json.load(f)
+
+def _sweep_values(spec):
+    """Values of a swept setting; a range includes its stop value."""
+    if isinstance(spec, list):
+        return [float(value) for value in spec]
+    start, stop, step = float(spec["start"]), float(spec["stop"]), float(spec["step"])
+    if step <= 0:
+        raise ValueError(f"sweep step must be positive, got {step}")
+    count = int(round((stop - start) / step)) + 1
+    return [round(start + i * step, 10) for i in range(max(count, 0))]
+
+def load_manifest(path: Path):
+    """Returns the list of settings dicts a manifest or settings file describes."""
+    with open(path) as f:
+        data = json.load(f)
+    if not any(key in data for key in MANIFEST_KEYS):
+        return [simulation.upgrade_settings(data)]
+
+    base = _settings(data.get("base", {}), path.parent)
+    runs = [_settings(run, path.parent) for run in data.get("runs", [{}])]
+    sweep = data.get("sweep", {})
+    names = list(sweep)
+    values = [_sweep_values(sweep[name]) for name in names]
+    return [
+        simulation.upgrade_settings({**base, **run, **dict(zip(names, combination))})
+        for run in runs
+        for combination in itertools.product(*values)
+    ]
+
+class BatchRunner:
+    """Runs a list of settings on a pool of `workers` threads, each driving one SimulationRun."""
+    def __init__(self, exe_path, workers, shards=1, cache=None, incremental=False, export_trajectories=False,
+                 refinement=None, pool: WorkerPool = None):
+        self.exe_path = exe_path
+        self.workers = workers
+        self.shards = shards
+        self.cache = cache
+        self.incremental = incremental
+        self.export_trajectories = export_trajectories
+        self.refinement = refinement
+        self.pool = pool  # warm simulators shared by the runs, or None to launch one per shard
+        self._running = {}  # profile id -> SimulationRun
+        self._lock = threading.Lock()
+        self._print_lock = threading.Lock()
+
+    def _report(self, text):
+        with self._print_lock:
+            print(text, flush=True)
+
+    def _run_one(self, index, settings):
+        profile_id = filemanagment.allocate_profile_id()
+        rows = [0]
+
+        def count_rows(_, batch):
+            rows[0] += len(batch)
+
+        simulation_run = SimulationRun(
+            settings, profile_id, self.exe_path, shards=self.shards, cache=self.cache,
+            incremental=self.incremental, export_trajectories=self.export_trajectories, refinement=self.refinement,
+            pool=self.pool, on_rows=count_rows
+        )
+        with self._lock:
+            self._running[profile_id] = simulation_run
+        start = time.monotonic()
+        try:
+            simulation_run.run()
+        finally:
+            with self._lock:
+                del self._running[profile_id]
+
+        elapsed = time.monotonic() - start
+        if simulation_run.failed or simulation_run.aborted:
+            state = "failed" if simulation_run.failed else "cancelled"
+            self._report(f"run {index}: profile_{profile_id} {state} after {elapsed:.1f}s")
+            if simulation_run.aborted:
+                filemanagment.delete_profile(profile_id)
+            return False
+        cached = " (cached)" if simulation_run.cache_hit else ""
+        self._report(f"run {index}: profile_{profile_id} {rows[0]} rows in {elapsed:.1f}s{cached}")
+        return True
+
+    def abort(self):
+        with self._lock:
+            for simulation_run in self._running.values():
+                simulation_run.abort()
+
+    def run(self, settings_list):
+        """Runs every settings dict and returns how many runs failed."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_one, i, settings) for i, settings in enumerate(settings_list)]
+            try:
+                results = [future.result() for future in futures]
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                self.abort()
+                raise
+        return results.count(False)
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog="python batch_runner.py", description=__doc__.split("\n\n")[0].strip(),
+        epilog="Manifest format: see the top of batch_runner.py."
+    )
+    parser.add_argument("manifests", nargs="+", type=Path, help="settings files or manifests")
+    parser.add_argument("--workers", type=int, default=simulation.default_shard_count(),
+                        help="runs simulated at the same time (default: CPU count)")
+    parser.add_argument("--shards", type=int, default=1, help="simulator processes per run")
+    parser.add_argument("--exe", default="shootingsim.exe", help="simulator binary, relative to this directory")
+    parser.add_argument("--profiles", type=Path, default=filemanagment.PROFILES_PATH, help="profiles directory")
+    parser.add_argument("--no-cache", action="store_true", help="always run the simulator")
+    parser.add_argument("--incremental", action="store_true", help="reuse cells of profiles with the same physics")
+    parser.add_argument("--trajectories", action="store_true", help="export every chosen shot's arc")
+    parser.add_argument("--refine", type=int, default=0, metavar="LEVELS",
+                        help="passes resampling rough distance intervals at finer steps (default: 0, a uniform grid)")
+    parser.add_argument("--refine-speed-tol", type=float, default=Refinement().speed_tolerance,
+                        help="shooter speed error (m/s) that makes an interval rough")
+    parser.add_argument("--refine-angle-tol", type=float, default=Refinement().angle_tolerance,
+                        help="angle error (rad) that makes an interval rough")
+    parser.add_argument("--no-pool", action="store_true", help="launch a simulator process per run and shard")
+    parser.add_argument("--dry-run", action="store_true", help="print the expanded runs and exit")
+    args = parser.parse_args(argv)
+
+    settings_list = []
+    for manifest in args.manifests:
+        try:
+            settings_list += load_manifest(manifest)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error reading {manifest}: {e}")
+            return 2
+
+    if args.dry_run:
+        for i, settings in enumerate(settings_list):
+            print(f"run {i}: {json.dumps(settings, sort_keys=True)}")
+        return 0
+
+    filemanagment.PROFILES_PATH = args.profiles
+    cache = None if args.no_cache else ResultCache()
+    refinement = None
+    if args.refine > 0:
+        refinement = Refinement(args.refine_speed_tol, args.refine_angle_tol, levels=args.refine)
+    workers, shards = max(1, args.workers), max(1, args.shards)
+    pool = None
+    if not args.no_pool:
+        pool = WorkerPool(resolve_exe(args.exe), workers * shards)
+        try:
+            pool.start()
+        except SimulatorError as e:
+            print(f"Simulator pool unavailable, runs start a process each: {e}")
+            pool.close()
+            pool = None
+    runner = BatchRunner(
+        args.exe, workers, shards=shards, cache=cache,
+        incremental=args.incremental, export_trajectories=args.trajectories, refinement=refinement, pool=pool
+    )
+    kind = "warm simulators" if pool is not None else "simulator processes"
+    print(f"{len(settings_list)} runs on {runner.workers} workers, {runner.shards} {kind} each", flush=True)
+    try:
+        failed = runner.run(settings_list)
+    except KeyboardInterrupt:
+        print("Interrupted; unfinished profiles were deleted")
+        return 130
+    finally:
+        if pool is not None:
+            pool.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1 @@
+"""Headless benchmarks of the GUI's data paths over synthetic profile trees; see __main__.py."""
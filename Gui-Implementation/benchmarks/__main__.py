@@ -0,0 +1,111 @@
+"""
+Benchmarks of the GUI's data paths, run from Gui-Implementation:
+
+    python -m benchmarks run [--profiles 10,100,500] [--rows 1000,10000,100000] [--repeat 5] [--label NAME]
+    python -m benchmarks compare [BASE] [HEAD] [--threshold 1.2]
+
+run measures every case on synthetic profile trees of each size and appends
+the timings to the history file; compare prints HEAD's best timings relative
+to BASE's (by default the last two runs) and exits non-zero when any case got
+slower than the threshold. Best rather than median times are compared, as
+they are the least disturbed by other load on the machine.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks.history import HISTORY_PATH, append_run, load_runs, find_run, run_metadata
+
+def _sizes(text):
+    return [int(size) for size in text.split(",") if size]
+
+def run(args):
+    from PySide6.QtWidgets import QApplication
+    from benchmarks.cases import CASES, measure
+    from benchmarks.synthetic import generate_profiles
+
+    app = QApplication.instance() or QApplication([])
+    results = []
+    with tempfile.TemporaryDirectory(prefix="trajectory-lab-bench-") as tmp:
+        trees = [("profiles", size, size, args.rows_per_profile) for size in args.profiles]
+        trees += [("rows", size, 1, size) for size in args.rows]
+        for axis, size, profiles, rows in trees:
+            root = generate_profiles(Path(tmp) / f"{axis}_{size}", profiles, rows, seed=args.seed)
+            for case in CASES:
+                if case.axis != axis:
+                    continue
+                timing = measure(case, root, args.repeat)
+                results.append({"case": case.name, "axis": axis, "size": size, **timing})
+                print(
+                    f"{case.name:<40} {axis}={size:<8} median {timing['median_s'] * 1000:9.2f} ms  "
+                    f"min {timing['min_s'] * 1000:9.2f} ms  peak {timing['peak_kib']:10.0f} KiB",
+                    flush=True,
+                )
+    del app
+
+    entry = run_metadata(args.label, args.repeat)
+    entry["results"] = results
+    append_run(args.history, entry)
+    print(f"Recorded run {entry['run_id']} in {args.history}")
+    return 0
+
+def compare(args):
+    runs = load_runs(args.history)
+    if len(runs) < (1 if args.base and args.head else 2):
+        print(f"Error: {args.history} needs two runs to compare")
+        return 2
+    base = find_run(runs, args.base) if args.base else runs[-2]
+    head = find_run(runs, args.head) if args.head else runs[-1]
+    if base is None or head is None:
+        print(f"Error: no run matches {args.base if base is None else args.head}")
+        return 2
+
+    print(f"base {base['run_id']} ({base['commit'][:10]}) -> head {head['run_id']} ({head['commit'][:10]})")
+    base_times = {(r["case"], r["size"]): r for r in base["results"]}
+    regressed = False
+    for result in head["results"]:
+        before = base_times.get((result["case"], result["size"]))
+        if before is None:
+            continue
+        ratio = result["min_s"] / before["min_s"] if before["min_s"] else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag, regressed = "  SLOWER", True
+        elif ratio < 1 / args.threshold:
+            flag = "  faster"
+        print(
+            f"{result['case']:<40} {result['axis']}={result['size']:<8} "
+            f"{before['min_s'] * 1000:9.2f} -> {result['min_s'] * 1000:9.2f} ms  x{ratio:5.2f}  "
+            f"peak {before['peak_kib']:8.0f} -> {result['peak_kib']:8.0f} KiB{flag}"
+        )
+    return 1 if regressed else 0
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH, help="JSON-lines file of recorded runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="measure every case and record the run")
+    run_parser.add_argument("--profiles", type=_sizes, default=[10, 100, 500], help="profile counts for the profile sweep")
+    run_parser.add_argument("--rows-per-profile", type=int, default=200, help="output rows of each profile in the profile sweep")
+    run_parser.add_argument("--rows", type=_sizes, default=[1000, 10000, 100000], help="output rows for the row sweep")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--label", default="", help="name to find the run by in compare")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two recorded runs")
+    compare_parser.add_argument("base", nargs="?", help="run id, label or commit prefix (default: second to last run)")
+    compare_parser.add_argument("head", nargs="?", help="run id, label or commit prefix (default: last run)")
+    compare_parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
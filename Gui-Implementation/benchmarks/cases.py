@@ -0,0 +1,131 @@
+import gzip
+import shutil
+import statistics
+import time
+import tracemalloc
+import shiboken6
+import filemanagment
+from csv_view_widgets import CSVDisplay, CSVGrid
+
+class Case:
+    """
+    One measured data path.
+
+    axis is "profiles" or "rows": the size of the synthetic tree that the case
+    scales with. prepare(root) runs once per tree and returns the state that
+    setup(state) (untimed, before every call) and run(state) (timed) share.
+    """
+    def __init__(self, name, axis, prepare, run, setup=None):
+        self.name = name
+        self.axis = axis
+        self.prepare = prepare
+        self.run = run
+        self.setup = setup
+
+def measure(case: Case, root, repeat):
+    """
+    Returns the median and best time in seconds of a case on a tree, and the
+    peak of its Python and NumPy allocations in KiB (memory Qt allocates in C++
+    is not traced).
+    """
+    state = case.prepare(root)
+    times = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup(state)
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows allocation-heavy code several times over
+    if case.setup is not None:
+        case.setup(state)
+    tracemalloc.start()
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_s": statistics.median(times), "min_s": min(times), "peak_kib": peak / 1024}
+
+def _use_tree(root):
+    """Points filemanagment at a synthetic profiles tree."""
+    filemanagment.PROFILES_PATH = root
+    filemanagment._catalog = None
+    filemanagment._table_cache.clear()
+    return {"root": root}
+
+def _drop_catalog(state):
+    shutil.rmtree(state["root"] / ".catalog", ignore_errors=True)
+    filemanagment._catalog = None
+
+def _warm_catalog(root):
+    state = _use_tree(root)
+    filemanagment.list_of_results()
+    return state
+
+def _first_csv(root):
+    state = _use_tree(root)
+    state["csv"] = root / "profile_0" / "output.csv"
+    state["display"] = CSVDisplay()
+    return state
+
+def _columns_written(root):
+    state = _first_csv(root)
+    _load_csv(state)
+    return state
+
+def _drop_columns(state):
+    filemanagment.columns_path(state["csv"]).unlink(missing_ok=True)
+    filemanagment._table_cache.clear()
+
+def _load_csv(state):
+    state["display"].load_csv(state["csv"])
+
+def _drop_cached_table(state):
+    filemanagment._table_cache.clear()
+
+def _compressed_csv(root):
+    # Outside the profile directories, so the tree's profiles stay as they are
+    state = _use_tree(root)
+    state["csv"] = root / "compressed" / "output.csv"
+    state["csv"].parent.mkdir(exist_ok=True)
+    with open(root / "profile_0" / "output.csv", "rb") as src, gzip.open(filemanagment.compressed_path(state["csv"]), "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return state
+
+def _grid(root):
+    state = _use_tree(root)
+    state["results"] = filemanagment.list_of_results()
+    state["grid"] = None
+    return state
+
+def _fresh_grid(state):
+    # A new grid per call, so every run lays out the cards from scratch; the old
+    # one is freed right away, as there is no event loop to run its deleteLater()s
+    if state["grid"] is not None:
+        shiboken6.delete(state["grid"])
+    state["grid"] = CSVGrid([])
+    state["grid"].resize(1000, 700)
+
+def _filled_grid(root):
+    state = _grid(root)
+    _fresh_grid(state)
+    _update_grid(state)
+    return state
+
+def _update_grid(state):
+    state["grid"].update_results(state["results"])
+
+CASES = [
+    Case("list_of_results (cold catalog)", "profiles", _use_tree, lambda s: filemanagment.list_of_results(), _drop_catalog),
+    Case("list_of_results (warm catalog)", "profiles", _warm_catalog, lambda s: filemanagment.list_of_results()),
+    Case("list_of_results (outputs, 1 worker)", "profiles", _warm_catalog,
+         lambda s: filemanagment.list_of_results(include_output=True, workers=1)),
+    Case("list_of_results (outputs, pool)", "profiles", _warm_catalog,
+         lambda s: filemanagment.list_of_results(include_output=True)),
+    Case("CSVGrid.update_results (new grid)", "profiles", _grid, _update_grid, _fresh_grid),
+    Case("CSVGrid.update_results (unchanged)", "profiles", _filled_grid, _update_grid),
+    Case("_read_csv", "rows", _use_tree, lambda s: filemanagment._read_csv(s["root"] / "profile_0" / "output.csv")),
+    Case("CSVDisplay.load_csv (parse)", "rows", _first_csv, _load_csv, _drop_columns),
+    Case("CSVDisplay.load_csv (columns file)", "rows", _columns_written, _load_csv, _drop_cached_table),
+    Case("read_table (compressed)", "rows", _compressed_csv, lambda s: filemanagment.read_table(s["csv"]), _drop_cached_table),
+]
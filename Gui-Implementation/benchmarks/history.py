@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import platform
+import subprocess
+import sys
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HISTORY_PATH = Path(__file__).parent / "history.jsonl"
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _max_rss_kib():
+    """Process-wide peak resident memory in KiB, or None where it can't be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB on Linux, bytes on macOS
+        return peak // 1024 if sys.platform == "darwin" else peak
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if get_info(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize // 1024
+    return None
+
+def run_metadata(label, repeat):
+    """Describes the current run: when, on which commit and on what machine it was measured."""
+    import numpy
+    import PySide6
+    now = datetime.now(timezone.utc)
+    return {
+        "run_id": now.strftime("%Y%m%dT%H%M%SZ"),
+        "label": label,
+        "timestamp": now.isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pyside": PySide6.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "repeat": repeat,
+        # Process-wide high-water mark in KiB (peak working set on Windows)
+        "max_rss": _max_rss_kib(),
+    }
+
+def load_runs(path: Path):
+    """Returns the recorded runs of a history file, oldest first."""
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    runs.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    except json.JSONDecodeError as e:
+        print(f"Error reading history file {path}: {e}", file=sys.stderr)
+    return runs
+
+def append_run(path: Path, run):
+    """Appends one run as a single JSON line, so concurrent runs never interleave within a record."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, sort_keys=True) + "\n")
+
+def find_run(runs, selector):
+    """The latest run whose id or label equals selector, or whose commit starts with it."""
+    for run in reversed(runs):
+        if selector in (run["run_id"], run["label"]) or run["commit"].startswith(selector):
+            return run
+    return None
@@ -0,0 +1,59 @@
+from pathlib import Path
+import json
+import numpy as np
+from filemanagment import OUTPUT_COLUMNS
+from simulation import SIMULATOR_DEFAULTS
+
+# Keys earlier settings menus wrote on top of the simulator's own (see
+# simulation.LEGACY_KEYS); profiles on disk still have them
+GUI_KEYS = {
+    "maxangle": (40.0, 90.0), "minangle": (0.0, 35.0), "angledelta": (0.1, 5.0),
+    "maxshooterspeed": (15.0, 25.0), "minshooterspeed": (0.0, 10.0), "shooterspeeddelta": (0.1, 2.0),
+    "maxdistance": (3.0, 8.0), "mindistance": (0.5, 2.0), "distancedelta": (0.05, 0.5),
+    "maxrobotspeed": (1.0, 4.0), "minrobotspeed": (-4.0, -1.0),
+}
+
+def synthetic_settings(rng: np.random.Generator):
+    """Returns a settings dict like the ones the GUI saved: most simulator keys, jittered, plus the older GUI keys."""
+    settings = {}
+    for key, value in SIMULATOR_DEFAULTS.items():
+        if rng.random() < 0.8:
+            settings[key] = round(float(value * rng.uniform(0.8, 1.2)), 6)
+    for key, (low, high) in GUI_KEYS.items():
+        settings[key] = round(float(rng.uniform(low, high)), 4)
+    return settings
+
+def synthetic_rows(rng: np.random.Generator, rows):
+    """Returns a (rows, len(OUTPUT_COLUMNS)) float32 array shaped like a simulator output grid."""
+    robot_speeds = np.round(np.arange(-3.2, 3.2 + 1e-9, 0.1), 6)
+    lines = -(-rows // len(robot_speeds))
+    distance = np.repeat(1.0 + 0.01 * np.arange(lines), len(robot_speeds))[:rows]
+    robot_speed = np.tile(robot_speeds, lines)[:rows]
+    speed = 6.0 + 0.8 * distance - 0.3 * robot_speed + rng.normal(0, 0.05, rows)
+    angle = 0.95 - 0.04 * distance + rng.normal(0, 0.01, rows)
+    max_height = 2.2 + 0.15 * distance + rng.normal(0, 0.02, rows)
+    return np.column_stack([distance, speed, robot_speed, angle, max_height]).astype(np.float32)
+
+def write_output_csv(path: Path, rows):
+    """Writes rows in the simulator's output format (header, then one shot per line)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(",".join(OUTPUT_COLUMNS) + "\n")
+        np.savetxt(f, rows, fmt="%.7g", delimiter=",")
+
+def generate_profiles(root: Path, profiles, rows, seed=0):
+    """
+    Creates root/profile_0 .. profile_{profiles-1}, each with a settings.json and
+    an output.csv of rows rows, and returns root.
+
+    The same seed always produces the same tree.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    for profile_id in range(profiles):
+        profile_dir = root / f"profile_{profile_id}"
+        profile_dir.mkdir(exist_ok=True)
+        with open(profile_dir / "settings.json", "w", encoding="utf-8") as f:
+            json.dump(synthetic_settings(rng), f)
+        write_output_csv(profile_dir / "output.csv", synthetic_rows(rng, rows))
+    return root
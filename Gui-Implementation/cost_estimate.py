@@ -0,0 +1,182 @@
+"""
+Predicts what a settings dict costs to simulate, before it is launched:
+
+    python cost_estimate.py [--processes N] SETTINGS_FILE ...
+
+The simulator integrates one trajectory per bisection step, for every angle
+of every (distance, robot speed) cell, so its work is the product of the
+grid sizes and the bisection depth. Wall time is that work over the
+throughput of past runs, which SimulationRun records in
+profiles/runtimes.jsonl. Nothing here imports PySide6.
+"""
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+import filemanagment
+import simulation
+
+# Keys the GUI or a hand-written settings file may use for a simulator key;
+# the simulator silently runs its default for any key it doesn't know
+KEY_HINTS = {
+    **simulation.LEGACY_KEYS,
+    # Written by both speed groups of earlier settings menus; the robot speed one meant this
+    "shooterspeeddelta": "deltarobotspeed",
+    "robotspeeddelta": "deltarobotspeed",
+    "speedtolerance": "speedtolerancetostopsearch",
+}
+# Trajectories per second of one simulator process, until runs are recorded
+# (measured with the default settings)
+DEFAULT_RATE = 45000.0
+
+def ignored_keys(settings):
+    """Returns {key: simulator key it likely meant, or None} for the keys the simulator ignores."""
+    return {
+        key: KEY_HINTS.get(key)
+        for key in settings if key.lower() not in simulation.SIMULATOR_DEFAULTS
+    }
+
+def _steps(low, high, delta):
+    """Points of a low..high sweep in delta steps, without walking it as the simulator does."""
+    if delta <= 0 or high < low:
+        return 0
+    return math.floor((high - low) / delta + 1e-9) + 1
+
+class CostEstimate:
+    """Grid sizes of a settings dict, the trajectories they take, and the predicted wall time."""
+    def __init__(self, settings, processes=1, rate=DEFAULT_RATE, calibrated=False):
+        resolved = simulation.resolve_settings(settings)
+        self.distances = _steps(resolved["mindistance"], resolved["maxdistance"], resolved["deltadistance"])
+        self.robot_speeds = _steps(-resolved["maxrobotspeed"], resolved["maxrobotspeed"], resolved["deltarobotspeed"])
+        self.angles = _steps(resolved["minangle"], resolved["maxangle"], resolved["deltaangle"])
+        span = resolved["maxspeed"] - resolved["minspeed"]
+        tolerance = resolved["speedtolerancetostopsearch"]
+        # A search stops once the speed bracket is narrower than the tolerance
+        self.bisection_steps = max(math.ceil(math.log2(span / tolerance)), 1) if span > 0 and tolerance > 0 else 1
+        self.ignored = ignored_keys(settings)
+        # Shards split the distances, so there are never more busy processes than
+        # distances, and never more running at once than cores
+        self.processes = max(min(processes, self.distances, simulation.default_shard_count()), 1)
+        self.rate = rate
+        self.calibrated = calibrated
+
+    @property
+    def cells(self):
+        return self.distances * self.robot_speeds
+
+    @property
+    def trajectories(self):
+        """Upper bound of the trajectories integrated; most searches hit the target earlier."""
+        return self.cells * self.angles * self.bisection_steps
+
+    @property
+    def seconds(self):
+        return self.trajectories / (self.rate * self.processes)
+
+    def summary(self):
+        return (
+            f"{self.distances} distances x {self.robot_speeds} robot speeds x {self.angles} angles "
+            f"x {self.bisection_steps} bisection steps"
+        )
+
+    def __str__(self):
+        basis = "" if self.calibrated else ", uncalibrated"
+        return (
+            f"{self.summary()}: ~{format_duration(self.seconds)} on {self.processes} "
+            f"process{'es' if self.processes != 1 else ''}{basis}"
+        )
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+class RuntimeHistory:
+    """
+    Throughput of finished runs, one JSON line per run in profiles/runtimes.jsonl.
+
+    rate() is the median trajectories per second and process over the last
+    RECENT runs, so a changed simulator or machine is picked up quickly.
+    """
+    FILE_NAME = "runtimes.jsonl"
+    RECENT = 20
+    # Runs this short are mostly process start-up and say little about the rate
+    MIN_SECONDS = 1.0
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root if root is not None else filemanagment.PROFILES_PATH)
+        self.path = self.root / self.FILE_NAME
+        self._rate = None
+        self._rate_mtime = None
+
+    def record(self, settings, processes, seconds):
+        """Appends a finished run that simulated its whole grid on `processes` processes."""
+        if seconds < self.MIN_SECONDS:
+            return
+        cost = CostEstimate(settings, processes)
+        entry = {
+            "time": time.time(), "trajectories": cost.trajectories, "processes": cost.processes, "seconds": seconds
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Error recording run time in {self.path}: {e}")
+
+    def rate(self):
+        """Median trajectories per second of one process, or None before any run is recorded."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._rate_mtime:
+            rates = []
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        rates.append(entry["trajectories"] / (entry["seconds"] * entry["processes"]))
+                    except (ValueError, KeyError, TypeError, ZeroDivisionError):
+                        continue
+            self._rate = statistics.median(rates[-self.RECENT:]) if rates else None
+            self._rate_mtime = mtime
+        return self._rate
+
+def estimate(settings, processes=1, history: RuntimeHistory = None):
+    """Returns the CostEstimate of a settings dict, calibrated on the recorded runs if there are any."""
+    rate = (history if history is not None else RuntimeHistory()).rate()
+    return CostEstimate(settings, processes, rate or DEFAULT_RATE, calibrated=rate is not None)
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python cost_estimate.py", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("settings", nargs="+", type=Path, help="settings files")
+    parser.add_argument("--processes", type=int, default=simulation.default_shard_count(),
+                        help="simulator processes of the run (default: CPU count)")
+    parser.add_argument("--profiles", type=Path, default=filemanagment.PROFILES_PATH,
+                        help="profiles directory holding the recorded run times")
+    args = parser.parse_args(argv)
+
+    history = RuntimeHistory(args.profiles)
+    status = 0
+    for path in args.settings:
+        try:
+            with open(path) as f:
+                settings = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {path}: {e}")
+            status = 2
+            continue
+        cost = estimate(settings, args.processes, history)
+        print(f"{path}: {cost}")
+        for key, hint in cost.ignored.items():
+            print(f"  ignored key {key!r}" + (f", did you mean {hint!r}?" if hint else ""))
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
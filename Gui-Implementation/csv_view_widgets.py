@@ -1,69 +1,120 @@
-import csv
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QPushButton, QLabel, QFrame, QTableWidget,
-    QTableWidgetItem, QVBoxLayout, QHBoxLayout, QGridLayout, QHeaderView,
-    QAbstractScrollArea, QScrollArea
+    QApplication, QWidget, QPushButton, QLabel, QFrame, QTableView,
+    QVBoxLayout, QHBoxLayout, QHeaderView, QScrollArea, QStackedWidget, QMessageBox
 )
-from PySide6.QtCore import Qt
-from filemanagment import Result
-import color_palette as cp
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, QEvent, Signal
+from filemanagment import Result, ResultTable, read_table, delete_profile
+from profile_loader import ProfileLoader
+from simulation import resolve_settings
+from trajectories import read_trajectories, trajectories_path
+from trajectory_plot_widgets import TrajectoryPlotView
+
+class ResultTableModel(QAbstractTableModel):
+    """Read-only table model over the float32 columns of a ResultTable.
+
+    Cells are formatted on demand, so only the rows in the viewport cost anything.
+    Rows appended to a live table are announced to the view by a frame timer,
+    at most ROWS_PER_FRAME at a time.
+    """
+    ROWS_PER_FRAME = 2000
+    FRAME_MS = 16
+
+    def __init__(self, table: ResultTable = None, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self._rows = len(table) if table is not None else 0
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setInterval(self.FRAME_MS)
+        self._frame_timer.timeout.connect(self._sync_rows)
+
+    def set_table(self, table: ResultTable):
+        self._frame_timer.stop()
+        self.beginResetModel()
+        self.table = table
+        self._rows = len(table) if table is not None else 0
+        self.endResetModel()
+
+    def table_grew(self):
+        """Schedules the rows appended to the table for display."""
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+
+    def _sync_rows(self):
+        pending = len(self.table) - self._rows if self.table is not None else 0
+        if pending <= 0:
+            self._frame_timer.stop()
+            return
+        count = min(pending, self.ROWS_PER_FRAME)
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + count - 1)
+        self._rows += count
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.table is None:
+            return 0
+        return self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.table is None:
+            return 0
+        return len(self.table.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        # str() of a float32 gives the same shortest repr the simulator writes
+        return str(self.table.columns[index.column(), index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and self.table is not None:
+            return self.table.headers[section]
+        if orientation == Qt.Vertical:
+            return str(section + 1)
+        return None
 
 class CSVDisplay(QFrame):
     """Widget for displaying CSV data in a table."""
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.table = QTableWidget(self)
+        self.model = ResultTableModel(parent=self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Fixed row heights keep the view from measuring every row
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
         layout = QVBoxLayout(self)
         layout.addWidget(self.table)
         layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(layout)
-        self.setStyleSheet(self._stylesheet())
         
     def load_csv(self, path: str):
-        try:
-            with open(path, newline='', encoding='utf-8') as f:
-                reader = list(csv.reader(f))
-                if not reader: return
-
-                headers, rows = reader[0], reader[1:]
-                self.table.setColumnCount(len(headers))
-                self.table.setHorizontalHeaderLabels(headers)
-                self.table.setRowCount(len(rows))
-
-                for r, row in enumerate(rows):
-                    for c, val in enumerate(row):
-                        self.table.setItem(r, c, QTableWidgetItem(val))
-
-                self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-                self.table.setSizeAdjustPolicy(QAbstractScrollArea.AdjustToContents)
-        except FileNotFoundError:
-            print(f"Error: CSV file not found at {path}")
-        except Exception as e:
-            print(f"Error loading CSV: {e}")
-
-    def _stylesheet(self):
-        return f"""
-            QFrame {{
-                background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {cp.BACKGROUND_DARK}, stop:1 {cp.CARD_SURFACE});
-            }}
-            QTableWidget {{
-                background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT}; gridline-color: {cp.BORDER_DIVIDER};
-                selection-background-color: {cp.INFO_HIGHLIGHT}; selection-color: {cp.PRIMARY_TEXT};
-                border: none; font-family: "Inter", "Roboto", sans-serif; font-size: 13px;
-            }}
-            QHeaderView::section {{
-                background-color: {cp.BORDER_DIVIDER}; color: {cp.PRIMARY_TEXT}; font-weight: bold;
-            }}
-            QScrollBar:vertical {{ background: {cp.BACKGROUND_DARK}; width: 10px; margin: 0px; }}
-            QScrollBar::handle:vertical {{ background: {cp.BORDER_DIVIDER}; }}
-            QScrollBar::handle:vertical:hover {{ background: {cp.INFO_HIGHLIGHT}; }}
-        """
+        table = read_table(path)
+        if table is None:
+            return
+        self.model.set_table(table)
+
+    def show_table(self, table: ResultTable):
+        """Displays an in-memory table, e.g. the live rows of a running simulation."""
+        self.model.set_table(table)
+
+    def table_grew(self):
+        self.model.table_grew()
+
+    def clear(self):
+        """Lets go of the displayed table, so its columns file can be deleted."""
+        self.model.set_table(None)
 
 class CSVEditWidget(QFrame):
     """Widget for editing a CSV file. This appears as a separate window."""
+    abort_requested = Signal(int)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.result = None
+        self.live = False
         self.setWindowTitle("CSV Editor")
         self.setMinimumSize(600, 400)
         
@@ -79,24 +130,70 @@ class CSVEditWidget(QFrame):
         self.label = QLabel("Editing profile")
         self.close_button = QPushButton("Close")
         self.close_button.clicked.connect(self.hide)
+        self.abort_button = QPushButton("Abort run")
+        self.abort_button.clicked.connect(lambda: self.abort_requested.emit(self.result.id))
+        self.abort_button.hide()
+        self.trajectories_button = QPushButton("Show trajectories")
+        self.trajectories_button.setCheckable(True)
+        self.trajectories_button.toggled.connect(self._show_trajectories)
         
         left_layout.addWidget(self.label)
         left_layout.addStretch()
+        left_layout.addWidget(self.trajectories_button)
+        left_layout.addWidget(self.abort_button)
         left_layout.addWidget(self.close_button)
         
-        # Right side for CSV table
+        # Right side for CSV table, or the profile's trajectories
         self.csv_display = CSVDisplay()
+        self.trajectory_plot = TrajectoryPlotView()
+        self.views = QStackedWidget()
+        self.views.addWidget(self.csv_display)
+        self.views.addWidget(self.trajectory_plot)
         
         layout.addWidget(left_panel)
-        layout.addWidget(self.csv_display, 1) # Add stretch factor
+        layout.addWidget(self.views, 1) # Add stretch factor
 
-    def set_result(self, result: Result):
+    def set_result(self, result: Result, live_table: ResultTable = None):
+        """Shows a profile; live_table holds the rows streamed so far if it is still running."""
         self.result = result
-        self.label.setText(f"Editing profile {result.id}")
-        if result.csv_path:
+        self.live = live_table is not None
+        self.label.setText(f"{'Running' if self.live else 'Editing'} profile {result.id}")
+        self.abort_button.setVisible(self.live)
+        if self.live:
+            self.csv_display.show_table(live_table)
+        elif result.csv_path:
             self.csv_display.load_csv(result.csv_path)
+        self.trajectories_button.setChecked(False)
+        self.trajectories_button.setEnabled(not self.live and trajectories_path(result.id).is_file())
         self.setWindowTitle(f"CSV Editor - Profile {result.id}")
 
+    def release(self):
+        """Hides the editor and drops its table and trajectories, e.g. before its profile is deleted."""
+        self.hide()
+        self.trajectories_button.setChecked(False)
+        self.csv_display.clear()
+        self.result = None
+        self.live = False
+
+    def _show_trajectories(self, checked):
+        """Switches between the table and the trajectory plot, loading the arcs on demand."""
+        if checked:
+            self.trajectory_plot.set_trajectories(read_trajectories(trajectories_path(self.result.id)))
+            self.views.setCurrentWidget(self.trajectory_plot)
+        else:
+            self.trajectory_plot.set_trajectories(None)
+            self.views.setCurrentWidget(self.csv_display)
+
+def _grid_summary(settings):
+    """One line naming the grid a profile's settings sweep, or "" without settings."""
+    if not settings:
+        return ""
+    resolved = resolve_settings(settings)
+    return (
+        f"{resolved['mindistance']:.2f}-{resolved['maxdistance']:.2f} m, "
+        f"±{resolved['maxrobotspeed']:.2f} m/s"
+    )
+
 class ResultShowcaseWidget(QPushButton):
     """A clickable card widget to showcase a single result profile."""
     def __init__(self, result: Result, parent=None):
@@ -117,40 +214,43 @@ class ResultShowcaseWidget(QPushButton):
         top_layout.addStretch()
         top_layout.addWidget(self.remove_button)
         
+        self.detail_label = QLabel(_grid_summary(result.settings))
+        self.detail_label.setObjectName("detail")
+        
         layout.addLayout(top_layout)
+        layout.addWidget(self.detail_label)
         layout.addStretch() # Pushes content to top
 
         self.setLayout(layout)
-        self.setStyleSheet(self._stylesheet())
-
-    def _stylesheet(self):
-        style = cp.BUTTON_STYLES["secondary"]
-        return f"""
-            QPushButton {{
-                background-color: {style["background"]};
-                border: 1px solid {style["border"]};
-                color: {style["text"]};
-                border-radius: 5px;
-                text-align: left;
-                padding: 5px;
-            }}
-            QPushButton:hover {{ background-color: {style["hover"]}; }}
-            QPushButton:pressed {{ background-color: {style["pressed"]}; }}
-            
-            QLabel {{
-                background-color: transparent;
-                color: {cp.PRIMARY_TEXT};
-                border: none;
-                font-weight: bold;
-            }}
-            
-            QPushButton#remove_button {{
-                /* A specific stylesheet for the remove button if needed */
-            }}
-        """
+
+    def set_result(self, result: Result):
+        """Rebinds a pooled card to another result."""
+        if result.id != self.result.id:
+            self.label.setText(f"Profile {result.id}")
+        if result.settings != self.result.settings or result.id != self.result.id:
+            self.detail_label.setText(_grid_summary(result.settings))
+        self.result = result
 
 class CSVGrid(QWidget):
-    """Grid for displaying multiple result showcases."""
+    """
+    Grid for displaying multiple result showcases.
+
+    Only the cards in or near the viewport exist. They are placed by hand on a
+    container as tall as the whole grid, keyed by result id, so an update only
+    touches cards whose results appeared or went away; cards that leave the
+    view go back to a pool and are rebound to the next results scrolled in.
+
+    reload() reads the profiles with a ProfileLoader: cards appear batch by
+    batch as profiles are read, and the current ones stay until the load
+    finishes, so a reload doesn't flicker.
+    """
+    abort_requested = Signal(int)
+
+    COLUMNS = 4  # Use a fixed number of columns for stability
+    CARD_HEIGHT = 120
+    SPACING = 15
+    OVERSCAN_ROWS = 2  # Rows kept materialized above and below the viewport
+
     def __init__(self, results, parent=None):
         super().__init__(parent)
         
@@ -158,64 +258,174 @@ class CSVGrid(QWidget):
         self.main_layout = QVBoxLayout(self)
         self.setLayout(self.main_layout)
 
+        self.status_label = QLabel("")
+        self.main_layout.addWidget(self.status_label)
+
         # Scroll Area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.main_layout.addWidget(scroll_area)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.main_layout.addWidget(self.scroll_area)
 
-        # Widget to hold the grid layout
+        # Cards are positioned on this widget directly, without a layout
         self.grid_container = QWidget()
-        self.grid_layout = QGridLayout(self.grid_container)
-        self.grid_layout.setSpacing(15)
-        self.grid_layout.setContentsMargins(15, 15, 15, 15)
-        scroll_area.setWidget(self.grid_container)
+        self.scroll_area.setWidget(self.grid_container)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self._layout_cards)
+        self.scroll_area.viewport().installEventFilter(self)
 
         self.results = []
-        self.widgets: list[ResultShowcaseWidget] = []
+        self.cards: dict[int, ResultShowcaseWidget] = {}  # result id -> materialized card
+        self._pool: list[ResultShowcaseWidget] = []
         
-        # A single edit widget, managed by the grid
-        self.edit_widget = CSVEditWidget()
-        self.edit_widget.hide()
+        # A single edit widget, managed by the grid and built on first use
+        self._edit_widget = None
+
+        # Rows streamed by running simulations, by profile id
+        self.live_tables: dict[int, ResultTable] = {}
+
+        self.loader = ProfileLoader(parent=self)
+        self.loader.loaded.connect(self._add_results)
+        self.loader.finished.connect(self._finish_loading)
+        self._loaded_ids = set()
 
         self.update_results(results)
 
     def update_results(self, results: list[Result]):
         self.results = results
-        self._turn_results_into_widgets()
+        self._layout_cards()
 
-    def _clear_layout(self):
-        for i in reversed(range(self.grid_layout.count())): 
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.deleteLater()
-        self.widgets.clear()
+    def reload(self):
+        """Reloads every profile in the background."""
+        self._loaded_ids = set()
+        self.status_label.setText("Loading profiles...")
+        self.loader.load(include_settings=True)
 
-    def _turn_results_into_widgets(self):
-        self._clear_layout()
-        
-        cols = 4 # Use a fixed number of columns for stability
+    def cancel_loading(self):
+        """Stops a running reload, keeping the cards loaded so far."""
+        if self.loader.loading:
+            self.loader.cancel()
+            self.status_label.setText("")
+
+    def _add_results(self, results):
+        self._loaded_ids.update(result.id for result in results)
+        by_id = {result.id: result for result in self.results}
+        by_id.update((result.id, result) for result in results)
+        self.update_results(sorted(by_id.values(), key=lambda result: result.id))
+
+    def _finish_loading(self, stats):
+        if stats.error is not None:
+            # The load stopped early, so an unseen profile may still exist: keep its card
+            self.status_label.setText(f"Error loading profiles: {stats.error}")
+            return
+        # Profiles the load didn't see were deleted since the last one
+        self.update_results([result for result in self.results if result.id in self._loaded_ids])
+        self.status_label.setText(f"Loaded {stats}")
+
+    def eventFilter(self, watched, event):
+        if watched is self.scroll_area.viewport() and event.type() == QEvent.Resize:
+            self._layout_cards()
+        return super().eventFilter(watched, event)
+
+    def _new_card(self):
+        card = ResultShowcaseWidget(self.results[0], self.grid_container)
+        card.clicked.connect(lambda _, c=card: self.show_edit_widget(c.result))
+        card.remove_button.clicked.connect(lambda _, c=card: self.remove_result(c))
+        return card
+
+    def _layout_cards(self):
+        """Binds cards to the results in or near the viewport and positions them."""
+        viewport = self.scroll_area.viewport()
+        pitch = self.CARD_HEIGHT + self.SPACING
+        rows = -(-len(self.results) // self.COLUMNS)
+        height = self.SPACING + rows * pitch
+        self.grid_container.setMinimumHeight(height)
 
-        for i, result in enumerate(self.results):
-            widget = ResultShowcaseWidget(result, self)
-            widget.clicked.connect(lambda _, r=result: self.show_edit_widget(r))
-            widget.remove_button.clicked.connect(lambda w=widget: self.remove_result(w))
-            
-            row, col = divmod(i, cols)
-            self.grid_layout.addWidget(widget, row, col)
-            self.widgets.append(widget)
+        # The scroll bar's range follows the new height only after a relayout
+        top = min(self.scroll_area.verticalScrollBar().value(), max(height - viewport.height(), 0))
+        first_row = max(top // pitch - self.OVERSCAN_ROWS, 0)
+        last_row = min((top + viewport.height()) // pitch + self.OVERSCAN_ROWS, rows - 1)
+        first = first_row * self.COLUMNS
+        visible = self.results[first:(last_row + 1) * self.COLUMNS]
+
+        # Pool the cards of results that left the view (or the list)
+        visible_ids = {result.id for result in visible}
+        for result_id in [i for i in self.cards if i not in visible_ids]:
+            card = self.cards.pop(result_id)
+            card.hide()
+            self._pool.append(card)
+
+        card_width = max((viewport.width() - self.SPACING * (self.COLUMNS + 1)) // self.COLUMNS, 1)
+        for i, result in enumerate(visible, start=first):
+            card = self.cards.get(result.id)
+            if card is None:
+                card = self._pool.pop() if self._pool else self._new_card()
+                self.cards[result.id] = card
+            card.set_result(result)
+            row, col = divmod(i, self.COLUMNS)
+            card.setGeometry(
+                self.SPACING + col * (card_width + self.SPACING), self.SPACING + row * pitch,
+                card_width, self.CARD_HEIGHT
+            )
+            if card.isHidden():
+                card.show()
+
+    @property
+    def edit_widget(self):
+        if self._edit_widget is None:
+            self._edit_widget = CSVEditWidget()
+            self._edit_widget.abort_requested.connect(self.abort_requested)
+        return self._edit_widget
+
+    def _showing_live(self, profile_id):
+        """Whether the edit widget shows the live rows of this profile."""
+        edit_widget = self._edit_widget
+        return edit_widget is not None and edit_widget.live and edit_widget.result.id == profile_id
 
     def show_edit_widget(self, result: Result):
-        self.edit_widget.set_result(result)
+        self.edit_widget.set_result(result, self.live_tables.get(result.id))
         self.edit_widget.show()
         self.edit_widget.raise_()
 
+    def start_live_run(self, profile_id):
+        self.live_tables[profile_id] = ResultTable.empty()
+
+    def append_live_rows(self, profile_id, rows):
+        """Appends a batch of streamed rows; an open view picks them up frame by frame."""
+        table = self.live_tables.get(profile_id)
+        if table is None:
+            return
+        table.append(rows)
+        if self._showing_live(profile_id):
+            self.edit_widget.csv_display.table_grew()
+
+    def finish_live_run(self, profile_id):
+        """Drops the live rows and, if the run is on screen, switches to the written output."""
+        self.live_tables.pop(profile_id, None)
+        if self._showing_live(profile_id):
+            self.edit_widget.set_result(self.edit_widget.result)
+
     def remove_result(self, widget: ResultShowcaseWidget):
         # Find the result associated with the widget
         result_to_remove = widget.result
-        self.results = [res for res in self.results if res.id != result_to_remove.id]
-        
-        # Optional: Add logic here to delete the profile files from disk
-        # filemanagment.delete_profile(result_to_remove.id)
-        
-        self._turn_results_into_widgets()
\ No newline at end of file
+        if not self._confirm_removal(result_to_remove.id):
+            return
+
+        edit_widget = self._edit_widget
+        if edit_widget is not None and edit_widget.result is not None and edit_widget.result.id == result_to_remove.id:
+            edit_widget.release()
+        if result_to_remove.id in self.live_tables:
+            # The queue deletes the profile of a cancelled run once its simulators are gone
+            self.abort_requested.emit(result_to_remove.id)
+        else:
+            delete_profile(result_to_remove.id)
+
+        self._loaded_ids.discard(result_to_remove.id)
+        self.update_results([res for res in self.results if res.id != result_to_remove.id])
+
+    def _confirm_removal(self, profile_id):
+        if profile_id in self.live_tables:
+            text = f"Abort the run writing profile {profile_id} and delete it?"
+        else:
+            text = f"Delete profile {profile_id}? Its files are removed and can't be restored."
+        answer = QMessageBox.question(self, "Delete profile", text, QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
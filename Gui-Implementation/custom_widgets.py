@@ -1,6 +1,9 @@
 from enum import Enum
+from functools import lru_cache
+import shiboken6
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget,QFrame
-from PySide6.QtGui import QFontMetrics
+from PySide6.QtGui import QFont, QFontMetrics
 
 class State(Enum):
     """Enumeration for widget states."""
@@ -12,6 +15,26 @@ class State(Enum):
     REPAINT = 5
     CHILD_ADDED = 6
 
+# Available boxes are rounded down to this many pixels, so a resize only
+# refits text when the box changed by more than a bucket
+FIT_BUCKET_PX = 4
+
+@lru_cache(maxsize=1024)
+def _fitting_point_size(font_key, text, available_w, available_h):
+    """Largest point size at which text fits the box, found by binary search."""
+    font = QFont()
+    font.fromString(font_key)
+    low, high = 1, max(available_h, 1)  # A line is taller than its point size
+    while low < high:
+        size = (low + high + 1) // 2
+        font.setPointSize(size)
+        fm = QFontMetrics(font)
+        if fm.horizontalAdvance(text) > available_w or fm.height() > available_h:
+            high = size - 1
+        else:
+            low = size
+    return low
+
 def fit_text_to_widget(widget, text=None, padding=6):
     """
     Automatically adjust font size so 'text' fits exactly inside the widget.
@@ -32,23 +55,57 @@ def fit_text_to_widget(widget, text=None, padding=6):
         return
 
     font = widget.font()
-    size = 1
-    fm = QFontMetrics(font)
-
-    # Increase font size until text doesn't fit
-    while True:
+    size = _fitting_point_size(
+        font.toString(), text,
+        available_w - available_w % FIT_BUCKET_PX, available_h - available_h % FIT_BUCKET_PX
+    )
+    if font.pointSize() != size:
         font.setPointSize(size)
-        fm = QFontMetrics(font)
-        if fm.horizontalAdvance(text) > available_w or fm.height() > available_h:
-            break
-        size += 1
+        widget.setFont(font)
+
+class LayoutScheduler:
+    """
+    Coalesces resize events into one deferred cupdate(State.RESIZE) pass.
 
-    # Step back one size
-    font.setPointSize(max(size - 1, 1))
-    widget.setFont(font)
+    A window drag delivers many resize events per widget between two paints;
+    widgets are collected here and updated once, parents before children, when
+    the event loop next gets to the timer.
+    """
+    def __init__(self):
+        self.pending = {}  # id -> widget
+        self.timer = None
+
+    def schedule(self, widget):
+        self.pending[id(widget)] = widget
+        if self.timer is None:
+            self.timer = QTimer()
+            self.timer.setSingleShot(True)
+            self.timer.timeout.connect(self.flush)
+        if not self.timer.isActive():
+            self.timer.start(0)
+
+    def flush(self):
+        """Runs the pending updates; widgets resized meanwhile wait for the next pass."""
+        widgets, self.pending = self.pending.values(), {}
+        for widget in sorted((w for w in widgets if shiboken6.isValid(w)), key=_depth):
+            widget.cupdate(State.RESIZE)
+
+def _depth(widget):
+    depth = 0
+    parent = widget.parentWidget()
+    while parent is not None:
+        depth += 1
+        parent = parent.parentWidget()
+    return depth
+
+layout_scheduler = LayoutScheduler()
 
 class EventMixin:
-    """Mixin that calls cupdate(State) for standard events."""
+    """
+    Mixin that calls cupdate(State) for standard events; resizes go through
+    layout_scheduler. It must come before the Qt class in the bases, or
+    the Qt event handlers are found first.
+    """
     def enterEvent(self, event):
         self.cupdate(State.ENTER_HOVER)
         super().enterEvent(event)
@@ -62,10 +119,10 @@ class EventMixin:
         super().mousePressEvent(event)
 
     def resizeEvent(self, event):
-        self.cupdate(State.RESIZE)
+        layout_scheduler.schedule(self)
         super().resizeEvent(event)
 
-class BaseFrame(QFrame, EventMixin):
+class BaseFrame(EventMixin, QFrame):
     """Base class for custom widgets providing common functionality."""
     def __init__(self, parent=None, x=0, y=0, w=1, h=1):
         super().__init__(parent)
@@ -103,7 +160,7 @@ class BaseFrame(QFrame, EventMixin):
         return ""
 
 
-class BaseWidget(QWidget, EventMixin):
+class BaseWidget(EventMixin, QWidget):
     """Base class for custom widgets providing common functionality."""
     def __init__(self, parent=None, x=0, y=0, w=1, h=1):
         super().__init__(parent)
@@ -1,8 +1,18 @@
 from pathlib import Path
 import csv
+import gzip
 import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 
 PROFILES_PATH = Path("profiles")
+OUTPUT_COLUMNS = ("distance", "speed", "robot-speed", "angle", "max-height")
 
 class Result:
     """Data class for a simulation result."""
@@ -32,10 +42,37 @@ def _read_json(path: Path):
         print(f"Error reading JSON file {path}: {e}")
         return None
 
+# Cold outputs are stored gzip-compressed next to where output.csv was
+COMPRESSED_SUFFIX = ".gz"
+
+def compressed_path(csv_path: Path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + COMPRESSED_SUFFIX)
+
+def output_file(csv_path: Path):
+    """Returns the file an output CSV is stored in, plain or compressed, or None if neither exists."""
+    csv_path = Path(csv_path)
+    if csv_path.is_file():
+        return csv_path
+    compressed = compressed_path(csv_path)
+    return compressed if compressed.is_file() else None
+
+def open_output(csv_path: Path):
+    """
+    Opens an output CSV for reading as text, decompressing it on the fly if it
+    was compressed. Raises FileNotFoundError naming csv_path if neither exists.
+    """
+    stored = output_file(csv_path)
+    if stored is None:
+        raise FileNotFoundError(f"No such file: '{csv_path}'")
+    if stored.name.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(stored, "rt", newline='', encoding='utf-8')
+    return open(stored, newline='', encoding='utf-8')
+
 def _read_csv(path: Path):
     """Reads a CSV file and returns its content as a list of lists."""
     try:
-        with open(path, newline='', encoding='utf-8') as f:
+        with open_output(path) as f:
             reader = csv.reader(f)
             next(reader, None)  # Skip header
             return list(reader)
@@ -43,39 +80,510 @@ def _read_csv(path: Path):
         print(f"Error reading CSV file {path}: {e}")
         return []
 
-def list_of_results(include_output=False, include_settings=False):
+class ResultTable:
+    """Typed, column-major view of a simulation output."""
+    def __init__(self, headers, columns):
+        self.headers = list(headers)
+        self._buffer = columns  # float32 array shaped (len(headers), capacity)
+        self._length = columns.shape[1]
+
+    @classmethod
+    def empty(cls, headers=OUTPUT_COLUMNS):
+        return cls(headers, np.empty((len(headers), 0), dtype=np.float32))
+
+    @property
+    def columns(self):
+        return self._buffer[:, :self._length]
+
+    def __len__(self):
+        return self._length
+
+    def column(self, name):
+        """Returns the values of the named column."""
+        return self.columns[self.headers.index(name)]
+
+    def append(self, rows):
+        """Appends rows shaped (n, len(headers)), growing the buffer geometrically."""
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, len(self.headers))
+        needed = self._length + len(rows)
+        if needed > self._buffer.shape[1] or not self._buffer.flags.writeable:
+            capacity = max(needed, 2 * self._buffer.shape[1], 1024)
+            buffer = np.empty((len(self.headers), capacity), dtype=np.float32)
+            buffer[:, :self._length] = self.columns
+            self._buffer = buffer
+        self._buffer[:, self._length:needed] = rows.T
+        self._length = needed
+
+    @property
+    def nbytes(self):
+        return self.columns.nbytes
+
+def _chunked_lines(f, chunk_size=1 << 18):
     """
-    Scans the profiles directory and returns a list of Result objects.
+    Yields the lines of a text file read a chunk at a time; loadtxt reads a
+    gzip stream about a third faster this way than line by line, and a plain
+    file no slower.
     """
-    if not PROFILES_PATH.is_dir():
-        return []
+    rest = ""
+    for chunk in iter(lambda: f.read(chunk_size), ""):
+        chunk = rest + chunk
+        end = chunk.rfind("\n") + 1
+        yield from chunk[:end].splitlines()
+        rest = chunk[end:]
+    if rest:
+        yield rest
 
-    results = []
-    for profile_dir in PROFILES_PATH.iterdir():
-        if profile_dir.is_dir():
-            profile_id = _get_id_from_path(profile_dir)
-            if profile_id == -1:
-                continue
+def _parse_csv_table(path: Path):
+    """Parses an output CSV into a ResultTable of float32 columns."""
+    try:
+        with open_output(path) as f:
+            headers = next(csv.reader(f), None)
+            if not headers:
+                return None
+            rows = np.loadtxt(_chunked_lines(f), delimiter=',', dtype=np.float32, ndmin=2)
+    except FileNotFoundError as e:
+        print(f"Error reading CSV file {path}: {e}")
+        return None
+    except ValueError as e:
+        print(f"Error parsing CSV file {path}: {e}")
+        return None
+
+    if rows.size == 0:
+        rows = np.empty((0, len(headers)), dtype=np.float32)
+    return ResultTable(headers, np.ascontiguousarray(rows.T))
+
+# Columnar sidecar layout: 16 byte header (magic, column count, row count),
+# the JSON encoded header names padded to COLUMNS_ALIGNMENT, then each column
+# as a contiguous run of little-endian float32.
+COLUMNS_MAGIC = b"TLCOLS01"
+COLUMNS_ALIGNMENT = 64
+COLUMNS_DTYPE = np.dtype("<f4")
+
+def columns_path(csv_path: Path):
+    """Returns the path of the columnar sidecar of an output CSV."""
+    return Path(csv_path).with_suffix(".cols")
 
-            settings_path = profile_dir / "settings.json"
-            output_path = profile_dir / "output.csv"
-            
-            output = _read_csv(output_path) if include_output else []
-            settings = _read_json(settings_path) if include_settings else {}
+def write_columns(table: ResultTable, path: Path):
+    """Writes a ResultTable to a columnar sidecar file, atomically."""
+    names = json.dumps(table.headers).encode("utf-8")
+    header_len = 16 + 4 + len(names)
+    padding = -header_len % COLUMNS_ALIGNMENT
 
-            results.append(Result(profile_id, settings_path, output_path, output, settings))
-            
-    return sorted(results, key=lambda r: r.id)
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(COLUMNS_MAGIC)
+        f.write(np.array([len(table.headers), len(table)], dtype="<u4").tobytes())
+        f.write(np.array([len(names)], dtype="<u4").tobytes())
+        f.write(names)
+        f.write(b"\0" * padding)
+        f.write(np.ascontiguousarray(table.columns, dtype=COLUMNS_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+def load_columns(path: Path):
+    """
+    Memory-maps a columnar sidecar file. The returned ResultTable's columns
+    are zero-copy, read-only views of the mapped file.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(20)
+            if len(header) < 20 or header[:8] != COLUMNS_MAGIC:
+                print(f"Error reading columns file {path}: bad header")
+                return None
+            cols, rows, names_len = np.frombuffer(header[8:], dtype="<u4")
+            headers = json.loads(f.read(int(names_len)).decode("utf-8"))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error reading columns file {path}: {e}")
+        return None
+
+    offset = 20 + int(names_len)
+    offset += -offset % COLUMNS_ALIGNMENT
+    shape = (int(cols), int(rows))
+    if rows == 0:
+        return ResultTable(headers, np.empty(shape, dtype=COLUMNS_DTYPE))
+    columns = np.memmap(path, dtype=COLUMNS_DTYPE, mode="r", offset=offset, shape=shape)
+    return ResultTable(headers, columns)
+
+# Tables handed out by read_table, so every view of a profile shares one mapping
+_table_cache = weakref.WeakValueDictionary()
+
+def read_table(path: Path):
+    """
+    Returns the output CSV at path as a ResultTable of float32 columns.
+
+    The CSV text is parsed only once, into a columnar sidecar next to it; after
+    that (and until the CSV changes) the table is memory-mapped from the sidecar.
+    A compressed output is parsed in memory and gets no sidecar, so it stays
+    small on disk.
+    """
+    path = Path(path)
+    stored, csv_mtime = path, _mtime(path)
+    if not csv_mtime:
+        stored = compressed_path(path)
+        csv_mtime = _mtime(stored)
+    if not csv_mtime:
+        print(f"Error reading CSV file {path}: file not found")
+        return None
+    _note_opened(path)
+
+    key = (str(stored.resolve()), csv_mtime)
+    table = _table_cache.get(key)
+    if table is not None:
+        return table
+
+    sidecar = columns_path(path)
+    table = load_columns(sidecar) if stored == path and _mtime(sidecar) >= csv_mtime else None
+    if table is None:
+        table = _parse_csv_table(path)
+        if table is None:
+            return None
+        if stored != path:
+            _table_cache[key] = table
+            return table
+        try:
+            write_columns(table, sidecar)
+            table = load_columns(sidecar) or table
+        except OSError as e:
+            print(f"Error writing columns file {sidecar}: {e}")
+
+    _table_cache[key] = table
+    return table
+
+def release_table(path: Path):
+    """
+    Drops the cached tables of the output at path, plain or compressed.
+
+    A memory-mapped table keeps its columns file open, and Windows refuses to
+    delete or replace an open file; callers also drop their own references.
+    """
+    path = Path(path)
+    stored = {str(path.resolve()), str(compressed_path(path).resolve())}
+    for key in list(_table_cache.keys()):
+        if key[0] in stored:
+            _table_cache.pop(key, None)
+
+def _count_rows(path: Path):
+    """Counts the data rows of an output CSV, plain or compressed, without parsing it."""
+    stored = output_file(path)
+    if stored is None:
+        return 0
+    opener = gzip.open if stored.name.endswith(COMPRESSED_SUFFIX) else open
+    with opener(stored, "rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    return max(lines - 1, 0)
+
+def _note_opened(csv_path: Path):
+    """Records that a profile's output was read, for retention by last use."""
+    profile_dir = Path(csv_path).parent
+    if profile_dir.name.startswith("profile_") and profile_dir.parent == PROFILES_PATH:
+        profile_id = _get_id_from_path(profile_dir)
+        if profile_id != -1:
+            get_catalog().mark_opened(profile_id)
+
+def _mtime(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+class ProfileCatalog:
+    """
+    On-disk SQLite index of the profiles directory.
+
+    Each profile's settings, row count and file mtimes are stored in
+    profiles/.catalog/catalog.sqlite and mirrored in memory, so queries never touch the
+    filesystem. refresh() only rescans when the profiles directory mtime moved
+    (a profile was added or removed) and only re-reads profiles whose own mtimes
+    changed. Writers of an existing profile call update_profile().
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+        CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY,
+            dir_mtime INTEGER, settings_mtime INTEGER, output_mtime INTEGER,
+            row_count INTEGER, settings TEXT
+        );
+        CREATE TABLE IF NOT EXISTS profile_settings (
+            profile_id INTEGER, key TEXT, value,
+            PRIMARY KEY (profile_id, key)
+        );
+        CREATE TABLE IF NOT EXISTS profile_usage (id INTEGER PRIMARY KEY, last_opened REAL);
+    """
+    # Opens closer together than this are recorded once, so reads don't each commit
+    OPENED_RESOLUTION_S = 60
+
+    def __init__(self, root: Path = PROFILES_PATH):
+        self.root = Path(root)
+        # A subdirectory, so SQLite's journal files never bump the root's mtime
+        self.path = self.root / ".catalog" / "catalog.sqlite"
+        self._lock = threading.RLock()
+        self._conn = None
+        self._entries = {}  # id -> dict(row of the profiles table, settings parsed)
+        self._sorted_ids = []
+        self._root_mtime = None
+        self._last_opened = {}  # id -> time.time() of the last recorded read
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(self.SCHEMA)
+        except sqlite3.DatabaseError as e:
+            print(f"Error opening catalog {self.path}, rebuilding: {e}")
+            if self._conn is not None:
+                self._conn.close()
+            self.path.unlink(missing_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(self.SCHEMA)
+
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'root_mtime'").fetchone()
+        self._root_mtime = row[0] if row else None
+        for row in self._conn.execute(
+            "SELECT id, dir_mtime, settings_mtime, output_mtime, row_count, settings FROM profiles"
+        ):
+            self._entries[row[0]] = self._entry(*row)
+        self._sorted_ids = sorted(self._entries)
+        self._last_opened = dict(self._conn.execute("SELECT id, last_opened FROM profile_usage"))
+        return self._conn
+
+    @staticmethod
+    def _entry(profile_id, dir_mtime, settings_mtime, output_mtime, row_count, settings):
+        return {
+            "id": profile_id,
+            "dir_mtime": dir_mtime,
+            "settings_mtime": settings_mtime,
+            "output_mtime": output_mtime,
+            "row_count": row_count,
+            "settings": json.loads(settings) if settings else {},
+        }
+
+    def refresh(self, force=False):
+        """Brings the index up to date, touching only directories that changed."""
+        with self._lock:
+            conn = self._connect()
+            root_mtime = _mtime(self.root)
+            if not force and root_mtime == self._root_mtime:
+                return False
+
+            seen = set()
+            changed = False
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        continue
+                    profile_id = _get_id_from_path(Path(entry.path))
+                    if profile_id == -1:
+                        continue
+                    seen.add(profile_id)
+                    known = self._entries.get(profile_id)
+                    if force or known is None or known["dir_mtime"] != entry.stat().st_mtime_ns:
+                        changed |= self._index_profile(profile_id)
+
+            for profile_id in set(self._entries) - seen:
+                self._forget(profile_id)
+                changed = True
+
+            self._root_mtime = root_mtime
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('root_mtime', ?)", (root_mtime,))
+            conn.commit()
+            if changed:
+                self._sorted_ids = sorted(self._entries)
+            return changed
+
+    def update_profile(self, profile_id):
+        """Re-indexes one profile after its files were written."""
+        with self._lock:
+            self._connect()
+            if (self.root / f"profile_{profile_id}").is_dir():
+                self._index_profile(profile_id)
+            else:
+                self._forget(profile_id)
+            self._conn.commit()
+            self._sorted_ids = sorted(self._entries)
+
+    def _index_profile(self, profile_id):
+        profile_dir = self.root / f"profile_{profile_id}"
+        settings_path = profile_dir / "settings.json"
+        output_path = profile_dir / "output.csv"
+        settings_mtime = _mtime(settings_path)
+        output_mtime = _mtime(output_path) or _mtime(compressed_path(output_path))
+
+        known = self._entries.get(profile_id)
+        if known is not None:
+            settings = known["settings"] if known["settings_mtime"] == settings_mtime else None
+            row_count = known["row_count"] if known["output_mtime"] == output_mtime else None
+        else:
+            settings = row_count = None
+        if settings is None:
+            settings = (_read_json(settings_path) or {}) if settings_mtime else {}
+        if row_count is None:
+            row_count = _count_rows(output_path)
+
+        entry = self._entry(profile_id, _mtime(profile_dir), settings_mtime, output_mtime, row_count, None)
+        entry["settings"] = settings
+        if entry == known:
+            return False
+
+        self._entries[profile_id] = entry
+        self._conn.execute(
+            "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?)",
+            (profile_id, entry["dir_mtime"], settings_mtime, output_mtime, row_count, json.dumps(settings)),
+        )
+        self._conn.execute("DELETE FROM profile_settings WHERE profile_id = ?", (profile_id,))
+        self._conn.executemany(
+            "INSERT INTO profile_settings VALUES (?, ?, ?)",
+            [(profile_id, key, value) for key, value in settings.items()],
+        )
+        return True
+
+    def _forget(self, profile_id):
+        self._entries.pop(profile_id, None)
+        self._last_opened.pop(profile_id, None)
+        self._conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        self._conn.execute("DELETE FROM profile_settings WHERE profile_id = ?", (profile_id,))
+        self._conn.execute("DELETE FROM profile_usage WHERE id = ?", (profile_id,))
+
+    def mark_opened(self, profile_id):
+        now = time.time()
+        # Checked once unlocked, so the common case of a recent open costs no lock
+        if now - self._last_opened.get(profile_id, 0) < self.OPENED_RESOLUTION_S:
+            return
+        with self._lock:
+            self._connect()
+            if now - self._last_opened.get(profile_id, 0) < self.OPENED_RESOLUTION_S:
+                return
+            self._last_opened[profile_id] = now
+            self._conn.execute("INSERT OR REPLACE INTO profile_usage VALUES (?, ?)", (profile_id, now))
+            self._conn.commit()
+
+    def last_opened(self, profile_id):
+        """Returns the time.time() a profile's output was last read, or None if never."""
+        with self._lock:
+            self._connect()
+            return self._last_opened.get(profile_id)
+
+    def ids(self):
+        """Returns the sorted list of known profile IDs."""
+        self.refresh()
+        return list(self._sorted_ids)
+
+    def latest_id(self):
+        self.refresh()
+        return self._sorted_ids[-1] if self._sorted_ids else -1
+
+    def settings(self, profile_id):
+        """Returns the indexed settings of a profile ({} if unknown)."""
+        self.refresh()
+        entry = self._entries.get(profile_id)
+        return dict(entry["settings"]) if entry else {}
+
+    def row_count(self, profile_id):
+        self.refresh()
+        entry = self._entries.get(profile_id)
+        return entry["row_count"] if entry else 0
+
+_catalog = None
+
+def get_catalog():
+    """Returns the shared catalog of PROFILES_PATH."""
+    global _catalog
+    if _catalog is None or _catalog.root != PROFILES_PATH:
+        _catalog = ProfileCatalog(PROFILES_PATH)
+    return _catalog
+
+def load_result(profile_id, include_output=False, include_settings=False):
+    """Returns the Result of one profile, reading its output and settings if asked."""
+    profile_dir = PROFILES_PATH / f"profile_{profile_id}"
+    settings_path = profile_dir / "settings.json"
+    output_path = profile_dir / "output.csv"
+
+    output = _read_csv(output_path) if include_output else []
+    settings = get_catalog().settings(profile_id) if include_settings else {}
+    return Result(profile_id, settings_path, output_path, output, settings)
+
+def iter_results(profile_ids=None, include_output=False, include_settings=False, workers=None, cancelled=None):
+    """
+    Yields the Result of each profile (of every profile if profile_ids is None)
+    as soon as it is loaded, so in no particular order.
+
+    Outputs are read on a pool of `workers` threads (the executor's default if
+    None); reading and decompressing release the GIL, so the loads overlap.
+    Settings alone are served from the catalog's memory and need no pool.
+    Setting the threading.Event `cancelled` stops the iteration and drops the
+    loads not started yet.
+    """
+    if profile_ids is None:
+        if not PROFILES_PATH.is_dir():
+            return
+        profile_ids = get_catalog().ids()
+
+    if not include_output:
+        for profile_id in profile_ids:
+            if cancelled is not None and cancelled.is_set():
+                return
+            yield load_result(profile_id, include_output, include_settings)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(load_result, profile_id, include_output, include_settings) for profile_id in profile_ids
+        ]
+        try:
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled.is_set():
+                    return
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def list_of_results(include_output=False, include_settings=False, workers=None):
+    """
+    Returns a list of Result objects for every profile, served from the catalog
+    and sorted by id. Outputs are read in parallel, see iter_results().
+    """
+    results = list(iter_results(None, include_output, include_settings, workers))
+    results.sort(key=lambda result: result.id)
+    return results
 
 def get_latest_id():
-    """Gets the highest profile ID from the profiles directory."""
+    """Gets the highest profile ID from the profiles catalog."""
     if not PROFILES_PATH.is_dir():
         return -1
-        
-    max_id = -1
-    for profile_dir in PROFILES_PATH.iterdir():
-        if profile_dir.is_dir():
-            profile_id = _get_id_from_path(profile_dir)
-            if profile_id > max_id:
-                max_id = profile_id
-    return max_id
+    return get_catalog().latest_id()
+
+_allocate_lock = threading.Lock()
+
+def allocate_profile_id():
+    """
+    Reserves the next free profile ID by creating its directory.
+
+    Directory creation is atomic, so two runs (or two processes) can never be
+    handed the same ID.
+    """
+    with _allocate_lock:
+        PROFILES_PATH.mkdir(parents=True, exist_ok=True)
+        profile_id = get_latest_id() + 1
+        while True:
+            try:
+                (PROFILES_PATH / f"profile_{profile_id}").mkdir()
+            except FileExistsError:
+                profile_id += 1
+                continue
+            get_catalog().update_profile(profile_id)
+            return profile_id
+
+def delete_profile(profile_id):
+    """Deletes a profile directory and drops it from the catalog."""
+    profile_dir = PROFILES_PATH / f"profile_{profile_id}"
+    release_table(profile_dir / "output.csv")
+    try:
+        shutil.rmtree(profile_dir)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error deleting profile {profile_dir}: {e}")
+    get_catalog().update_profile(profile_id)
@@ -1,63 +1,31 @@
-import json
-import subprocess
-from pathlib import Path
-from PySide6.QtWidgets import QWidget, QGridLayout
-from PySide6.QtCore import QThread, QObject, Signal
-from settings_menu_widgets import SettingWidget, SettingWidgetContainer, CSVGenerateButton
-import filemanagment
-import color_palette as cp
-
-class SimulationWorker(QObject):
-    """Worker thread for running the shooting simulation."""
-    finished = Signal()
-    output = Signal(str)
-
-    def __init__(self, settings, generation_id, exe_path):
-        super().__init__()
-        self.settings = settings
-        self.generation_id = generation_id
-        self.exe_path = exe_path
-
-    def run(self):
-        """Execute the simulation subprocess."""
-        profile_dir = Path(f"profiles/profile_{self.generation_id}")
-        profile_dir.mkdir(parents=True, exist_ok=True)
-
-        settings_path = profile_dir / "settings.json"
-        with open(settings_path, "w") as f:
-            json.dump(self.settings, f)
-
-        output_path = profile_dir / "output.csv"
-        exe_abs_path = Path(__file__).parent.absolute() / self.exe_path
-
-        try:
-            process = subprocess.Popen(
-                [str(exe_abs_path), str(settings_path.absolute()), str(output_path.absolute())],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1, universal_newlines=True
-            )
-            for line in iter(process.stdout.readline, ''):
-                self.output.emit(line.strip())
-            process.stdout.close()
-            process.wait()
-
-            if process.returncode != 0:
-                print(f"Error in simulation: {process.stderr.read()}")
-
-        except FileNotFoundError:
-            print(f"Error: Executable not found at {exe_abs_path}")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-        finally:
-            self.finished.emit()
-
-from PySide6.QtWidgets import QWidget, QGridLayout
+import math
+from PySide6.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QMessageBox
+from PySide6.QtCore import Signal, QTimer
+from settings_menu_widgets import (
+    SettingWidget, SettingWidgetContainer, CSVGenerateButton, JobQueuePanel, ShotPreviewPanel, CostEstimatePanel
+)
+from cost_estimate import RuntimeHistory, estimate, format_duration
+from simulation_jobs import JobQueue, JobState
+from preview_runner import PreviewRunner
+from simulation import SIMULATOR_DEFAULTS, Refinement
 
 class InitialSettingsMenu(QWidget):
     """Menu for configuring and launching the initial simulation settings."""
+    simulation_started = Signal(int)
+    rows_streamed = Signal(int, object)
+    simulation_finished = Signal(int)
+
+    PREVIEW_DELAY_MS = 100  # Coalesces a burst of keystrokes into one preview
+    JOB_REFRESH_MS = 16  # Coalesces job updates into one refresh per frame
+    WARN_ABOVE_S = 60  # Estimated run times above this are shown as a warning
+    CONFIRM_ABOVE_S = 600  # and above this have to be confirmed before they are queued
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.settings = {}
-        self.setStyleSheet(f"background-color: {cp.TRANSPARENT};")
+        self.job_queue = JobQueue("shootingsim.exe", parent=self)
+        self.runtime_history = RuntimeHistory()
+        self.preview_runner = PreviewRunner(self)
         
         # Main layout
         layout = QGridLayout(self)
@@ -66,6 +34,8 @@ class InitialSettingsMenu(QWidget):
         self.setLayout(layout)
 
         self._load_settings_widgets(layout)
+        self._update_preview()
+        self._update_estimate()
 
     def _load_settings_widgets(self, layout: QGridLayout):
         """Load and connect all the setting widgets."""
@@ -74,30 +44,77 @@ class InitialSettingsMenu(QWidget):
 
     def _create_setting_groups(self, layout: QGridLayout):
         """Create all the setting widget containers and their children."""
+        # (label, simulator key) per field; an empty field runs the simulator's default
         setting_definitions = {
-            "Angle Settings": ([("Max Angle", 42), ("Min Angle", 3.14), ("Angle Delta", 3.14)], 0, 0),
-            "Shooter Speed Settings": ([("Max Shooter Speed", 42), ("Min Shooter Speed", 3.14), ("Shooter Speed Delta", 3.14)], 1, 0),
-            "Target Settings": ([("Target Height", 42), ("Target Radius", 3.14), ("Distance Tolerance", 3.14)], 2, 0),
-            "Distance Settings": ([("Max Distance", 42), ("Min Distance", 3.14), ("Distance Delta", 3.14)], 0, 1),
-            "Robot Speed Settings": ([("Max Robot Speed", 42), ("Min Robot Speed", 3.14), ("Shooter Speed Delta", 3.14)], 1, 1),
+            "Angle Settings": ([("Max Angle", "maxangle"), ("Min Angle", "minangle"), ("Angle Delta", "deltaangle")], 0, 0),
+            "Shooter Speed Settings": ([
+                ("Max Shooter Speed", "maxspeed"), ("Min Shooter Speed", "minspeed"),
+                ("Speed Tolerance", "speedtolerancetostopsearch"),
+            ], 1, 0),
+            "Target Settings": ([
+                ("Target Height", "targetheight"), ("Target Radius", "targetradius"),
+                ("Distance Tolerance", "distancetolerance"),
+            ], 2, 0),
+            "Distance Settings": ([
+                ("Max Distance", "maxdistance"), ("Min Distance", "mindistance"), ("Distance Delta", "deltadistance"),
+            ], 0, 1),
+            # The simulator sweeps -max..max, so there is no min robot speed
+            "Robot Speed Settings": ([("Max Robot Speed", "maxrobotspeed"), ("Robot Speed Delta", "deltarobotspeed")], 1, 1),
         }
 
         for category, (settings, row, col) in setting_definitions.items():
             container = SettingWidgetContainer(category, self)
-            for name, val in settings:
-                setting_widget = SettingWidget(val, name, container)
+            for name, key in settings:
+                setting_widget = SettingWidget(SIMULATOR_DEFAULTS[key], name, container)
                 container.add_setting(setting_widget)
                 setting_widget.lineedit.textChanged.connect(
-                    lambda text, name=name: self._change_setting(name.lower().replace(" ", ""), text)
+                    lambda text, key=key: self._change_setting(key, text)
                 )
             layout.addWidget(container, row, col)
         
+        self.estimate_panel = CostEstimatePanel(self)
         self.csv_button = CSVGenerateButton("Generate CSV", self)
-        layout.addWidget(self.csv_button, 2, 1)
+        launch_layout = QVBoxLayout()
+        launch_layout.addWidget(self.estimate_panel)
+        launch_layout.addWidget(self.csv_button)
+        layout.addLayout(launch_layout, 2, 1)
+
+        self.queue_panel = JobQueuePanel(self.job_queue.max_processes, self)
+        layout.addWidget(self.queue_panel, 3, 0)
+
+        self.preview_panel = ShotPreviewPanel(self)
+        layout.addWidget(self.preview_panel, 3, 1)
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        # Job updates are applied at most once per frame, however many workers report
+        self.changed_jobs = {}
+        self.job_refresh_timer = QTimer(self)
+        self.job_refresh_timer.setSingleShot(True)
+        self.job_refresh_timer.setInterval(self.JOB_REFRESH_MS)
 
     def _connect_signals(self):
         """Connect widget signals to their respective slots."""
         self.csv_button.clicked.connect(self._run_simulation)
+        self.preview_timer.timeout.connect(self._update_preview)
+        self.preview_runner.computed.connect(self._show_preview)
+        self.preview_panel.sample_changed.connect(self.preview_timer.start)
+        self.job_refresh_timer.timeout.connect(self._refresh_jobs)
+
+        self.job_queue.job_changed.connect(self._on_job_changed)
+        self.job_queue.job_started.connect(self.simulation_started)
+        self.job_queue.job_rows.connect(self.rows_streamed)
+        self.job_queue.job_finished.connect(self.simulation_finished)
+        self.queue_panel.cancel_requested.connect(self.job_queue.cancel)
+        self.queue_panel.max_processes_changed.connect(self.job_queue.set_max_processes)
+        self.queue_panel.max_processes_changed.connect(lambda _: self._update_estimate())
+        self.queue_panel.incremental_changed.connect(lambda enabled: setattr(self.job_queue, "incremental", enabled))
+        self.queue_panel.trajectories_changed.connect(
+            lambda enabled: setattr(self.job_queue, "export_trajectories", enabled)
+        )
+        self.queue_panel.refine_changed.connect(
+            lambda enabled: setattr(self.job_queue, "refinement", Refinement() if enabled else None)
+        )
 
     def _change_setting(self, setting, value):
         """Update a setting value."""
@@ -110,35 +127,66 @@ class InitialSettingsMenu(QWidget):
                     del self.settings[setting]
         elif setting in self.settings:
             del self.settings[setting]
+        self.preview_timer.start()
+        self._update_estimate()
+
+    def _estimate(self):
+        return estimate(self.settings, self.job_queue.max_processes, self.runtime_history)
+
+    def _update_estimate(self):
+        """Shows the grid sizes and predicted run time of the current settings."""
+        cost = self._estimate()
+        self.estimate_panel.show_estimate(cost, cost.seconds > self.WARN_ABOVE_S)
+
+    def _update_preview(self):
+        """Computes the feasible shots at the preview's sample distance for the current settings, off the GUI thread."""
+        distance, robot_speed = self.preview_panel.sample()
+        self.preview_runner.request(distance, self.settings, robot_speed)
+
+    def _show_preview(self, shots, best, elapsed):
+        points = [
+            (math.degrees(angle), speed)
+            for angle, speed, found in zip(shots.angles.tolist(), shots.speeds.tolist(), shots.found.tolist()) if found
+        ]
+        best_point = None if best is None else (math.degrees(shots.angles[best]), float(shots.speeds[best]))
+        angle_range = (math.degrees(shots.angles[0]), math.degrees(shots.angles[-1])) if len(shots.angles) else (0.0, 90.0)
+        self.preview_panel.show_envelope(points, best_point, angle_range, elapsed)
 
     def _run_simulation(self):
-        """Run the simulation in a separate thread."""
-        self.csv_button.setEnabled(False)
-        generation_id = filemanagment.get_latest_id() + 1
-        
-        thread = QThread() # Make thread a local variable
-        worker = SimulationWorker(self.settings, generation_id, "shootingsim.exe") # Make worker a local variable
-        worker.moveToThread(thread)
-
-        worker.output.connect(self._update_progress)
-        thread.started.connect(worker.run)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater) # Worker deletes itself
-        thread.finished.connect(thread.deleteLater) # Thread deletes itself
-        worker.finished.connect(self._on_simulation_finish)
-        
-        thread.start()
-
-    def _update_progress(self, text):
-        """Update the progress bar on the CSV button."""
-        try:
-            progress_value = float(text.replace(" %", ""))
-            self.csv_button.set_progress(progress_value)
-        except (ValueError, AttributeError):
-            # Ignore lines that aren't progress updates
-            pass
-
-    def _on_simulation_finish(self):
-        """Reset the CSV button after the simulation finishes."""
-        self.csv_button.set_progress(0)
-        self.csv_button.setEnabled(True)
\ No newline at end of file
+        """Queue a simulation run of the current settings, once confirmed if it is long or ignores keys."""
+        cost = self._estimate()
+        reasons = []
+        if cost.seconds > self.CONFIRM_ABOVE_S:
+            reasons.append(f"This run is estimated to take {format_duration(cost.seconds)} ({cost.summary()}).")
+        if cost.ignored:
+            reasons.append(
+                f"The simulator ignores {', '.join(cost.ignored)} and runs its defaults instead."
+            )
+        if reasons and not self._confirm("\n\n".join(reasons + ["Queue it anyway?"])):
+            return
+        self.job_queue.submit(self.settings, priority=self.queue_panel.priority())
+
+    def _confirm(self, text):
+        answer = QMessageBox.question(self, "Queue simulation", text, QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
+
+    def abort_simulation(self, generation_id):
+        """Cancels the job writing the given profile."""
+        self.job_queue.cancel_profile(generation_id)
+
+    def _on_job_changed(self, job):
+        self.changed_jobs[job.id] = job
+        if not self.job_refresh_timer.isActive():
+            self.job_refresh_timer.start()
+
+    def _refresh_jobs(self):
+        """Refresh the queue panel and show the oldest running job's progress on the CSV button."""
+        for job in self.changed_jobs.values():
+            self.queue_panel.update_job(job)
+        self.changed_jobs.clear()
+
+        jobs = self.job_queue.jobs.values()
+        running = [j for j in jobs if j.state == JobState.RUNNING]
+        queued = sum(1 for j in jobs if j.state == JobState.QUEUED)
+        self.queue_panel.set_summary(len(running), queued)
+        self.csv_button.set_progress(min(running, key=lambda j: j.id).progress if running else 0)
@@ -1,11 +1,15 @@
+import time
+_STARTED = time.perf_counter()  # Before the imports, so the trace counts them
+
 import sys
+import threading
 from PySide6.QtWidgets import QApplication, QWidget, QHBoxLayout, QStackedWidget, QLabel
+from PySide6.QtCore import Qt, Signal
 from custom_widgets import State,BaseWidget, EventMixin
 from mode_selection_widgets import SideBar, SideBarButton
-from initial_settings_menu import InitialSettingsMenu
-from csv_view_widgets import CSVGrid
-from filemanagment import list_of_results
-import color_palette as cp
+from theme import apply_theme
+# The views' modules are imported when the view is first shown, the
+# background services' once they start
 
 # class testWidget(QWidget, EventMixin, QFrame):
 #     def __init__(self, parent):
@@ -18,13 +22,52 @@ import color_palette as cp
 #         self.parent_h = 0
 #         self.m = 0
 
+class StartupTrace:
+    """
+    Times startup phases from the first line of main.py to the first paint.
+
+    Each mark() records the time since the previous one. report() lists the
+    phases and flags a time to first paint over budget_ms.
+    """
+    def __init__(self, started=_STARTED, budget_ms=None):
+        self.started = started
+        self.last = started
+        self.budget_ms = budget_ms
+        self.phases = []  # (name, seconds)
+        self.first_paint = None  # seconds from start
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def paint(self):
+        if self.first_paint is None:
+            self.mark("first paint")
+            self.first_paint = self.last - self.started
+
+    @property
+    def over_budget(self):
+        return self.budget_ms is not None and self.first_paint is not None and self.first_paint * 1000 > self.budget_ms
+
+    def report(self):
+        lines = [f"  {name:<24} {seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        total = f"Time to first paint: {self.first_paint * 1000:.1f} ms"
+        if self.budget_ms is not None:
+            total += f" (budget {self.budget_ms:.0f} ms{', OVER BUDGET' if self.over_budget else ''})"
+        return "\n".join(["Startup trace:", *lines, total])
+
 class MainWindow(QWidget):
     """Main window for the Trajectory Lab application."""
+    first_painted = Signal()
 
-    def __init__(self):
+    VIEW_COUNT = 4
+
+    def __init__(self, trace=None):
         super().__init__()
+        self.trace = trace
+        self._painted = False
         self.setWindowTitle("Trajectory Lab")
-        self.setStyleSheet(f"background-color: {cp.BACKGROUND_STYLES['main_window']['color']};")
         self.resize(800, 600)
         
         # Main layout
@@ -47,6 +90,7 @@ class MainWindow(QWidget):
 
         self.setLayout(main_layout)
         self.set_current_window(0)
+        self._mark("settings view")
 
     def _create_sidebar(self):
         """Create the mode selection sidebar."""
@@ -55,7 +99,8 @@ class MainWindow(QWidget):
         buttons_config = [
             (" Initial Settings ", True),
             (" CSV View ", False),
-            (" Poly Functions ", False)
+            (" Poly Functions ", False),
+            (" Compare ", False)
         ]
         
         self.sidebar_buttons = []
@@ -67,49 +112,167 @@ class MainWindow(QWidget):
         self.sidebar_buttons[0].clicked.connect(lambda: self.set_current_window(0))
         self.sidebar_buttons[1].clicked.connect(lambda: self.set_current_window(1))
         self.sidebar_buttons[2].clicked.connect(lambda: self.set_current_window(2))
+        self.sidebar_buttons[3].clicked.connect(lambda: self.set_current_window(3))
         
         return sidebar
 
+    def _mark(self, name):
+        if self.trace is not None:
+            self.trace.mark(name)
+
     def _populate_views(self):
-        """Load and initialize all UI widgets into the stacked widget."""
-        self.initial_settings_menu = InitialSettingsMenu()
-        self.csv_showcase = CSVGrid(
-            results=list_of_results(include_output=False, include_settings=False)
-        )
-        
-        # Placeholder for "Poly Functions"
-        poly_functions_placeholder = QWidget()
-        poly_functions_placeholder.setStyleSheet("background-color: #2c3e50;")
+        """Add a placeholder page per view; each view is built when first needed."""
+        self.views = {}  # index -> built view
+        for _ in range(self.VIEW_COUNT):
+            self.stacked_widget.addWidget(QWidget())
+        self._mark("sidebar and window")
+
+    def _build_view(self, index):
+        if index == 0:
+            from initial_settings_menu import InitialSettingsMenu
+            view = InitialSettingsMenu()
+            # Stream rows of a running simulation into the grid's live views; the
+            # grid is built when the first run starts, so it sees all its rows
+            view.simulation_started.connect(lambda profile_id: self.csv_showcase.start_live_run(profile_id))
+            view.rows_streamed.connect(lambda profile_id, rows: self.csv_showcase.append_live_rows(profile_id, rows))
+            view.simulation_finished.connect(lambda profile_id: self.csv_showcase.finish_live_run(profile_id))
+        elif index == 1:
+            from csv_view_widgets import CSVGrid
+            # Filled by set_current_window, off the GUI thread
+            view = CSVGrid(results=[])
+            view.abort_requested.connect(self.initial_settings_menu.abort_simulation)
+        elif index == 2:
+            from poly_functions_widgets import PolyFunctionsView
+            view = PolyFunctionsView()
+        else:
+            from profile_diff_widgets import ProfileDiffView
+            view = ProfileDiffView()
+        return view
+
+    def _view(self, index):
+        """Returns the view at index, replacing its placeholder page on first use."""
+        view = self.views.get(index)
+        if view is None:
+            start = time.perf_counter()
+            view = self.views[index] = self._build_view(index)
+            placeholder = self.stacked_widget.widget(index)
+            self.stacked_widget.insertWidget(index, view)
+            self.stacked_widget.removeWidget(placeholder)
+            placeholder.deleteLater()
+            if self.trace is not None and self._painted:
+                print(f"Built {type(view).__name__} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return view
+
+    @property
+    def initial_settings_menu(self):
+        return self._view(0)
 
-        self.stacked_widget.addWidget(self.initial_settings_menu)
-        self.stacked_widget.addWidget(self.csv_showcase)
-        self.stacked_widget.addWidget(poly_functions_placeholder)
+    @property
+    def csv_showcase(self):
+        return self._view(1)
+
+    @property
+    def poly_functions(self):
+        return self._view(2)
+
+    @property
+    def profile_diff(self):
+        return self._view(3)
+
+    def warm_profiles(self):
+        """Syncs the profile catalog on a background thread, off the path to the first paint."""
+        from filemanagment import list_of_results
+        threading.Thread(target=list_of_results, daemon=True).start()
+
+    def start_profile_store(self):
+        """Starts compressing cold profiles and applying the retention policy in the background."""
+        from profile_store import ProfileStore
+        self.profile_store = ProfileStore(protected=self._active_profiles)
+        self.profile_store.start()
+
+    def start_simulator_pool(self):
+        """Warms the simulators the run queue reuses, so a run doesn't wait for process launches."""
+        self.initial_settings_menu.job_queue.start_pool()
+
+    def _active_profiles(self):
+        # Read from the store's thread; the list() copy keeps it from iterating a changing dict
+        if 0 not in self.views:
+            return set()
+        jobs = list(self.views[0].job_queue.jobs.values())
+        return {job.profile_id for job in jobs if not job.done and job.profile_id is not None}
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            if self.trace is not None:
+                self.trace.paint()
+                print(self.trace.report(), flush=True)
+            self.first_painted.emit()
 
     def set_current_window(self, index):
         """Switch between different views in the main window."""
-        self.stacked_widget.setCurrentIndex(index)
+        self.stacked_widget.setCurrentIndex(self.stacked_widget.indexOf(self._view(index)))
         
         for i, button in enumerate(self.sidebar_buttons):
             button.set_pressed(i == index)
 
+        if index != 1 and 1 in self.views:
+            self.views[1].cancel_loading()
+
         if index == 1: # CSV View is selected
-            self.csv_showcase.update_results(list_of_results(include_output=False, include_settings=False))
+            self.csv_showcase.reload()
+        elif index == 2: # Poly Functions is selected
+            self.poly_functions.refresh()
+        elif index == 3: # Compare is selected
+            self.profile_diff.refresh()
 
 
 
 class App:
-    """Main application class."""
+    """
+    Main application class.
+
+    python main.py [--startup-trace] [--startup-budget MS]
 
-    def __init__(self):
-        self.app = QApplication(sys.argv)
-        self.window = MainWindow()
+    --startup-trace prints the time of each startup phase and to the first
+    paint. --startup-budget also quits right after the first paint and exits
+    non-zero if it took longer than MS milliseconds.
+    """
+
+    def __init__(self, argv):
+        budget_ms = None
+        if "--startup-budget" in argv:
+            budget_ms = float(argv[argv.index("--startup-budget") + 1])
+        self.quit_after_paint = budget_ms is not None
+        self.trace = StartupTrace(budget_ms=budget_ms) if "--startup-trace" in argv or self.quit_after_paint else None
+        if self.trace is not None:
+            self.trace.mark("imports")
+
+        self.app = QApplication(argv)
+        apply_theme(self.app)
+        if self.trace is not None:
+            self.trace.mark("application and theme")
+        self.window = MainWindow(self.trace)
+        # Queued, so it runs once the first frame is done
+        self.window.first_painted.connect(self._after_first_paint, Qt.QueuedConnection)
 
     def run(self):
         """Show the main window and run the application."""
         self.window.show()
+        if self.trace is not None:
+            self.trace.mark("show")
         sys.exit(self.app.exec())
 
+    def _after_first_paint(self):
+        if self.quit_after_paint:
+            # Only the startup is measured, so the background services never start
+            self.app.exit(1 if self.trace.over_budget else 0)
+            return
+        self.window.warm_profiles()
+        self.window.start_profile_store()
+        self.window.start_simulator_pool()
+
 if __name__ == "__main__":
-    import threading
-    app = App()
+    app = App(sys.argv)
     app.run()
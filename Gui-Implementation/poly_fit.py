@@ -0,0 +1,123 @@
+import numpy as np
+import filemanagment
+
+def exponents_2d(degree):
+    """(distance, robot speed) exponent pairs of a full polynomial of the given total degree, highest first."""
+    return [(p, total - p) for total in range(degree, -1, -1) for p in range(total, -1, -1)]
+
+def exponents_1d(degree):
+    """Distance exponents of a polynomial of the given degree, highest first."""
+    return [(p, 0) for p in range(degree, -1, -1)]
+
+def _power_terms(distances, robot_speeds, exponents):
+    """Returns the monomials of `exponents` evaluated at every point, shaped (points, terms)."""
+    degree = max(max(p, q) for p, q in exponents)
+    d_powers = np.power.outer(distances, np.arange(degree + 1))
+    v_powers = np.power.outer(robot_speeds, np.arange(degree + 1))
+    p, q = np.array(exponents).T
+    return d_powers[:, p] * v_powers[:, q]
+
+class PolyFit:
+    """Least-squares polynomials of shooter speed and angle over distance (and robot speed)."""
+    def __init__(self, exponents, coefficients, residuals, robot_speed=None):
+        self.exponents = exponents
+        self.coefficients = coefficients  # shaped (terms, 2): speed, angle
+        self.robot_speed = robot_speed  # fixed robot speed of a 1D fit
+        self.rows = len(residuals)
+        self.rms_error = np.sqrt(np.mean(residuals ** 2, axis=0)) if self.rows else np.full(2, np.nan)
+        self.max_error = np.max(np.abs(residuals), axis=0) if self.rows else np.full(2, np.nan)
+
+    @property
+    def degree(self):
+        return max(p + q for p, q in self.exponents)
+
+    @property
+    def is_2d(self):
+        return self.robot_speed is None
+
+    def evaluate(self, distances, robot_speeds=0.0):
+        """Returns (speeds, angles) for batches of points; robot speed is ignored by 1D fits."""
+        distances, robot_speeds = np.broadcast_arrays(
+            np.asarray(distances, dtype=np.float64), np.asarray(robot_speeds, dtype=np.float64)
+        )
+        # Accumulating term by term over shared power arrays keeps memory at a
+        # few arrays of the batch size instead of a (points, terms) matrix
+        d_powers = [np.ones(distances.shape)]
+        v_powers = [np.ones(distances.shape)]
+        for _ in range(self.degree):
+            d_powers.append(d_powers[-1] * distances)
+            v_powers.append(v_powers[-1] * robot_speeds)
+
+        speeds = np.zeros(distances.shape)
+        angles = np.zeros(distances.shape)
+        for (p, q), (speed_coefficient, angle_coefficient) in zip(self.exponents, self.coefficients):
+            term = d_powers[p] * v_powers[q] if q else d_powers[p]
+            speeds += speed_coefficient * term
+            angles += angle_coefficient * term
+        return speeds, angles
+
+    def to_go(self):
+        """Formats the fit as Go functions in the style of funcs/angleSpeedFuncs.go."""
+        functions = []
+        for name, column, accumulator in (("ShootingSpeed", 0, "speed"), ("ShootingAngle", 1, "angle")):
+            lines = [f"func {name}(dist float64, vel float64) float64 {{", f"\t{accumulator} := 0.0", ""]
+            for (p, q), coefficient in zip(self.exponents, self.coefficients[:, column]):
+                factors = ["dist"] * p + ["vel"] * q
+                term = " * ".join([f"{coefficient:.9g}"] + factors)
+                lines.append(f"\t{accumulator} += {term}")
+            lines += ["", f"\treturn {accumulator}", "}"]
+            functions.append("\n".join(lines))
+        return "\n\n".join(functions)
+
+def fit_table(table, degree, robot_speed=None):
+    """
+    Fits speed and angle of a ResultTable in one least-squares solve.
+
+    With robot_speed set, a 1D polynomial in distance is fitted to the rows
+    simulated at the robot speed nearest to it; otherwise a full 2D polynomial of total
+    degree `degree` in distance and robot speed is fitted to all rows.
+    Returns None when there are fewer rows than coefficients.
+    """
+    distances = table.column("distance").astype(np.float64)
+    robot_speeds = table.column("robot-speed").astype(np.float64)
+    targets = np.column_stack([table.column("speed"), table.column("angle")]).astype(np.float64)
+
+    if robot_speed is None:
+        exponents = exponents_2d(degree)
+    else:
+        exponents = exponents_1d(degree)
+        if len(robot_speeds) == 0:
+            return None
+        # Fit the simulated robot speed line nearest to the requested one
+        robot_speed = float(robot_speeds[np.argmin(np.abs(robot_speeds - robot_speed))])
+        rows = robot_speeds == robot_speed
+        distances, robot_speeds, targets = distances[rows], robot_speeds[rows], targets[rows]
+
+    if len(distances) < len(exponents):
+        return None
+
+    terms = _power_terms(distances, robot_speeds, exponents)
+    coefficients, *_ = np.linalg.lstsq(terms, targets, rcond=None)
+    residuals = terms @ coefficients - targets
+    return PolyFit(exponents, coefficients, residuals, robot_speed)
+
+class PolyFitter:
+    """Fits profiles, caching each fit per profile, output version, degree and robot speed."""
+    def __init__(self):
+        self._cache = {}
+
+    def fit(self, profile_id, degree, robot_speed=None):
+        csv_path = filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "output.csv"
+        stored = filemanagment.output_file(csv_path)
+        if stored is None:
+            return None
+        version = (stored.name, stored.stat().st_mtime_ns)
+
+        key = (profile_id, version, degree, robot_speed)
+        if key not in self._cache:
+            table = filemanagment.read_table(csv_path)
+            self._cache[key] = fit_table(table, degree, robot_speed) if table is not None else None
+        return self._cache[key]
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,106 @@
+from PySide6.QtWidgets import (
+    QFrame, QLabel, QVBoxLayout, QHBoxLayout, QSpinBox, QDoubleSpinBox,
+    QComboBox, QPlainTextEdit
+)
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt
+from settings_menu_widgets import ProfileSelector
+import filemanagment
+from filemanagment import get_latest_id
+from poly_fit import PolyFitter
+
+class PolyFunctionsView(QFrame):
+    """Fits shooter speed and angle polynomials to a profile and shows them as Go code."""
+    MODES = ["2D (distance, robot speed)", "1D (distance)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.fitter = PolyFitter()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        controls_layout = QHBoxLayout()
+        self.profile_selector = ProfileSelector(get_latest_id())
+        self.profile_selector.editingFinished.connect(self.refit)
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(self.MODES)
+        self.mode_combo.currentIndexChanged.connect(self.refit)
+        self.degree_spin = QSpinBox()
+        self.degree_spin.setRange(1, 8)
+        self.degree_spin.setValue(3)  # As in funcs/angleSpeedFuncs.go
+        self.degree_spin.valueChanged.connect(self.refit)
+        self.robot_speed_spin = QDoubleSpinBox()
+        self.robot_speed_spin.setRange(-10, 10)
+        self.robot_speed_spin.setSingleStep(0.01)
+        self.robot_speed_spin.valueChanged.connect(self.refit)
+
+        controls_layout.addWidget(QLabel("Profile"))
+        controls_layout.addWidget(self.profile_selector)
+        controls_layout.addWidget(self.mode_combo)
+        controls_layout.addWidget(QLabel("Degree"))
+        controls_layout.addWidget(self.degree_spin)
+        controls_layout.addWidget(QLabel("Robot speed"))
+        controls_layout.addWidget(self.robot_speed_spin)
+        layout.addLayout(controls_layout)
+
+        self.report_label = QLabel("")
+        layout.addWidget(self.report_label)
+
+        self.code_edit = QPlainTextEdit()
+        self.code_edit.setReadOnly(True)
+        self.code_edit.setFont(QFont("Monospace"))
+        layout.addWidget(self.code_edit)
+
+        self.setLayout(layout)
+
+    def profile_id(self):
+        text = self.profile_selector.text().strip() or self.profile_selector.placeholderText()
+        try:
+            return int(text)
+        except ValueError:
+            return None
+
+    def refresh(self):
+        """Points the selector's default at the newest profile and refits."""
+        self.profile_selector.setPlaceholderText(str(get_latest_id()))
+        self.refit()
+
+    def refit(self):
+        is_2d = self.mode_combo.currentIndex() == 0
+        self.robot_speed_spin.setEnabled(not is_2d)
+
+        profile_id = self.profile_id()
+        if profile_id is None:
+            self._show_error("Enter a profile number")
+            return
+
+        profile_dir = filemanagment.PROFILES_PATH / f"profile_{profile_id}"
+        if not profile_dir.is_dir():
+            self._show_error(f"Profile {profile_id} doesn't exist")
+            return
+        if filemanagment.output_file(profile_dir / "output.csv") is None:
+            self._show_error(f"Profile {profile_id} has no results yet")
+            return
+
+        robot_speed = None if is_2d else round(self.robot_speed_spin.value(), 2)
+        fit = self.fitter.fit(profile_id, self.degree_spin.value(), robot_speed)
+        if fit is None:
+            self._show_error(f"Profile {profile_id} has too few results for a degree {self.degree_spin.value()} fit")
+            return
+
+        rms_speed, rms_angle = fit.rms_error
+        max_speed, max_angle = fit.max_error
+        line = "" if fit.is_2d else f" at robot speed {fit.robot_speed:.2f}"
+        self.report_label.setText(
+            f"{fit.rows} rows{line}, {len(fit.exponents)} coefficients | "
+            f"speed RMS {rms_speed:.4f} max {max_speed:.4f} m/s | "
+            f"angle RMS {rms_angle:.5f} max {max_angle:.5f} rad"
+        )
+        self.code_edit.setPlainText(fit.to_go())
+
+    def _show_error(self, message):
+        self.report_label.setText(message)
+        self.code_edit.clear()
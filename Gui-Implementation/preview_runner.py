@@ -0,0 +1,53 @@
+import threading
+import time
+from PySide6.QtCore import QObject, Signal
+from trajectory_preview import shot_envelope
+
+class PreviewRunner(QObject):
+    """
+    Computes shot_envelope() off the GUI thread, on a daemon thread of its own.
+
+    Only the latest request counts: one made while another is computed
+    replaces any request still waiting, and the result of a request that
+    has been superseded is dropped, so a burst of edits costs at most one
+    stale computation. `computed` reaches slots of GUI objects queued.
+    """
+    computed = Signal(object, object, float)  # ShotBatch, best index or None, seconds taken
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._request = None  # (distance, settings, robot speed) waiting to be computed
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def request(self, distance, settings, robot_speed=0.0):
+        with self._condition:
+            self._request = (distance, dict(settings), robot_speed)
+            self._condition.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._request is None:
+                    self._condition.wait()
+                request, self._request = self._request, None
+
+            start = time.perf_counter()
+            try:
+                shots, best = shot_envelope(*request)
+            except Exception as e:
+                print(f"Error computing the shot preview: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+
+            with self._condition:
+                if self._request is not None:
+                    continue
+            try:
+                self.computed.emit(shots, best, elapsed)
+            except RuntimeError:
+                # The runner was deleted with its window
+                return
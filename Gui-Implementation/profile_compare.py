@@ -0,0 +1,149 @@
+import sys
+import time
+import numpy as np
+import filemanagment
+
+KEY_COLUMNS = ("distance", "robot-speed")
+COMPARED_COLUMNS = ("speed", "angle", "max-height")
+# Grid coordinates are written with 2 decimals (see simulation.cell_key), so
+# scaled by this they are exact integers to join on
+KEY_SCALE = 100
+# Robot speed keys are offset into the low bits of the joined key
+SPEED_KEY_BITS = 24
+
+def _cell_keys(table):
+    """One int64 per row combining its (distance, robot speed) grid coordinates."""
+    distances = np.rint(table.column("distance").astype(np.float64) * KEY_SCALE).astype(np.int64)
+    speeds = np.rint(table.column("robot-speed").astype(np.float64) * KEY_SCALE).astype(np.int64)
+    return (distances << SPEED_KEY_BITS) + (speeds + (1 << (SPEED_KEY_BITS - 1)))
+
+class ProfileComparison:
+    """
+    Profiles aligned on the union of their grid cells.
+
+    values[column] is shaped (profiles, cells) with NaN where a profile has no
+    row for a cell, present[i] marks the cells profile i has. Deltas are taken
+    against the first profile, the base.
+    """
+    def __init__(self, profile_ids, keys, present, values):
+        self.profile_ids = list(profile_ids)
+        self.keys = keys  # sorted cell keys
+        self.present = present  # bool, shaped (profiles, cells)
+        self.values = values  # column -> float32 array shaped (profiles, cells)
+        self.distance = (keys >> SPEED_KEY_BITS) / KEY_SCALE
+        self.robot_speed = ((keys & ((1 << SPEED_KEY_BITS) - 1)) - (1 << (SPEED_KEY_BITS - 1))) / KEY_SCALE
+
+    def __len__(self):
+        return len(self.keys)
+
+    def delta(self, column, index=1):
+        """Per-cell change of a column from the base to profile `index`, NaN where either lacks the cell."""
+        values = self.values[column]
+        return values[index] - values[0]
+
+    def only_in(self, index):
+        """Cells that profile `index` has and no other profile has."""
+        return self.present[index] & (self.present.sum(axis=0) == 1)
+
+    def in_all(self):
+        return self.present.all(axis=0)
+
+    def changed(self, tolerance=0.0):
+        """Cells missing from some profile or whose compared values differ by more than tolerance."""
+        changed = ~self.in_all()
+        for column in COMPARED_COLUMNS:
+            values = self.values[column]
+            with np.errstate(invalid="ignore"):
+                changed |= (np.abs(values[1:] - values[0]) > tolerance).any(axis=0)
+        return changed
+
+    def summary(self, tolerance=0.0):
+        """
+        Returns a dict of the cell counts and, per other profile and compared
+        column, the count of cells that changed and the mean, RMS and largest
+        absolute change over the cells both profiles have.
+        """
+        summary = {
+            "cells": len(self),
+            "in_all": int(self.in_all().sum()),
+            "only_in": {pid: int(self.only_in(i).sum()) for i, pid in enumerate(self.profile_ids)},
+            "deltas": {},
+        }
+        for i, profile_id in enumerate(self.profile_ids[1:], start=1):
+            shared = self.present[0] & self.present[i]
+            stats = {}
+            for column in COMPARED_COLUMNS:
+                delta = np.abs(self.delta(column, i)[shared]).astype(np.float64)
+                stats[column] = {
+                    "changed": int((delta > tolerance).sum()),
+                    "mean": float(delta.mean()) if len(delta) else 0.0,
+                    "rms": float(np.sqrt(np.mean(delta ** 2))) if len(delta) else 0.0,
+                    "max": float(delta.max()) if len(delta) else 0.0,
+                }
+            summary["deltas"][profile_id] = stats
+        return summary
+
+def compare_tables(profile_ids, tables):
+    """Aligns ResultTables on their grid cells with sorted-key joins."""
+    keys = [_cell_keys(table) for table in tables]
+    union = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+
+    present = np.zeros((len(tables), len(union)), dtype=bool)
+    values = {column: np.full((len(tables), len(union)), np.nan, dtype=np.float32) for column in COMPARED_COLUMNS}
+    for i, (table, table_keys) in enumerate(zip(tables, keys)):
+        positions = np.searchsorted(union, table_keys)
+        present[i, positions] = True
+        for column in COMPARED_COLUMNS:
+            values[column][i, positions] = table.column(column)
+    return ProfileComparison(profile_ids, union, present, values)
+
+def compare_profiles(profile_ids):
+    """Compares the outputs of two or more profiles, or returns None if one can't be read."""
+    tables = []
+    for profile_id in profile_ids:
+        table = filemanagment.read_table(filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "output.csv")
+        if table is None:
+            return None
+        tables.append(table)
+    return compare_tables(profile_ids, tables)
+
+def format_summary(summary):
+    lines = [f"{summary['cells']} cells, {summary['in_all']} in every profile"]
+    for profile_id, count in summary["only_in"].items():
+        if count:
+            lines.append(f"  {count} only in profile_{profile_id}")
+    for profile_id, stats in summary["deltas"].items():
+        lines.append(f"profile_{profile_id} against the base:")
+        for column, s in stats.items():
+            lines.append(
+                f"  {column:<11} {s['changed']:8d} changed  mean {s['mean']:.4g}  rms {s['rms']:.4g}  max {s['max']:.4g}"
+            )
+    return "\n".join(lines)
+
+def main(argv):
+    """
+    python profile_compare.py [--tolerance T] BASE_ID OTHER_ID [OTHER_ID ...]
+
+    Prints which cells the profiles share and how much their speed, angle and
+    max height differ from the base profile's.
+    """
+    tolerance = 0.0
+    if len(argv) >= 2 and argv[0] == "--tolerance":
+        tolerance = float(argv[1])
+        argv = argv[2:]
+    if len(argv) < 2:
+        print(main.__doc__)
+        return 2
+
+    start = time.perf_counter()
+    comparison = compare_profiles([int(arg) for arg in argv])
+    if comparison is None:
+        return 1
+    summary = comparison.summary(tolerance)
+    elapsed = time.perf_counter() - start
+    print(format_summary(summary))
+    print(f"Compared in {elapsed * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+import math
+import numpy as np
+from PySide6.QtWidgets import (
+    QFrame, QLabel, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView, QDoubleSpinBox, QCheckBox
+)
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from settings_menu_widgets import ProfileSelector
+from filemanagment import get_latest_id
+from profile_compare import COMPARED_COLUMNS, compare_profiles, format_summary
+import color_palette as cp
+
+def _tinted(color, alpha):
+    color = QColor(color)
+    color.setAlpha(alpha)
+    return color
+
+class ComparisonTableModel(QAbstractTableModel):
+    """
+    Read-only model over a ProfileComparison: the grid coordinates, each
+    compared column per profile, then its change from the base per other
+    profile. Shown cells are an index array into the comparison, so
+    filtering to changed cells is one NumPy call, and cells are formatted on
+    demand. Missing values and changes beyond the tolerance are highlighted.
+    """
+    MISSING = _tinted(cp.WARNING, 70)
+    INCREASED = _tinted(cp.SUCCESS, 70)
+    DECREASED = _tinted(cp.ERROR, 70)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.comparison = None
+        self.tolerance = 0.0
+        self.columns = []  # (header, values shaped (cells,), is delta)
+        self.cells = np.empty(0, dtype=np.intp)
+
+    def set_comparison(self, comparison, tolerance=0.0, changed_only=False):
+        self.beginResetModel()
+        self.comparison = comparison
+        self.tolerance = tolerance
+        self.columns = [("distance", comparison.distance, False), ("robot-speed", comparison.robot_speed, False)]
+        ids = comparison.profile_ids
+        for column in COMPARED_COLUMNS:
+            self.columns += [(f"{column} #{pid}", comparison.values[column][i], False) for i, pid in enumerate(ids)]
+            self.columns += [
+                (f"Δ {column} #{pid}", comparison.delta(column, i), True) for i, pid in enumerate(ids[1:], start=1)
+            ]
+        self.cells = np.flatnonzero(comparison.changed(tolerance)) if changed_only else np.arange(len(comparison))
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.comparison = None
+        self.columns = []
+        self.cells = np.empty(0, dtype=np.intp)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cells)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.BackgroundRole):
+            return None
+        _, values, is_delta = self.columns[index.column()]
+        value = float(values[self.cells[index.row()]])
+        if role == Qt.DisplayRole:
+            return "-" if math.isnan(value) else f"{value:.6g}"
+        if math.isnan(value):
+            return self.MISSING
+        if is_delta and abs(value) > self.tolerance:
+            return self.INCREASED if value > 0 else self.DECREASED
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return str(section + 1)
+
+class ProfileDiffView(QFrame):
+    """Compares the outputs of two or more profiles cell by cell."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.comparison = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        controls_layout = QHBoxLayout()
+        self.profile_selector = ProfileSelector()
+        self.profile_selector.setToolTip("Profile numbers, separated by commas; the first one is the base")
+        self.profile_selector.editingFinished.connect(self.recompare)
+        self.tolerance_spin = QDoubleSpinBox()
+        self.tolerance_spin.setDecimals(5)
+        self.tolerance_spin.setRange(0, 100)
+        self.tolerance_spin.setSingleStep(0.001)
+        self.tolerance_spin.valueChanged.connect(self._show_comparison)
+        self.changed_check = QCheckBox("Changed cells only")
+        self.changed_check.toggled.connect(self._show_comparison)
+
+        controls_layout.addWidget(QLabel("Profiles"))
+        controls_layout.addWidget(self.profile_selector)
+        controls_layout.addWidget(QLabel("Tolerance"))
+        controls_layout.addWidget(self.tolerance_spin)
+        controls_layout.addWidget(self.changed_check)
+        layout.addLayout(controls_layout)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setFont(QFont("Monospace"))
+        layout.addWidget(self.summary_label)
+
+        self.model = ComparisonTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+    def profile_ids(self):
+        text = self.profile_selector.text().strip() or self.profile_selector.placeholderText()
+        try:
+            return [int(part) for part in text.replace(" ", ",").split(",") if part]
+        except ValueError:
+            return None
+
+    def refresh(self):
+        """Points the selector's default at the two newest profiles."""
+        latest = get_latest_id()
+        self.profile_selector.setPlaceholderText(f"{latest - 1}, {latest}" if latest >= 1 else "")
+        self.recompare()
+
+    def recompare(self):
+        profile_ids = self.profile_ids()
+        if not profile_ids or len(profile_ids) < 2:
+            self._show_error("Enter two or more profile numbers, the base first")
+            return
+        self.comparison = compare_profiles(profile_ids)
+        if self.comparison is None:
+            self._show_error("A profile has no output to compare")
+            return
+        self._show_comparison()
+
+    def _show_comparison(self):
+        if self.comparison is None:
+            return
+        tolerance = self.tolerance_spin.value()
+        self.model.set_comparison(self.comparison, tolerance, self.changed_check.isChecked())
+        self.summary_label.setText(format_summary(self.comparison.summary(tolerance)))
+
+    def _show_error(self, message):
+        self.comparison = None
+        self.summary_label.setText(message)
+        self.model.clear()
@@ -0,0 +1,119 @@
+import threading
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+import filemanagment
+
+class LoadStats:
+    """
+    Throughput of a profile load: profiles and output rows read in `elapsed` seconds.
+
+    `error` holds the exception that ended a load early, if one did.
+    """
+    def __init__(self):
+        self.profiles = 0
+        self.rows = 0
+        self.elapsed = 0.0
+        self.done = False
+        self.error = None
+
+    @property
+    def profiles_per_second(self):
+        return self.profiles / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        rows = f", {self.rows} rows ({self.rows_per_second:,.0f}/s)" if self.rows else ""
+        error = f", stopped by error: {self.error}" if self.error is not None else ""
+        return (
+            f"{self.profiles} profiles in {self.elapsed * 1000:.0f} ms "
+            f"({self.profiles_per_second:,.0f}/s){rows}{error}"
+        )
+
+class ProfileLoader(QObject):
+    """
+    Loads profiles off the GUI thread with filemanagment.iter_results().
+
+    Loaded Results are collected by the loading thread and handed to the GUI
+    thread in batches, at most one `loaded` signal per DELIVER_MS, so a bulk
+    load never floods the event loop. A new load() or cancel() drops the
+    running load; its remaining results are never delivered.
+    """
+    loaded = Signal(object)  # list of Results, in load order
+    finished = Signal(object)  # LoadStats
+
+    DELIVER_MS = 16
+
+    def __init__(self, workers=None, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        self._cancelled = None  # threading.Event of the running load
+        self._stats = None  # LoadStats of the running load
+        self._pending = []
+        self._lock = threading.Lock()
+        self._deliver_timer = QTimer(self)
+        self._deliver_timer.setInterval(self.DELIVER_MS)
+        self._deliver_timer.timeout.connect(self._deliver)
+
+    @property
+    def loading(self):
+        return self._cancelled is not None
+
+    def load(self, profile_ids=None, include_output=False, include_settings=False):
+        """Starts loading the profiles (every profile if profile_ids is None), dropping a running load."""
+        self.cancel()
+        self._cancelled = threading.Event()
+        self._stats = LoadStats()
+        threading.Thread(
+            target=self._run, args=(self._cancelled, self._stats, profile_ids, include_output, include_settings),
+            daemon=True
+        ).start()
+        self._deliver_timer.start()
+
+    def cancel(self):
+        if self._cancelled is None:
+            return
+        with self._lock:
+            self._cancelled.set()
+            self._pending = []
+        self._cancelled = None
+        self._deliver_timer.stop()
+
+    def _run(self, cancelled, stats, profile_ids, include_output, include_settings):
+        start = time.perf_counter()
+        try:
+            results = filemanagment.iter_results(
+                profile_ids, include_output, include_settings, workers=self.workers, cancelled=cancelled
+            )
+            for result in results:
+                with self._lock:
+                    # Checked under the lock, so nothing of a cancelled load reaches the next one
+                    if not cancelled.is_set():
+                        self._pending.append(result)
+                if cancelled.is_set():
+                    results.close()
+                    return
+                stats.profiles += 1
+                stats.rows += len(result.output)
+        except Exception as e:
+            print(f"Error loading profiles: {e}")
+            stats.error = e
+        finally:
+            # Always ends the load, so `finished` fires and the current cards are replaced
+            stats.elapsed = time.perf_counter() - start
+            stats.done = True
+
+    def _deliver(self):
+        stats = self._stats
+        # Read before taking the batch: once done, every result is pending
+        done = stats.done
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.loaded.emit(batch)
+        if done:
+            self._deliver_timer.stop()
+            self._cancelled = None
+            self.finished.emit(stats)
@@ -0,0 +1,234 @@
+"""
+Keeps the profiles directory bounded: outputs nobody used for a while are
+gzip-compressed in place (filemanagment reads them transparently), and a
+retention policy deletes the least recently used profiles beyond a count or
+a byte quota. The GUI runs a compaction pass in the background; it can also
+be run by hand:
+
+    python profile_store.py [--keep-last N] [--max-bytes BYTES] [--compress-after-days D] [--dry-run]
+
+Options left out come from profiles/retention.json, if there is one.
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+import filemanagment
+from result_cache import ResultCache
+
+class RetentionPolicy:
+    """
+    Outputs unused for compress_after_days are compressed. keep_last and
+    max_bytes (None for no limit) bound how many profiles and how many bytes
+    are kept; the most recently used profiles are kept first.
+    """
+    FILE_NAME = "retention.json"
+    KEYS = ("compress_after_days", "keep_last", "max_bytes")
+
+    def __init__(self, compress_after_days=7, keep_last=None, max_bytes=None):
+        self.compress_after_days = compress_after_days
+        self.keep_last = keep_last
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def load(cls, root: Path = None):
+        """Reads the policy from root/retention.json, or returns the defaults."""
+        path = Path(root if root is not None else filemanagment.PROFILES_PATH) / cls.FILE_NAME
+        if not path.is_file():
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                values = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading retention policy {path}: {e}")
+            return cls()
+        return cls(**{key: values[key] for key in cls.KEYS if key in values})
+
+    def __str__(self):
+        return (
+            f"RetentionPolicy(compress_after_days={self.compress_after_days}, "
+            f"keep_last={self.keep_last}, max_bytes={self.max_bytes})"
+        )
+
+class ProfileUsage:
+    """Disk use and last use of one profile."""
+    def __init__(self, profile_id, size, last_used, output):
+        self.id = profile_id
+        self.size = size  # bytes of all its files
+        self.last_used = last_used  # time.time() of the last read or write
+        self.output = output  # stored output file, or None
+
+    @property
+    def compressed(self):
+        return self.output is not None and self.output.name.endswith(filemanagment.COMPRESSED_SUFFIX)
+
+def _directory_size(path: Path):
+    size = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.stat(os.path.join(directory, name)).st_size
+            except FileNotFoundError:
+                pass
+    return size
+
+class ProfileStore:
+    """
+    Compresses cold profiles and applies a RetentionPolicy.
+
+    `protected` returns the ids never to touch, e.g. those of running jobs.
+    Profiles used in the last MIN_IDLE_S are never touched either, so a run
+    writing its profile is safe even when nobody protects it.
+    """
+    MIN_IDLE_S = 3600
+    COMPACT_INTERVAL_S = 3600
+
+    def __init__(self, policy: RetentionPolicy = None, protected=None, cache: ResultCache = None):
+        self.policy = policy if policy is not None else RetentionPolicy.load()
+        self.protected = protected if protected is not None else set
+        # Its objects hard-link outputs, which would keep the bytes of a compressed or deleted profile
+        self.cache = cache if cache is not None else ResultCache()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def usage(self):
+        """Returns a ProfileUsage per profile in the catalog."""
+        catalog = filemanagment.get_catalog()
+        usages = []
+        for profile_id in catalog.ids():
+            profile_dir = filemanagment.PROFILES_PATH / f"profile_{profile_id}"
+            output = filemanagment.output_file(profile_dir / "output.csv")
+            try:
+                written = (output or profile_dir).stat().st_mtime
+            except FileNotFoundError:
+                continue
+            last_used = max(written, catalog.last_opened(profile_id) or 0)
+            usages.append(ProfileUsage(profile_id, _directory_size(profile_dir), last_used, output))
+        return usages
+
+    def compress(self, profile_id):
+        """Compresses a profile's output.csv and drops its columns sidecar; returns the bytes saved."""
+        csv_path = filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "output.csv"
+        sidecar = filemanagment.columns_path(csv_path)
+        try:
+            stat = csv_path.stat()
+        except FileNotFoundError:
+            return 0
+        before = stat.st_size + (sidecar.stat().st_size if sidecar.is_file() else 0)
+        self.cache.evict_links(csv_path)
+
+        compressed = filemanagment.compressed_path(csv_path)
+        tmp_path = compressed.with_name(compressed.name + ".tmp")
+        with open(csv_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        # Keeps the output's mtime, which the result cache compares to the binary's
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, compressed)
+        filemanagment.release_table(csv_path)
+        csv_path.unlink()
+        sidecar.unlink(missing_ok=True)
+        filemanagment.get_catalog().update_profile(profile_id)
+        return before - compressed.stat().st_size
+
+    def _touchable(self, usage, now, protected):
+        return usage.id not in protected and now - usage.last_used >= self.MIN_IDLE_S
+
+    def plan_deletions(self, usages, now=None):
+        """Profiles the policy drops, least recently used last in the kept order."""
+        now = time.time() if now is None else now
+        protected = set(self.protected())
+        by_use = sorted(usages, key=lambda usage: usage.last_used, reverse=True)
+        keep_last = self.policy.keep_last
+        deleted = [
+            usage for rank, usage in enumerate(by_use)
+            if keep_last is not None and rank >= keep_last and self._touchable(usage, now, protected)
+        ]
+        if self.policy.max_bytes is not None:
+            kept = [usage for usage in by_use if usage not in deleted]
+            total = sum(usage.size for usage in kept)
+            for usage in reversed(kept):
+                if total <= self.policy.max_bytes:
+                    break
+                if self._touchable(usage, now, protected):
+                    deleted.append(usage)
+                    total -= usage.size
+        return deleted
+
+    def compact(self, dry_run=False):
+        """
+        Compresses cold outputs, then deletes what the policy drops. Returns
+        (compressed ids, bytes saved by compression, deleted ids, bytes freed
+        by deletion); a dry run only reports the ids.
+        """
+        now = time.time()
+        protected = set(self.protected())
+        cold_after = self.policy.compress_after_days * 86400
+        cold = [
+            usage.id for usage in self.usage()
+            if usage.output is not None and not usage.compressed
+            and now - usage.last_used >= max(cold_after, self.MIN_IDLE_S) and usage.id not in protected
+        ]
+        saved = 0
+        if not dry_run:
+            for profile_id in cold:
+                try:
+                    saved += self.compress(profile_id)
+                except OSError as e:
+                    print(f"Error compressing profile_{profile_id}: {e}")
+
+        deleted = self.plan_deletions(self.usage(), now)
+        if not dry_run:
+            for usage in deleted:
+                if usage.output is not None:
+                    self.cache.evict_links(usage.output)
+                filemanagment.delete_profile(usage.id)
+        return cold, saved, [usage.id for usage in deleted], sum(usage.size for usage in deleted)
+
+    def start(self):
+        """Runs compact() now and every COMPACT_INTERVAL_S on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting profiles: {e}")
+            self._stop.wait(self.COMPACT_INTERVAL_S)
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python profile_store.py", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--profiles", type=Path, default=filemanagment.PROFILES_PATH, help="profiles directory")
+    parser.add_argument("--keep-last", type=int, help="profiles to keep, most recently used first")
+    parser.add_argument("--max-bytes", type=int, help="disk quota of the profiles")
+    parser.add_argument("--compress-after-days", type=float, help="days unused before an output is compressed")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be compressed and deleted")
+    args = parser.parse_args(argv)
+
+    filemanagment.PROFILES_PATH = args.profiles
+    policy = RetentionPolicy.load(args.profiles)
+    for key in RetentionPolicy.KEYS:
+        if getattr(args, key) is not None:
+            setattr(policy, key, getattr(args, key))
+    print(policy)
+
+    compressed, saved, deleted, freed = ProfileStore(policy).compact(dry_run=args.dry_run)
+    verb = "Would compress" if args.dry_run else "Compressed"
+    print(f"{verb} {len(compressed)} profiles {compressed}" + ("" if args.dry_run else f", saving {saved} bytes"))
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(f"{verb} {len(deleted)} profiles {deleted}, {freed} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
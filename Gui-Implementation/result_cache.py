@@ -0,0 +1,237 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import filemanagment
+import simulation
+
+def canonical_settings(settings, exclude=()):
+    """
+    Returns the settings the simulator will run with, as canonical JSON.
+
+    Defaults are filled in, keys the simulator ignores (and those in exclude)
+    are dropped and floats are rounded to 12 significant digits, so equivalent
+    settings dicts (1 vs 1.0, 0.30000000000000004 vs 0.3, -0.0 vs 0.0)
+    serialize the same.
+    """
+    resolved = simulation.resolve_settings(settings)
+    canonical = {
+        key: float(f"{value:.12g}") + 0.0
+        for key, value in resolved.items() if key not in exclude
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+
+_fingerprints = {}
+
+def binary_fingerprint(exe_path: Path):
+    """Returns the SHA-256 of the simulator binary, memoized by size and mtime."""
+    try:
+        stat = Path(exe_path).stat()
+    except FileNotFoundError:
+        return ""
+    key = (str(exe_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _fingerprints:
+        digest = hashlib.sha256()
+        with open(exe_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
+
+def settings_key(settings, exe_path: Path):
+    """Content address of a run: hash of the canonical settings and the simulator binary."""
+    digest = hashlib.sha256(canonical_settings(settings).encode("utf-8"))
+    digest.update(binary_fingerprint(exe_path).encode("ascii"))
+    return digest.hexdigest()
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-links src to dst, copying where the filesystem can't link."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class ResultCache:
+    """
+    Content-addressed store of simulation outputs, keyed by settings_key().
+
+    Outputs are hard-linked into profiles/.cache/objects/<key>.csv, so a hit
+    costs a link instead of a simulator run and evicting an object never
+    touches the profiles that share it. A linked object keeps the bytes of its
+    profile on disk; ProfileStore evicts it before compressing or deleting
+    the profile (see evict_links()). Objects older than max_age_days are
+    dropped, then the least recently used ones until the store fits max_bytes.
+    Entries made by another simulator binary are purged as soon as the binary
+    changes.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY, binary TEXT, settings TEXT,
+            size INTEGER, created REAL, last_used REAL
+        );
+    """
+
+    def __init__(self, root: Path = None, max_bytes=1 << 30, max_age_days=30):
+        self.root = Path(root) if root is not None else filemanagment.PROFILES_PATH / ".cache"
+        self.objects = self.root / "objects"
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.objects.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False)
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def _object_path(self, key):
+        return self.objects / f"{key}.csv"
+
+    def _check_binary(self, binary):
+        """Purges every entry when the simulator binary differs from the last one seen."""
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'binary'").fetchone()
+        if row is not None and row[0] == binary:
+            return
+        for (key,) in conn.execute("SELECT key FROM entries WHERE binary != ?", (binary,)).fetchall():
+            self._drop(key)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('binary', ?)", (binary,))
+        conn.commit()
+
+    def _drop(self, key):
+        self._object_path(key).unlink(missing_ok=True)
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def lookup(self, settings, exe_path: Path):
+        """Returns the cached output path for these settings, or None."""
+        key = settings_key(settings, exe_path)
+        with self._lock:
+            conn = self._connect()
+            self._check_binary(binary_fingerprint(exe_path))
+            path = self._object_path(key)
+            if conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() and path.is_file():
+                conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                return path
+
+        # Profiles written before the cache existed: adopt one with the same
+        # settings if its output is newer than the simulator binary
+        adopted = self._find_profile(settings, exe_path)
+        if adopted is not None:
+            return self.store(settings, exe_path, adopted)
+        return None
+
+    def _find_profile(self, settings, exe_path: Path):
+        for _, output_path in self._matching_profiles(settings, exe_path):
+            # A refined profile has extra distance lines, so it never stands in for a uniform run
+            if (output_path.parent / simulation.Refinement.FILE_NAME).is_file():
+                continue
+            # A compressed output is cold; inflating it into the cache would undo the compression
+            if output_path.is_file():
+                return output_path
+        return None
+
+    def _matching_profiles(self, settings, exe_path: Path, exclude=()):
+        """
+        Returns (settings, output path) of finished profiles, newest first, whose
+        settings match outside `exclude` and whose output is newer than the binary.
+        The output path is the plain output.csv even if it is stored compressed;
+        read it with filemanagment.open_output().
+        """
+        canonical = canonical_settings(settings, exclude)
+        try:
+            binary_mtime = Path(exe_path).stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        catalog = filemanagment.get_catalog()
+        matches = []
+        for profile_id in reversed(catalog.ids()):
+            if not catalog.row_count(profile_id):
+                continue
+            profile_settings = catalog.settings(profile_id)
+            if canonical_settings(profile_settings, exclude) != canonical:
+                continue
+            output_path = filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "output.csv"
+            stored = filemanagment.output_file(output_path)
+            if stored is not None and stored.stat().st_mtime_ns > binary_mtime:
+                matches.append((profile_settings, output_path))
+        return matches
+
+    def compatible_profiles(self, settings, exe_path: Path):
+        """Finished profiles with the same physics and cost settings, whatever their grid."""
+        return self._matching_profiles(settings, exe_path, exclude=simulation.GRID_KEYS)
+
+    def store(self, settings, exe_path: Path, output_path: Path):
+        """Adds a finished run's output to the cache and returns the cached path."""
+        key = settings_key(settings, exe_path)
+        with self._lock:
+            conn = self._connect()
+            path = self._object_path(key)
+            _link_or_copy(Path(output_path), path)
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, binary_fingerprint(exe_path), canonical_settings(settings), path.stat().st_size, now, now),
+            )
+            self._evict(now)
+            conn.commit()
+            return path if path.is_file() else None
+
+    def _evict(self, now):
+        cutoff = now - self.max_age_days * 86400
+        for (key,) in self._conn.execute("SELECT key FROM entries WHERE last_used < ?", (cutoff,)).fetchall():
+            self._drop(key)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            self._drop(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self):
+        """Empties the cache, e.g. after the simulator's physics changed without a rebuild."""
+        with self._lock:
+            conn = self._connect()
+            for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+                self._drop(key)
+            conn.commit()
+
+    def evict_links(self, output_path: Path):
+        """
+        Drops the objects that are hard links of a profile's output, so
+        compressing or deleting the profile frees its bytes. Returns how many.
+        """
+        output_path = Path(output_path)
+        try:
+            if output_path.stat().st_nlink < 2 or not (self.root / "index.sqlite").is_file():
+                return 0
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            dropped = 0
+            for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+                try:
+                    linked = os.path.samefile(self._object_path(key), output_path)
+                except OSError:
+                    continue
+                if linked:
+                    self._drop(key)
+                    dropped += 1
+            conn.commit()
+            return dropped
+
+    def link(self, cached_path: Path, output_path: Path):
+        """Materializes a cached output as a profile's output.csv."""
+        _link_or_copy(Path(cached_path), Path(output_path))
@@ -1,7 +1,11 @@
-from PySide6.QtWidgets import QPushButton, QWidget, QLineEdit, QLabel, QVBoxLayout, QHBoxLayout, QFrame
-from PySide6.QtGui import QDoubleValidator
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QPushButton, QWidget, QLineEdit, QLabel, QVBoxLayout, QHBoxLayout, QFrame,
+    QSpinBox, QDoubleSpinBox, QCheckBox, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PySide6.QtGui import QDoubleValidator, QPainter, QPainterPath, QPen, QColor, QPolygonF
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF
 from custom_widgets import EventMixin, fit_text_to_widget
+from cost_estimate import format_duration
 import color_palette as cp
 
 class SettingWidget(QWidget):
@@ -19,26 +23,6 @@ class SettingWidget(QWidget):
         layout.addWidget(self.label)
         layout.addWidget(self.lineedit)
         self.setLayout(layout)
-        
-        self.setStyleSheet(self._stylesheet())
-
-    def _stylesheet(self):
-        return f"""
-            QLabel {{
-                color: {cp.SECONDARY_TEXT};
-                padding-right: 10px;
-            }}
-            QLineEdit {{
-                background-color: {cp.CARD_SURFACE};
-                color: {cp.PRIMARY_TEXT};
-                border: none;
-                border-bottom: 1px solid {cp.BORDER_DIVIDER};
-                padding: 4px;
-            }}
-            QLineEdit:focus {{
-                border-bottom: 1px solid {cp.PRIMARY_BLUE};
-            }}
-        """
 
 class SettingWidgetContainer(QFrame):
     """Container for multiple SettingWidgets."""
@@ -57,63 +41,42 @@ class SettingWidgetContainer(QFrame):
         
         self.settings: list[SettingWidget] = []
         self.setLayout(self.layout)
-        self.setStyleSheet(self._stylesheet())
 
     def add_setting(self, setting: SettingWidget):
         self.settings.append(setting)
         self.layout.addWidget(setting)
 
-    def _stylesheet(self):
-        return f"""
-            QFrame {{
-                background-color: {cp.CARD_SURFACE};
-                border-radius: 5px;
-            }}
-            QLabel {{
-                color: {cp.PRIMARY_BLUE};
-                font-weight: bold;
-                padding-bottom: 5px;
-            }}
-        """
-
 class CSVGenerateButton(QPushButton):
     """Button to generate a CSV file, showing progress."""
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         self.original_text = text
         self.progress = 0
-        self.setStyleSheet(self._stylesheet())
         self.setText(f"{self.original_text} (0.0%)")
 
     def set_progress(self, percentage):
-        """Update the button's text to show progress."""
+        """Update the button's text and fill to show progress."""
+        if percentage == self.progress:
+            return
         self.progress = percentage
-        self.setText(f"{self.original_text} ({self.progress:.1%})")
-        # We need to re-apply the stylesheet for the gradient to update
-        self.setStyleSheet(self._stylesheet())
+        text = f"{self.original_text} ({self.progress:.1%})"
+        if text != self.text():
+            self.setText(text)
+        self.update()
 
-    def _stylesheet(self):
-        style = cp.BUTTON_STYLES["success"]
-        
-        return f"""
-            QPushButton {{
-                background-color: {style["background"]};
-                border: none;
-                color: {style["text"]};
-                border-radius: 8px;
-                padding: 10px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {style["hover"]};
-            }}
-            QPushButton:pressed {{
-                background-color: {style["pressed"]};
-            }}
-            QPushButton:disabled {{
-                background-color: {style["background"]};
-            }}
-        """
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.progress <= 0:
+            return
+        # The fill is painted over the styled button, so progress never touches the stylesheet
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        outline = QPainterPath()
+        outline.addRoundedRect(QRectF(self.rect()), 8, 8)
+        painter.setClipPath(outline)
+        fill = QColor(cp.ACCENT_WHITE)
+        fill.setAlpha(60)
+        painter.fillRect(QRectF(0, 0, self.width() * min(self.progress, 1), self.height()), fill)
 
 class ProfileSelector(QLineEdit):
     """Line edit for profile selection."""
@@ -121,14 +84,259 @@ class ProfileSelector(QLineEdit):
         super().__init__(parent)
         if default_value is not None:
             self.setPlaceholderText(str(default_value))
-        self.setStyleSheet(self._stylesheet())
-
-    def _stylesheet(self):
-        return f"""
-            QLineEdit {{
-                background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
-                border: none; border-radius: 8px; padding: 5px;
-                border-bottom: 1px solid {cp.BORDER_DIVIDER};
-            }}
-            QLineEdit:focus {{ border-bottom: 1px solid {cp.PRIMARY_BLUE}; }}
-        """
+
+class JobQueuePanel(QFrame):
+    """Panel listing queued and running simulation jobs."""
+    cancel_requested = Signal(int)  # job id
+    max_processes_changed = Signal(int)
+    incremental_changed = Signal(bool)
+    trajectories_changed = Signal(bool)
+    refine_changed = Signal(bool)
+
+    HEADERS = ["Job", "Profile", "State", "Progress", "Cells/s", "ETA", ""]
+
+    def __init__(self, max_processes, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.rows: dict[int, int] = {}  # job id -> table row
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(5)
+
+        top_layout = QHBoxLayout()
+        self.label = QLabel("Simulation Queue")
+        self.summary_label = QLabel("")
+        self.max_processes_spin = QSpinBox()
+        self.max_processes_spin.setRange(1, 256)
+        self.max_processes_spin.setValue(max_processes)
+        self.max_processes_spin.valueChanged.connect(self.max_processes_changed)
+        self.priority_spin = QSpinBox()
+        self.priority_spin.setRange(-10, 10)
+        self.incremental_check = QCheckBox("Reuse cells")
+        self.incremental_check.setToolTip("Only simulate grid cells no profile with the same physics covers")
+        self.incremental_check.setChecked(True)
+        self.incremental_check.toggled.connect(self.incremental_changed)
+        self.trajectories_check = QCheckBox("Export arcs")
+        self.trajectories_check.setToolTip("Save every chosen shot's trajectory for the plot view")
+        self.trajectories_check.toggled.connect(self.trajectories_changed)
+        self.refine_check = QCheckBox("Refine")
+        self.refine_check.setToolTip("Resample distances finer where the table changes sharply")
+        self.refine_check.toggled.connect(self.refine_changed)
+
+        top_layout.addWidget(self.label)
+        top_layout.addWidget(self.summary_label)
+        top_layout.addStretch()
+        top_layout.addWidget(self.incremental_check)
+        top_layout.addWidget(self.trajectories_check)
+        top_layout.addWidget(self.refine_check)
+        top_layout.addWidget(QLabel("Priority"))
+        top_layout.addWidget(self.priority_spin)
+        top_layout.addWidget(QLabel("Max processes"))
+        top_layout.addWidget(self.max_processes_spin)
+        layout.addLayout(top_layout)
+
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+    def priority(self):
+        return self.priority_spin.value()
+
+    def update_job(self, job):
+        """Adds or refreshes the row of a SimulationJob."""
+        row = self.rows.get(job.id)
+        if row is None:
+            row = self.table.rowCount()
+            self.rows[job.id] = row
+            self.table.insertRow(row)
+            cancel_button = QPushButton("Cancel")
+            cancel_button.clicked.connect(lambda _, job_id=job.id: self.cancel_requested.emit(job_id))
+            self.table.setCellWidget(row, 6, cancel_button)
+
+        values = [
+            str(job.id),
+            "-" if job.profile_id is None else str(job.profile_id),
+            job.state.name.title() + (" (cached)" if job.cached else ""),
+            self._progress_text(job),
+            f"{job.cells_per_second:.0f}",
+            self._duration_text(job.eta),
+        ]
+        for col, value in enumerate(values):
+            item = self.table.item(row, col)
+            if item is None:
+                self.table.setItem(row, col, QTableWidgetItem(value))
+            else:
+                item.setText(value)
+        self.table.cellWidget(row, 6).setEnabled(not job.done)
+
+    @staticmethod
+    def _progress_text(job):
+        report = job.report
+        if report is None:
+            return f"{job.progress:.1%}"
+        return f"{job.progress:.1%} ({report.cells_done}/{report.cells_total} cells, {report.shots_found} shots)"
+
+    @staticmethod
+    def _duration_text(seconds):
+        if seconds is None:
+            return "-"
+        minutes, seconds = divmod(round(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+    def set_summary(self, running, queued):
+        self.summary_label.setText(f"{running} running, {queued} queued")
+
+class EnvelopePlot(QWidget):
+    """Plots shot speed over angle for the feasible shots of a preview."""
+    MARGIN = 30
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.points = []  # (angle in degrees, speed)
+        self.best = None
+        self.angle_range = (0.0, 90.0)
+
+    def set_envelope(self, points, best, angle_range):
+        self.points = points
+        self.best = best
+        self.angle_range = angle_range
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        left, top = self.MARGIN, 10
+        width, height = self.width() - self.MARGIN - 10, self.height() - self.MARGIN - 10
+
+        painter.setPen(QPen(QColor(cp.BORDER_DIVIDER)))
+        painter.drawRect(left, top, width, height)
+        if not self.points or width <= 0 or height <= 0:
+            painter.setPen(QPen(QColor(cp.SECONDARY_TEXT)))
+            painter.drawText(self.rect(), Qt.AlignCenter, "No shot reaches the target")
+            return
+
+        min_angle, max_angle = self.angle_range
+        speeds = [speed for _, speed in self.points]
+        min_speed, max_speed = min(speeds), max(speeds)
+        if max_speed - min_speed < 1e-9:
+            min_speed, max_speed = min_speed - 1, max_speed + 1
+        angle_span = max(max_angle - min_angle, 1e-9)
+
+        def to_screen(angle, speed):
+            return QPointF(
+                left + (angle - min_angle) / angle_span * width,
+                top + (max_speed - speed) / (max_speed - min_speed) * height,
+            )
+
+        painter.setPen(QPen(QColor(cp.PRIMARY_BLUE), 3))
+        painter.drawPoints(QPolygonF([to_screen(angle, speed) for angle, speed in self.points]))
+        if self.best is not None:
+            painter.setPen(QPen(QColor(cp.SUCCESS), 2))
+            painter.drawEllipse(to_screen(*self.best), 4, 4)
+
+        painter.setPen(QPen(QColor(cp.SECONDARY_TEXT)))
+        painter.drawText(left, top + height + 15, f"{min_angle:.0f}°")
+        painter.drawText(left + width - 25, top + height + 15, f"{max_angle:.0f}°")
+        painter.drawText(2, top + 10, f"{max_speed:.1f}")
+        painter.drawText(2, top + height, f"{min_speed:.1f}")
+
+class CostEstimatePanel(QFrame):
+    """Shows what the current settings cost to simulate and the keys the simulator would ignore."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground, True)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(5)
+        self.grid_label = QLabel("")
+        self.time_label = QLabel("")
+        self.warning_label = QLabel("")
+        self.warning_label.setObjectName("warning")
+        self.warning_label.setWordWrap(True)
+        layout.addWidget(self.grid_label)
+        layout.addWidget(self.time_label)
+        layout.addWidget(self.warning_label)
+        self.setLayout(layout)
+
+    def show_estimate(self, cost, expensive):
+        """Shows a cost_estimate.CostEstimate; expensive runs get the warning color."""
+        self.grid_label.setText(f"{cost.cells:,} cells, {cost.trajectories:,} trajectories at most")
+        self.grid_label.setToolTip(cost.summary())
+        basis = "from past runs" if cost.calibrated else "uncalibrated"
+        processes = f"{cost.processes} process{'es' if cost.processes != 1 else ''}"
+        self.time_label.setText(f"Estimated {format_duration(cost.seconds)} on {processes} ({basis})")
+        name = "warning" if expensive else ""
+        if self.time_label.objectName() != name:
+            self.time_label.setObjectName(name)
+            # Re-applies the theme's rules for the new object name
+            self.time_label.style().unpolish(self.time_label)
+            self.time_label.style().polish(self.time_label)
+        ignored = [f"{key} ({hint}?)" if hint else key for key, hint in cost.ignored.items()]
+        self.warning_label.setText(f"Ignored by the simulator: {', '.join(ignored)}" if ignored else "")
+        self.warning_label.setVisible(bool(ignored))
+
+class ShotPreviewPanel(QFrame):
+    """Live preview of the feasible shots at a sample distance for the current settings."""
+    sample_changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground, True)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(5)
+
+        top_layout = QHBoxLayout()
+        self.label = QLabel("Shot Preview")
+        self.distance_spin = QDoubleSpinBox()
+        self.distance_spin.setRange(0.1, 20)
+        self.distance_spin.setSingleStep(0.1)
+        self.distance_spin.setValue(2.5)
+        self.distance_spin.setSuffix(" m")
+        self.distance_spin.valueChanged.connect(self.sample_changed)
+        self.robot_speed_spin = QDoubleSpinBox()
+        self.robot_speed_spin.setRange(-10, 10)
+        self.robot_speed_spin.setSingleStep(0.1)
+        self.robot_speed_spin.setSuffix(" m/s")
+        self.robot_speed_spin.valueChanged.connect(self.sample_changed)
+
+        top_layout.addWidget(self.label)
+        top_layout.addStretch()
+        top_layout.addWidget(QLabel("Distance"))
+        top_layout.addWidget(self.distance_spin)
+        top_layout.addWidget(QLabel("Robot speed"))
+        top_layout.addWidget(self.robot_speed_spin)
+        layout.addLayout(top_layout)
+
+        self.plot = EnvelopePlot(self)
+        layout.addWidget(self.plot)
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.setLayout(layout)
+
+    def sample(self):
+        """Returns the (distance, robot speed) to preview."""
+        return self.distance_spin.value(), self.robot_speed_spin.value()
+
+    def show_envelope(self, points, best, angle_range, elapsed):
+        """Shows feasible (angle in degrees, speed) points and the cheapest one."""
+        self.plot.set_envelope(points, best, angle_range)
+        if best is None:
+            self.summary_label.setText(f"No feasible shot ({elapsed * 1000:.0f} ms)")
+        else:
+            self.summary_label.setText(
+                f"{len(points)} feasible angles, best {best[0]:.1f}° at {best[1]:.2f} m/s "
+                f"({elapsed * 1000:.0f} ms)"
+            )
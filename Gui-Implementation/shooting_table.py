@@ -0,0 +1,181 @@
+from pathlib import Path
+import bisect
+import math
+import numpy as np
+import filemanagment
+import simulation
+
+# Queries within this many grid steps of a grid line snap onto it, so exported
+# float32 keys hit their cell exactly instead of blending with a neighbour
+GRID_SNAP = 1e-4
+
+class ShootingTable:
+    """
+    Dense (distance, robot-speed) lookup table over a profile's output.
+
+    Rows are placed on the grid the simulator swept, keyed with the same
+    rounding export.ExportData applies, and queried by bilinear
+    interpolation. The robot-speed axis is regular; the distance axis is
+    regular too, except for refined profiles, whose resampled lines sit
+    between the coarse ones. Cells where FindShotsOnTarget found no shot are
+    holes (NaN); an interpolation renormalizes over the valid corners of its
+    cell, or, with strict=True, returns NaN as soon as a corner is a hole.
+    Queries outside the grid return NaN. Speeds are in m/s, angles in
+    radians, as exported.
+    """
+    def __init__(self, distances, delta_distance, min_robot_speed, delta_robot_speed, speed, angle):
+        self.distances = np.asarray(distances, dtype=np.float64)  # ascending distance of each table row
+        self.delta_distance = delta_distance  # nominal step, to snap queries on a single-line table
+        self.min_robot_speed = min_robot_speed
+        self.delta_robot_speed = delta_robot_speed
+        self.speed = speed  # float64 arrays shaped (distances, robot speeds)
+        self.angle = angle
+        self.valid = ~np.isnan(speed)
+        # Holes zeroed and validity as a weight, so batch queries need no masking
+        self._speed0 = np.where(self.valid, speed, 0.0)
+        self._angle0 = np.where(self.valid, angle, 0.0)
+        self._weight0 = self.valid.astype(np.float64)
+        # Nested lists serve scalar queries without NumPy's per-call overhead
+        self._speed_rows = speed.tolist()
+        self._angle_rows = angle.tolist()
+        self._distance_list = self.distances.tolist()
+        self._steps = np.diff(self.distances) if len(self.distances) > 1 else np.array([delta_distance])
+
+    @classmethod
+    def from_profile(cls, profile_id):
+        """Loads profiles/profile_<id>, using its settings for the grid."""
+        profile_dir = filemanagment.PROFILES_PATH / f"profile_{profile_id}"
+        settings = filemanagment.get_catalog().settings(profile_id)
+        return cls.from_output(profile_dir / "output.csv", settings)
+
+    @classmethod
+    def from_output(cls, csv_path: Path, settings):
+        """
+        Builds the table from an output CSV and the settings it was simulated
+        with. The distance axis is the settings' grid, plus, for a refined
+        profile (one with a simulation.Refinement next to its output), every
+        distance line of the output.
+        """
+        table = filemanagment.read_table(csv_path)
+        if table is None:
+            return None
+
+        keys = {simulation.cell_key(distance) for distance in simulation.distance_grid(settings)}
+        if len(table) and simulation.Refinement.load(Path(csv_path).parent) is not None:
+            keys.update(np.unique(np.round(table.column("distance").astype(np.float64), 2)).tolist())
+        distances = np.array(sorted(keys), dtype=np.float64)
+        speeds = simulation.robot_speed_grid(settings)
+        resolved = simulation.resolve_settings(settings)
+        min_robot_speed, delta_robot_speed = -resolved["maxrobotspeed"], resolved["deltarobotspeed"]
+
+        shape = (len(distances), len(speeds))
+        speed = np.full(shape, np.nan)
+        angle = np.full(shape, np.nan)
+        if len(table) and all(shape):
+            # ExportData rounds distances to 2 decimals, as the keys are, and
+            # robot speeds to the nearest grid point, so both match exactly
+            rows = np.round(table.column("distance").astype(np.float64), 2)
+            i = np.clip(np.searchsorted(distances, rows), 0, shape[0] - 1)
+            j = np.rint((table.column("robot-speed") - min_robot_speed) / delta_robot_speed).astype(np.int64)
+            inside = (distances[i] == rows) & (j >= 0) & (j < shape[1])
+            speed[i[inside], j[inside]] = table.column("speed")[inside]
+            angle[i[inside], j[inside]] = table.column("angle")[inside]
+
+        return cls(distances, resolved["deltadistance"], min_robot_speed, delta_robot_speed, speed, angle)
+
+    @property
+    def shape(self):
+        return self.speed.shape
+
+    @property
+    def hole_count(self):
+        return int(self.valid.size - np.count_nonzero(self.valid))
+
+    def lookup(self, distance, robot_speed, strict=False):
+        """Returns (speed, angle) for one query point; NaNs if it can't be answered."""
+        rows, cols = self.speed.shape
+        if rows == 0 or cols == 0:
+            return math.nan, math.nan
+        if not (math.isfinite(distance) and math.isfinite(robot_speed)):
+            # Outside every grid, as lookup_batch() answers it
+            return math.nan, math.nan
+        axis = self._distance_list
+        k = min(max(bisect.bisect_right(axis, distance) - 1, 0), max(rows - 2, 0))
+        x = k + (distance - axis[k]) / float(self._steps[k])
+        y = (robot_speed - self.min_robot_speed) / self.delta_robot_speed
+        if abs(x - round(x)) < GRID_SNAP:
+            x = float(round(x))
+        if abs(y - round(y)) < GRID_SNAP:
+            y = float(round(y))
+        if not (0 <= x <= rows - 1 and 0 <= y <= cols - 1):
+            return math.nan, math.nan
+
+        i = min(int(x), rows - 2) if rows > 1 else 0
+        j = min(int(y), cols - 2) if cols > 1 else 0
+        tx, ty = x - i, y - j
+        i1, j1 = min(i + 1, rows - 1), min(j + 1, cols - 1)
+
+        speed_sum = angle_sum = weight_sum = 0.0
+        for ci, cj, weight in (
+            (i, j, (1 - tx) * (1 - ty)), (i1, j, tx * (1 - ty)),
+            (i, j1, (1 - tx) * ty), (i1, j1, tx * ty),
+        ):
+            speed = self._speed_rows[ci][cj]
+            if speed != speed:  # hole
+                if strict and weight > 0:
+                    return math.nan, math.nan
+                continue
+            speed_sum += weight * speed
+            angle_sum += weight * self._angle_rows[ci][cj]
+            weight_sum += weight
+
+        if weight_sum <= 0:
+            return math.nan, math.nan
+        return speed_sum / weight_sum, angle_sum / weight_sum
+
+    def lookup_batch(self, distances, robot_speeds, strict=False):
+        """Vectorized lookup(); returns (speeds, angles) arrays shaped like the broadcast inputs."""
+        distances, robot_speeds = np.broadcast_arrays(
+            np.asarray(distances, dtype=np.float64), np.asarray(robot_speeds, dtype=np.float64)
+        )
+        rows, cols = self.speed.shape
+        if rows == 0 or cols == 0:
+            return np.full(distances.shape, np.nan), np.full(distances.shape, np.nan)
+        # Infinite queries are outside the grid; their NaN arithmetic must not warn
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Fractional row index: the interval a distance falls in, plus its position inside it
+            k = np.clip(np.searchsorted(self.distances, distances, side="right") - 1, 0, max(rows - 2, 0))
+            x = k + (distances - self.distances[k]) / self._steps[k]
+            y = (robot_speeds - self.min_robot_speed) / self.delta_robot_speed
+            x = np.where(np.abs(x - np.rint(x)) < GRID_SNAP, np.rint(x), x)
+            y = np.where(np.abs(y - np.rint(y)) < GRID_SNAP, np.rint(y), y)
+            inside = (x >= 0) & (x <= rows - 1) & (y >= 0) & (y <= cols - 1)
+
+            i = np.clip(np.floor(np.nan_to_num(x)), 0, max(rows - 2, 0)).astype(np.intp)
+            j = np.clip(np.floor(np.nan_to_num(y)), 0, max(cols - 2, 0)).astype(np.intp)
+            tx, ty = x - i, y - j
+            i1, j1 = np.minimum(i + 1, rows - 1), np.minimum(j + 1, cols - 1)
+
+            speed_sum = np.zeros(distances.shape)
+            angle_sum = np.zeros(distances.shape)
+            weight_sum = np.zeros(distances.shape)
+            hole_hit = np.zeros(distances.shape, dtype=bool)
+            for ci, cj, weight in (
+                (i, j, (1 - tx) * (1 - ty)), (i1, j, tx * (1 - ty)),
+                (i, j1, (1 - tx) * ty), (i1, j1, tx * ty),
+            ):
+                cell = ci * cols + cj
+                valid = self._weight0.take(cell)
+                if strict:
+                    hole_hit |= (valid == 0) & (weight != 0)
+                weight = weight * valid
+                speed_sum += weight * self._speed0.take(cell)
+                angle_sum += weight * self._angle0.take(cell)
+                weight_sum += weight
+
+            answered = inside & (weight_sum > 0)
+            if strict:
+                answered &= ~hole_hit
+            speeds = np.where(answered, speed_sum / weight_sum, np.nan)
+            angles = np.where(answered, angle_sum / weight_sum, np.nan)
+        return speeds, angles
@@ -0,0 +1,435 @@
+from pathlib import Path
+import csv
+import heapq
+import json
+import os
+import numpy as np
+import filemanagment
+
+# Mirrors Shooting-Simulation/constants/constants.go; the simulator uses these
+# for every key a settings file leaves out.
+SIMULATOR_DEFAULTS = {
+    "targetheight": 2.2,
+    "targetradius": 0.2,
+    "distancetolerance": 0.01,
+    "dtangential": 1e-5,
+    "dradial": 1e-5,
+    "drobotspeed": 1e-5,
+    "minheightformaxheightcost": 2.8,
+    "maxheightcostfactor": 0.125,
+    "mindistance": 1.0,
+    "maxdistance": 4.0,
+    "deltadistance": 0.3,
+    "minangle": 0.0,
+    "maxangle": 90.0,
+    "deltaangle": 0.2,
+    "minspeed": 0.0,
+    "maxspeed": 25.0,
+    "speedtolerancetostopsearch": 1e-5,
+    "maxrobotspeed": 3.2,
+    "deltarobotspeed": 0.38,
+    "impactvelocitycostweight": 0.3,
+}
+
+# Keys earlier settings menus wrote instead of the simulator's. The simulator
+# never read them, so a profile that has them ran the defaults; only a
+# settings file read as the input of a new run takes them as meant
+LEGACY_KEYS = {
+    "angledelta": "deltaangle",
+    "distancedelta": "deltadistance",
+    "maxshooterspeed": "maxspeed",
+    "minshooterspeed": "minspeed",
+}
+
+def upgrade_settings(settings):
+    """Returns a copy of settings with LEGACY_KEYS renamed; a simulator key that is already set wins."""
+    upgraded = dict(settings)
+    for old, new in LEGACY_KEYS.items():
+        if old in upgraded:
+            upgraded.setdefault(new, upgraded.pop(old))
+    return upgraded
+
+def resolve_settings(settings):
+    """Returns the values the simulator will actually use for a settings dict."""
+    resolved = dict(SIMULATOR_DEFAULTS)
+    for key, value in settings.items():
+        if key in SIMULATOR_DEFAULTS:
+            resolved[key] = float(value)
+    return resolved
+
+def distance_grid(settings):
+    """Returns the distances the simulator's outer loop visits, accumulated exactly as main.go does."""
+    resolved = resolve_settings(settings)
+    if resolved["deltadistance"] <= 0:
+        return []
+
+    distances = []
+    distance = resolved["mindistance"]
+    while distance <= resolved["maxdistance"]:
+        distances.append(distance)
+        distance += resolved["deltadistance"]
+    return distances
+
+# Keys that only choose which (distance, robot-speed) cells a run covers; every
+# other key changes the physics or the cost and so the result of each cell.
+GRID_KEYS = ("mindistance", "maxdistance", "deltadistance", "maxrobotspeed", "deltarobotspeed")
+
+def robot_speed_grid(settings):
+    """Returns the robot speeds the simulator's inner loop visits, accumulated exactly as main.go does."""
+    resolved = resolve_settings(settings)
+    if resolved["deltarobotspeed"] <= 0:
+        return []
+
+    speeds = []
+    speed = -resolved["maxrobotspeed"]
+    while speed <= resolved["maxrobotspeed"]:
+        speeds.append(speed)
+        speed += resolved["deltarobotspeed"]
+    return speeds
+
+def cell_key(value):
+    """Grid coordinate as the exported CSV writes it (ExportData rounds to 2 decimals)."""
+    return round(value, 2) + 0.0
+
+class ReusedCells:
+    """Whole distance lines of an earlier output that a new run can take as they are."""
+    def __init__(self, output_path: Path, distances, speeds):
+        self.output_path = Path(output_path)
+        self.distances = set(distances)  # cell keys of the lines to take
+        self.speeds = set(speeds)  # cell keys of the robot speeds to keep in them
+
+    @property
+    def cell_count(self):
+        return len(self.distances) * len(self.speeds)
+
+    def blocks(self):
+        """Yields (distance, rows) for the reused lines, in grid order."""
+        for distance, rows in _distance_blocks(self.output_path):
+            if cell_key(distance) in self.distances:
+                yield distance, [row for row in rows if cell_key(float(row[2])) in self.speeds]
+
+def plan_incremental(settings, candidates, shards):
+    """
+    Plans a run that reuses lines of earlier outputs with the same physics.
+
+    candidates are (settings, output path) pairs of finished runs whose
+    non-grid settings match. The simulator always sweeps the full symmetric
+    robot-speed range, so reuse works per distance line: a requested distance
+    is taken from the first candidate that simulated it over a superset of the
+    requested robot speeds. The remaining distances are grouped into
+    contiguous sub-ranges, which share the `shards` processes (see
+    share_shards()). Returns (shards, reused) where shards is as
+    shard_settings() returns it and reused is a list of ReusedCells.
+    """
+    distances = distance_grid(settings)
+    speeds = {cell_key(speed) for speed in robot_speed_grid(settings)}
+
+    sources = []
+    for candidate_settings, output_path in candidates:
+        if speeds <= {cell_key(speed) for speed in robot_speed_grid(candidate_settings)}:
+            covered = {cell_key(distance) for distance in distance_grid(candidate_settings)}
+            sources.append((output_path, covered, set()))
+
+    missing = []
+    for i, distance in enumerate(distances):
+        key = cell_key(distance)
+        for _, covered, taken in sources:
+            if key in covered:
+                taken.add(key)
+                break
+        else:
+            missing.append(i)
+
+    reused = [ReusedCells(path, taken, speeds) for path, _, taken in sources if taken]
+    if not reused:
+        return shard_settings(settings, shards), []
+
+    # Contiguous runs of missing distance indices become sub-range sweeps
+    runs = contiguous_runs(missing)
+    delta = resolve_settings(settings)["deltadistance"]
+    planned = []
+    for run, count in zip(runs, share_shards([len(run) for run in runs], shards)):
+        sub = dict(settings)
+        sub["mindistance"] = distances[run[0]]
+        sub["maxdistance"] = distances[run[-1]] + delta / 2
+        planned.extend(shard_settings(sub, count))
+    return planned, reused
+
+def contiguous_runs(indices):
+    """Groups sorted indices into lists of consecutive ones."""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][-1] == i - 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    return runs
+
+def share_shards(sizes, shards):
+    """
+    Splits `shards` processes over sub-range sweeps of the given sizes: one
+    each, and the rest to the sweep with the most lines per process. With
+    more sweeps than shards every sweep gets one, and SimulationRun runs at
+    most `shards` of them at a time.
+    """
+    counts = [1] * len(sizes)
+    if not sizes:
+        return counts
+    for _ in range(shards - len(sizes)):
+        k = max(range(len(sizes)), key=lambda k: sizes[k] / counts[k])
+        counts[k] += 1
+    return counts
+
+def shard_settings(settings, shards):
+    """
+    Splits a sweep into at most `shards` settings dicts over interleaved distances.
+
+    Shard i runs every shards-th distance starting at the i-th, so the cheap
+    short and the expensive long distances are spread evenly over the shards.
+    Each shard's max distance sits half a step past its last distance, so float
+    accumulation inside the simulator can neither drop nor add a point.
+    Returns (settings, distance count) pairs.
+    """
+    distances = distance_grid(settings)
+    shards = max(1, min(shards, len(distances)))
+    if shards == 1:
+        return [(dict(settings), len(distances))]
+
+    delta = resolve_settings(settings)["deltadistance"]
+    result = []
+    for i in range(shards):
+        own = distances[i::shards]
+        shard = dict(settings)
+        shard["mindistance"] = own[0]
+        shard["maxdistance"] = own[-1] + delta / 2
+        shard["deltadistance"] = delta * shards
+        result.append((shard, len(own)))
+    return result
+
+# ExportData rounds distances to 2 decimals
+DISTANCE_RESOLUTION = 0.01
+
+def min_refinement_step(settings):
+    """
+    Finest distance step whose lines stay apart in the output: ExportData
+    snaps a shot's distance, which is off by up to distancetolerance, to the
+    nearest grid point and rounds it to 2 decimals.
+    """
+    return max(DISTANCE_RESOLUTION, 2 * resolve_settings(settings)["distancetolerance"])
+
+class Refinement:
+    """
+    Adaptive distance sampling: after the sweep at the settings' deltadistance,
+    up to `levels` passes resample the distance intervals where the table is
+    not smooth at `factor` times finer steps, down to min_refinement_step().
+
+    An interval is resampled when a robot speed line has a shot at one end
+    only, or when the shooter speed (m/s) or angle (rad) at either end is
+    further than the tolerance from the straight line through its
+    neighbours. Each pass only looks at the intervals the previous one made.
+    Chosen angles are quantized to deltaangle, so the angle tolerance is
+    never below one and a half angle steps.
+    """
+    ANGLE_STEPS = 1.5
+    FILE_NAME = "refinement.json"
+    KEYS = ("speed_tolerance", "angle_tolerance", "levels", "factor")
+
+    def __init__(self, speed_tolerance=0.2, angle_tolerance=0.035, levels=2, factor=4):
+        self.speed_tolerance = speed_tolerance
+        self.angle_tolerance = angle_tolerance
+        self.levels = levels
+        self.factor = factor
+
+    def save(self, profile_dir: Path):
+        """Records the refinement next to a profile's settings, which the simulator must not see."""
+        with open(Path(profile_dir) / self.FILE_NAME, "w") as f:
+            json.dump({key: getattr(self, key) for key in self.KEYS}, f)
+
+    @classmethod
+    def load(cls, profile_dir: Path):
+        """Returns the Refinement a profile was run with, or None for a uniform run."""
+        path = Path(profile_dir) / cls.FILE_NAME
+        if not path.is_file():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            values = json.load(f)
+        return cls(**{key: values[key] for key in cls.KEYS if key in values})
+
+    def __str__(self):
+        return (
+            f"Refinement(speed_tolerance={self.speed_tolerance}, angle_tolerance={self.angle_tolerance}, "
+            f"levels={self.levels}, factor={self.factor})"
+        )
+
+def rough_intervals(table, distances, speeds, refinement: Refinement, width, angle_step=0.0):
+    """
+    Returns the indices i of the intervals distances[i]..distances[i + 1],
+    about `width` wide, that refinement resamples.
+
+    distances are the sorted distances simulated so far and speeds the cell
+    keys of the robot speeds; table is their output as a ResultTable.
+    angle_step is the run's deltaangle in radians.
+    """
+    distance_keys = np.array([cell_key(distance) for distance in distances])
+    speed_keys = np.array(sorted(speeds))
+    if len(distance_keys) < 2 or not len(speed_keys):
+        return []
+
+    # (robot speed, distance) matrices, NaN where a cell found no shot
+    rows = np.round(table.column("distance").astype(np.float64), 2)
+    columns = np.round(table.column("robot-speed").astype(np.float64), 2)
+    di = np.clip(np.searchsorted(distance_keys, rows), 0, len(distance_keys) - 1)
+    si = np.clip(np.searchsorted(speed_keys, columns), 0, len(speed_keys) - 1)
+    on_grid = (distance_keys[di] == rows) & (speed_keys[si] == columns)
+    present = np.zeros((len(speed_keys), len(distance_keys)), dtype=bool)
+    present[si[on_grid], di[on_grid]] = True
+
+    rough = (present[:, 1:] != present[:, :-1]).any(axis=0)
+    d = np.array(distances)
+    weights = (d[1:-1] - d[:-2]) / (d[2:] - d[:-2])
+    angle_tolerance = max(refinement.angle_tolerance, refinement.ANGLE_STEPS * angle_step)
+    for column, tolerance in (("speed", refinement.speed_tolerance), ("angle", angle_tolerance)):
+        values = np.full(present.shape, np.nan)
+        values[si[on_grid], di[on_grid]] = table.column(column)[on_grid]
+        predicted = values[:, :-2] + (values[:, 2:] - values[:, :-2]) * weights
+        with np.errstate(invalid="ignore"):
+            off_line = (np.abs(values[:, 1:-1] - predicted) > tolerance).any(axis=0)
+        # A point off the line through its neighbours makes both its intervals suspect
+        rough[:-1] |= off_line
+        rough[1:] |= off_line
+
+    # Wider intervals were judged smooth by an earlier pass
+    current = np.abs(np.diff(d) - width) <= DISTANCE_RESOLUTION / 2
+    return np.flatnonzero(rough & current).tolist()
+
+def plan_refinement(settings, distances, intervals, width, factor, shards):
+    """
+    Plans the sweeps resampling the given intervals at width / factor steps.
+
+    Contiguous intervals become one sweep, which also runs the distances
+    between them again; merge_shard_outputs() writes those lines once. The
+    sweeps share the `shards` processes (see share_shards()). Returns shards
+    as shard_settings() returns them.
+    """
+    step = width / factor
+    runs = contiguous_runs(intervals)
+    planned = []
+    for run, count in zip(runs, share_shards([len(run) for run in runs], shards)):
+        sub = dict(settings)
+        sub["mindistance"] = distances[run[0]] + step
+        sub["maxdistance"] = distances[run[-1] + 1] - step / 2
+        sub["deltadistance"] = step
+        planned.extend(shard_settings(sub, count))
+    return planned
+
+def default_shard_count():
+    return os.cpu_count() or 1
+
+def _distance_blocks(path: Path):
+    """Yields (distance, rows) for each run of rows sharing a distance in an output CSV."""
+    with filemanagment.open_output(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        distance, rows = None, []
+        for row in reader:
+            if not row:
+                continue
+            value = float(row[0])
+            if value != distance and rows:
+                yield distance, rows
+                rows = []
+            distance = value
+            rows.append(row)
+        if rows:
+            yield distance, rows
+
+def merge_shard_outputs(shard_paths, output_path: Path, reused=()):
+    """
+    Merges shard output CSVs, and any ReusedCells, into one CSV in grid order.
+
+    Every shard is sorted by distance and keeps the simulator's robot-speed
+    order inside a distance, so a k-way merge of distance blocks restores the
+    order a single run would have written. A distance line in several
+    sources is written once.
+    """
+    sources = [_distance_blocks(path) for path in shard_paths] + [cells.blocks() for cells in reused]
+    header = None
+    # A shard that found no shot is written as an empty file, without a header
+    for path in list(shard_paths) + [cells.output_path for cells in reused]:
+        with filemanagment.open_output(path) as f:
+            header = next(csv.reader(f), None)
+        if header:
+            break
+
+    blocks = heapq.merge(*sources, key=lambda block: block[0])
+    tmp_path = Path(output_path).with_name(Path(output_path).name + ".tmp")
+    with open(tmp_path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator="\n")  # As the simulator writes it
+        if header:
+            writer.writerow(header)
+        last = None
+        for distance, rows in blocks:
+            # Refinement sweeps run some lines twice; they are written once
+            if distance != last:
+                writer.writerows(rows)
+            last = distance
+    os.replace(tmp_path, output_path)
+
+class Progress:
+    """
+    Snapshot of a run: grid cells (distance, robot speed points) done out of
+    the total, shots found and seconds elapsed. Cells reused from earlier
+    profiles count as done but not towards the simulation rate.
+    """
+    def __init__(self, cells_done=0, cells_total=0, shots_found=0, elapsed=0.0, cells_reused=0):
+        self.cells_done = cells_done
+        self.cells_total = cells_total
+        self.shots_found = shots_found
+        self.elapsed = elapsed
+        self.cells_reused = cells_reused
+
+    @property
+    def fraction(self):
+        return min(self.cells_done / self.cells_total, 1.0) if self.cells_total else 0.0
+
+    @property
+    def cells_per_second(self):
+        simulated = self.cells_done - self.cells_reused
+        return simulated / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Seconds until the remaining cells are done at the current rate, or None before any is."""
+        rate = self.cells_per_second
+        return max(self.cells_total - self.cells_done, 0) / rate if rate > 0 else None
+
+    def __str__(self):
+        return (
+            f"Progress({self.cells_done}/{self.cells_total} cells, {self.shots_found} shots, "
+            f"{self.elapsed:.1f}s)"
+        )
+
+def parse_progress_record(line):
+    """
+    Parses a "progress,<cells done>,<cells total>,<shots found>,<elapsed seconds>"
+    line of a streaming simulator into a tuple of those values, or None.
+    """
+    fields = line.split(",")
+    if len(fields) != 5 or fields[0] != "progress":
+        return None
+    try:
+        return int(fields[1]), int(fields[2]), int(fields[3]), float(fields[4])
+    except ValueError:
+        return None
+
+def parse_percentage_line(line):
+    """
+    Parses the "<percent> %" line a simulator built before progress records
+    prints as it starts each distance, into the percentage, or None.
+    """
+    if not line.endswith(" %"):
+        return None
+    try:
+        return float(line[:-2])
+    except ValueError:
+        return None
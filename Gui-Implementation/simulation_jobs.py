@@ -0,0 +1,237 @@
+import heapq
+import itertools
+import threading
+import time
+from enum import Enum
+from PySide6.QtCore import QThread, QObject, Signal
+import filemanagment
+import simulation
+from result_cache import ResultCache
+from simulation_runner import SimulationRun, resolve_exe
+from simulator_pool import SimulatorError, WorkerPool
+
+class SimulationWorker(QObject):
+    """Worker thread for running the shooting simulation."""
+    finished = Signal()
+    rows = Signal(int, object)  # generation id, float32 array shaped (n, 5)
+    progress = Signal(object)  # simulation.Progress
+
+    def __init__(self, settings, generation_id, exe_path, **options):
+        super().__init__()
+        # options are SimulationRun's: shards, cache, incremental, export_trajectories, refinement, pool
+        self.simulation = SimulationRun(
+            settings, generation_id, exe_path, on_rows=self.rows.emit, on_progress=self.progress.emit, **options
+        )
+
+    def abort(self):
+        self.simulation.abort()
+
+    def run(self):
+        try:
+            self.simulation.run()
+        finally:
+            self.finished.emit()
+
+
+class JobState(Enum):
+    """Lifecycle of a queued simulation run."""
+    QUEUED = 0
+    RUNNING = 1
+    FINISHED = 2
+    FAILED = 3
+    CANCELLED = 4
+
+class SimulationJob:
+    """A simulation run submitted to the JobQueue."""
+    def __init__(self, job_id, settings, priority=0):
+        self.id = job_id
+        self.settings = dict(settings)
+        self.priority = priority
+        self.state = JobState.QUEUED
+        self.profile_id = None
+        self.progress = 0.0  # 0..1
+        self.report = None  # Latest simulation.Progress of the run
+        self.rows = 0
+        self.cached = False
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.state in (JobState.FINISHED, JobState.FAILED, JobState.CANCELLED)
+
+    @property
+    def cells_per_second(self):
+        return self.report.cells_per_second if self.report is not None else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left while running, or None when unknown or done."""
+        if self.done or self.report is None:
+            return None
+        return self.report.eta
+
+    def __str__(self):
+        return f"SimulationJob(id={self.id}, state={self.state.name}, profile_id={self.profile_id})"
+
+class JobQueue(QObject):
+    """
+    Schedules simulation runs over a bounded number of simulator processes.
+
+    Jobs wait in a priority queue (higher priority first, then submission
+    order). A job is started while process slots are free and runs with as many
+    shards as there are free slots, so the number of simulator processes never
+    exceeds max_processes. Profile IDs are allocated when a job starts.
+
+    Once start_pool() has warmed a WorkerPool of max_processes simulators,
+    jobs run on it; until then, or if the simulator can't serve, every shard
+    launches a process of its own.
+    """
+    job_changed = Signal(object)  # SimulationJob
+    job_started = Signal(int)  # profile id
+    job_rows = Signal(int, object)  # profile id, float32 rows
+    job_finished = Signal(int)  # profile id
+
+    def __init__(self, exe_path, max_processes=None, cache=None, parent=None):
+        super().__init__(parent)
+        self.exe_path = exe_path
+        self.cache = cache if cache is not None else ResultCache()
+        self.incremental = True  # Reuse cells of compatible profiles
+        self.export_trajectories = False  # Have the simulator write each shot's arc
+        self.refinement = None  # simulation.Refinement to sample distance adaptively
+        self.max_processes = max_processes or simulation.default_shard_count()
+        self.pool = WorkerPool(resolve_exe(exe_path), self.max_processes)
+        self.jobs: dict[int, SimulationJob] = {}
+        self._pending = []  # heap of (-priority, job id)
+        self._ids = itertools.count()
+        self._running = {}  # job id -> (thread, worker)
+
+    @property
+    def busy_processes(self):
+        return sum(worker.simulation.shards for _, worker in self._running.values())
+
+    def set_max_processes(self, max_processes):
+        self.max_processes = max(1, int(max_processes))
+        self.pool.resize(self.max_processes)
+        self._schedule()
+
+    def start_pool(self):
+        """Warms the simulator pool on a background thread; jobs use it once it is ready."""
+        threading.Thread(target=self._warm_pool, daemon=True).start()
+
+    def _warm_pool(self):
+        try:
+            self.pool.start()
+        except SimulatorError as e:
+            print(f"Simulator pool unavailable, runs start a process each: {e}")
+
+    def submit(self, settings, priority=0):
+        """Queues a run of the given settings and returns its SimulationJob."""
+        job = SimulationJob(next(self._ids), settings, priority)
+        self.jobs[job.id] = job
+        heapq.heappush(self._pending, (-priority, job.id))
+        self.job_changed.emit(job)
+        self._schedule()
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a job; a running job's simulators are killed and its partial profile deleted."""
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return
+        if job.state == JobState.QUEUED:
+            job.state = JobState.CANCELLED
+            job.finished_at = time.monotonic()
+            self.job_changed.emit(job)
+        else:
+            job.state = JobState.CANCELLED
+            self._running[job_id][1].abort()
+
+    def cancel_profile(self, profile_id):
+        for job in self.jobs.values():
+            if job.profile_id == profile_id:
+                self.cancel(job.id)
+
+    def _schedule(self):
+        while self._pending and self.busy_processes < self.max_processes:
+            _, job_id = heapq.heappop(self._pending)
+            job = self.jobs[job_id]
+            if job.state == JobState.QUEUED:
+                free = self.max_processes - self.busy_processes
+                self._start(job, len(simulation.shard_settings(job.settings, free)))
+
+    def _start(self, job, shards):
+        job.profile_id = filemanagment.allocate_profile_id()
+        job.state = JobState.RUNNING
+        job.started_at = time.monotonic()
+
+        thread = QThread()
+        worker = SimulationWorker(
+            job.settings, job.profile_id, self.exe_path, shards=shards, cache=self.cache,
+            incremental=self.incremental, export_trajectories=self.export_trajectories, refinement=self.refinement,
+            pool=self.pool if self.pool.ready else None
+        )
+        worker.moveToThread(thread)
+        # Keep references until the thread finishes, or Python destroys it while running
+        self._running[job.id] = (thread, worker)
+
+        # Bound slots of this object, not lambdas, so they run queued on the GUI thread
+        worker.progress.connect(self._on_progress)
+        worker.rows.connect(self._on_rows)
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        # Both are Python-owned: dropping them from _running once the thread
+        # has finished deletes them, so no deleteLater can race these slots
+        thread.finished.connect(self._on_thread_finished)
+        worker.finished.connect(self._on_worker_finished)
+
+        self.job_started.emit(job.profile_id)
+        self.job_changed.emit(job)
+        thread.start()
+
+    def _sender_job(self):
+        """Returns the job whose thread or worker emitted the current signal."""
+        sender = self.sender()
+        for job_id, (thread, worker) in self._running.items():
+            if sender is thread or sender is worker:
+                return self.jobs[job_id]
+        return None
+
+    def _on_progress(self, progress):
+        job = self._sender_job()
+        if job is None:
+            return
+        # Cleared before reading, so a snapshot taken meanwhile is emitted rather than dropped
+        self._running[job.id][1].simulation.progress_pending = False
+        job.report = progress
+        job.progress = progress.fraction
+        self.job_changed.emit(job)
+
+    def _on_rows(self, profile_id, rows):
+        job = self._sender_job()
+        if job is not None:
+            job.rows += len(rows)
+        self.job_rows.emit(profile_id, rows)
+
+    def _on_worker_finished(self):
+        job = self._sender_job()
+        if job is None:
+            return
+        simulation_run = self._running[job.id][1].simulation
+        job.finished_at = time.monotonic()
+        if job.state == JobState.CANCELLED:
+            filemanagment.delete_profile(job.profile_id)
+        else:
+            job.state = JobState.FAILED if simulation_run.failed else JobState.FINISHED
+            job.cached = simulation_run.cache_hit
+            job.progress = 1.0 if not simulation_run.failed else job.progress
+        self.job_finished.emit(job.profile_id)
+        self.job_changed.emit(job)
+
+    def _on_thread_finished(self):
+        # Slots are released only once the thread is gone
+        job = self._sender_job()
+        if job is not None:
+            self._running.pop(job.id, None)
+        self._schedule()
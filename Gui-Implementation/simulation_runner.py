@@ -0,0 +1,389 @@
+"""
+Qt-free core of a simulation run: writes a profile's settings, runs the
+simulator, in fresh processes or on a simulator_pool.WorkerPool of warm
+ones, and merges its output. The GUI's SimulationWorker and
+the batch_runner command line both drive SimulationRun.
+"""
+import json
+import math
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+import numpy as np
+import filemanagment
+import simulation
+import trajectories
+from cost_estimate import RuntimeHistory
+from simulator_pool import SimulatorError, WorkerPool
+
+def resolve_exe(exe_path):
+    """Absolute path of the simulator binary; a relative path is relative to this directory."""
+    return Path(__file__).parent.absolute() / exe_path
+
+class SimulationRun:
+    """
+    One simulation run writing profiles/profile_<generation_id>.
+
+    Results are reported through two optional callbacks, called on the thread
+    that runs it: on_rows(generation_id, rows) with float32 arrays shaped
+    (n, 5), and on_progress(progress) with simulation.Progress snapshots.
+    """
+    # Streamed rows are forwarded in batches of this size, or sooner if the
+    # previous batch went out more than STREAM_BATCH_SECONDS ago.
+    STREAM_BATCH_ROWS = 1000
+    STREAM_BATCH_SECONDS = 0.05
+    # Progress goes out at most this often, and never while the receiver has
+    # not taken the previous snapshot (it clears progress_pending when it does)
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, settings, generation_id, exe_path, shards=None, cache=None, incremental=False,
+                 export_trajectories=False, refinement=None, pool: WorkerPool = None, on_rows=None, on_progress=None):
+        self.settings = settings
+        self.generation_id = generation_id
+        self.exe_path = exe_path
+        self.shards = shards if shards is not None else simulation.default_shard_count()
+        self.cache = cache  # ResultCache consulted before launching the simulator
+        self.incremental = incremental
+        self.refinement = refinement  # simulation.Refinement for adaptive distance steps, or None
+        # Warm simulators to run on instead of launching one per shard; they take
+        # the settings over stdin, so shard settings files are not written
+        self.pool = pool
+        # Write profile_N/trajectories.bin; refinement reruns some lines, so refined runs don't
+        self.export_trajectories = export_trajectories and refinement is None
+        self.on_rows = on_rows
+        self.on_progress = on_progress
+        self.processes = []
+        self.aborted = False
+        self.failed = False
+        self.cache_hit = False
+        self.progress_pending = False
+        self._last_progress = 0.0
+        self._started = time.monotonic()
+        self._shard_progress = []  # [cells done, cells total, shots found] per shard
+        self._reused_cells = 0
+        self._reused_shots = 0
+        self._simulated_cells = 0  # of refinement passes already finished
+        self._simulated_shots = 0
+        self._outdated_noted = False
+
+    def abort(self):
+        """Kills the running simulators; run() then finishes with the rows streamed so far."""
+        self.aborted = True
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+
+    def _emit_rows(self, batch):
+        if self.on_rows is not None:
+            self.on_rows(self.generation_id, np.array(batch, dtype=np.float32))
+
+    def _report_progress(self, force=False):
+        """Emits a Progress snapshot of all shards, rate limited unless forced."""
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and (self.progress_pending or now - self._last_progress < self.PROGRESS_INTERVAL):
+            return
+        self._last_progress = now
+        self.progress_pending = True
+        done, total, found = (sum(column) for column in zip(*self._shard_progress)) if self._shard_progress else (0, 0, 0)
+        earlier = self._reused_cells + self._simulated_cells
+        self.on_progress(simulation.Progress(
+            done + earlier, total + earlier, found + self._reused_shots + self._simulated_shots,
+            now - self._started, self._reused_cells
+        ))
+
+    def _start_shard(self, exe_abs_path, settings, settings_path, output_path, trajectories_path, index, lines):
+        """Launches one simulator, or a request to the pool, and a thread feeding its stdout into `lines`."""
+        if self.pool is not None:
+            return self.pool.submit(
+                settings, output_path, trajectories_path if self.export_trajectories else None,
+                on_line=lambda line: lines.put((index, line)), on_exit=lambda: lines.put((index, None))
+            )
+
+        args = [str(exe_abs_path), str(settings_path.absolute()), str(output_path.absolute()), "--stream"]
+        if self.export_trajectories:
+            args += ["--trajectories", str(trajectories_path.absolute())]
+        try:
+            process = subprocess.Popen(
+                args,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1, universal_newlines=True
+            )
+        except FileNotFoundError as e:
+            raise SimulatorError(f"Executable not found at {exe_abs_path}") from e
+
+        def pump():
+            for line in iter(process.stdout.readline, ''):
+                lines.put((index, line))
+            process.stdout.close()
+            lines.put((index, None))
+
+        threading.Thread(target=pump, daemon=True).start()
+        return process
+
+    def _serve_from_cache(self, exe_abs_path, output_path):
+        """Links a cached output for these settings into the profile, if there is one."""
+        if self.cache is None:
+            return False
+        cached = self.cache.lookup(self.settings, exe_abs_path)
+        if cached is None:
+            return False
+
+        self.cache.link(cached, output_path)
+        self.cache_hit = True
+        table = filemanagment.read_table(output_path)
+        if table is not None and len(table) and self.on_rows is not None:
+            self.on_rows(self.generation_id, np.ascontiguousarray(table.columns.T))
+        cells = len(simulation.distance_grid(self.settings)) * len(simulation.robot_speed_grid(self.settings))
+        self._reused_cells = cells
+        self._reused_shots = len(table) if table is not None else 0
+        self._report_progress(force=True)
+        return True
+
+    def _emit_reused_rows(self, reused):
+        """Streams the rows taken from earlier profiles to the live views."""
+        batch = []
+        for cells in reused:
+            for _, rows in cells.blocks():
+                batch.extend([float(v) for v in row] for row in rows)
+        if batch:
+            self._emit_rows(batch)
+        self._reused_cells = sum(cells.cell_count for cells in reused)
+        self._reused_shots = len(batch)
+
+    def _write_jobs(self, shards, shard_dir: Path, prefix=""):
+        """
+        Writes each shard's settings, unless it runs on the pool; returns
+        (settings, settings path, output path, trajectories path) per shard.
+        """
+        jobs = []
+        for i, (shard, _) in enumerate(shards):
+            shard_settings_path = shard_dir / f"settings_{prefix}{i}.json"
+            if self.pool is None:
+                with open(shard_settings_path, "w") as f:
+                    json.dump(shard, f)
+            jobs.append((
+                shard, shard_settings_path, shard_dir / f"output_{prefix}{i}.csv",
+                shard_dir / f"trajectories_{prefix}{i}.bin"
+            ))
+        return jobs
+
+    def _simulate(self, exe_abs_path, jobs, shards):
+        """
+        Runs a simulator per job, at most `self.shards` at a time, streaming
+        their rows and progress until all exit. Incremental and refined runs
+        may plan more sub-range sweeps than that; the rest wait for a slot.
+        """
+        # Until a shard reports, its total is estimated from its distance count
+        speeds = len(simulation.robot_speed_grid(self.settings))
+        self._shard_progress = [[0, count * speeds, 0] for _, count in shards]
+        self._report_progress(force=True)
+
+        lines = queue.Queue()
+        self.processes = []
+
+        def start_next():
+            i = len(self.processes)
+            self.processes.append(self._start_shard(exe_abs_path, *jobs[i], i, lines))
+            if self.aborted:
+                self.abort()
+
+        for _ in range(min(max(self.shards, 1), len(jobs))):
+            start_next()
+
+        batch = []
+        legacy = set()  # indices of shards printing percentage lines instead of progress records
+        last_emit = time.monotonic()
+        running = len(self.processes)
+        while running:
+            index, line = lines.get()
+            if line is None:
+                running -= 1
+                if index in legacy and self.processes[index].wait() == 0:
+                    self._shard_progress[index][0] = self._shard_progress[index][1]
+                if len(self.processes) < len(jobs) and not self.aborted:
+                    start_next()
+                    running += 1
+                continue
+            line = line.strip()
+            if not line.startswith("row,"):
+                record = simulation.parse_progress_record(line)
+                if record is not None:
+                    self._shard_progress[index] = list(record[:3])
+                    self._report_progress()
+                    continue
+                percent = simulation.parse_percentage_line(line)
+                if percent is not None:
+                    # An older simulator only reports the share of its distances started
+                    legacy.add(index)
+                    total = self._shard_progress[index][1]
+                    self._shard_progress[index][0] = min(int(total * percent / 100), total)
+                    self._report_progress()
+                continue
+            try:
+                batch.append([float(v) for v in line[4:].split(",")])
+            except ValueError:
+                continue
+            now = time.monotonic()
+            if len(batch) >= self.STREAM_BATCH_ROWS or now - last_emit >= self.STREAM_BATCH_SECONDS:
+                self._emit_rows(batch)
+                batch = []
+                last_emit = now
+        if batch:
+            self._emit_rows(batch)
+
+        for process in self.processes:
+            process.wait()
+            if process.returncode != 0 and not self.aborted:
+                print(f"Error in simulation: {process.stderr.read()}")
+                self.failed = True
+        if not self.failed and not self.aborted:
+            self._check_outdated_simulator(exe_abs_path, jobs, legacy)
+
+    def _check_outdated_simulator(self, exe_abs_path, jobs, legacy):
+        """
+        Makes up, where it can, for a simulator built before rows were streamed
+        (the shards in `legacy`) or trajectories exported, and says so.
+        """
+        if legacy:
+            if not self._outdated_noted:
+                print(f"{exe_abs_path} predates streamed rows and progress; rebuild it (see Shooting-Simulation/README)")
+                self._outdated_noted = True
+            # Its rows only exist once it wrote its output, so the live views get them at the end
+            for index in sorted(legacy):
+                table = filemanagment._parse_csv_table(jobs[index][2])
+                if table is not None and len(table):
+                    self._shard_progress[index][2] = len(table)
+                    if self.on_rows is not None:
+                        self.on_rows(self.generation_id, np.ascontiguousarray(table.columns.T))
+            self._report_progress(force=True)
+        if self.export_trajectories and any(not arcs.is_file() for _, _, _, arcs in jobs):
+            print(f"{exe_abs_path} wrote no trajectories; rebuild it (see Shooting-Simulation/README)")
+
+    def _finish_pass(self):
+        """Folds the shards' progress into the run's, before the next pass's shards report."""
+        for done, _, found in self._shard_progress:
+            self._simulated_cells += done
+            self._simulated_shots += found
+        self._shard_progress = []
+
+    def _run_refined(self, exe_abs_path, profile_dir: Path, output_path: Path):
+        """
+        Sweeps the settings' grid, then resamples the distance intervals where
+        the table is rough, a pass per refinement level, and merges every pass
+        into one table with non-uniform distance steps.
+        """
+        refinement = self.refinement
+        refinement.save(profile_dir)
+        shard_dir = profile_dir / "shards"
+        shard_dir.mkdir(exist_ok=True)
+
+        speeds = {simulation.cell_key(speed) for speed in simulation.robot_speed_grid(self.settings)}
+        distances = {}  # cell key -> distance, of every line simulated so far
+        resolved = simulation.resolve_settings(self.settings)
+        width = resolved["deltadistance"]
+        angle_step = math.radians(resolved["deltaangle"])
+        min_step = simulation.min_refinement_step(self.settings)
+        shards = simulation.shard_settings(self.settings, self.shards)
+        outputs = []
+        for level in range(refinement.levels + 1):
+            jobs = self._write_jobs(shards, shard_dir, f"{level}_")
+            self._simulate(exe_abs_path, jobs, shards)
+            if self.failed or self.aborted:
+                return
+            self._finish_pass()
+            outputs += [output for _, _, output, _ in jobs]
+            for shard, _ in shards:
+                for distance in simulation.distance_grid(shard):
+                    distances.setdefault(simulation.cell_key(distance), distance)
+            if level == refinement.levels or width / refinement.factor < min_step:
+                break
+
+            merged_path = shard_dir / f"merged_{level}.csv"
+            simulation.merge_shard_outputs(outputs, merged_path)
+            table = filemanagment.read_table(merged_path)
+            ordered = sorted(distances.values())
+            intervals = []
+            if table is not None:
+                intervals = simulation.rough_intervals(table, ordered, speeds, refinement, width, angle_step)
+            if not intervals:
+                break
+            shards = simulation.plan_refinement(self.settings, ordered, intervals, width, refinement.factor, self.shards)
+            width /= refinement.factor
+
+        simulation.merge_shard_outputs(outputs, output_path)
+
+    def run(self):
+        """
+        Execute the simulation, split over `shards` concurrent simulators.
+
+        With `incremental`, distance lines already simulated by a profile with
+        the same physics are reused and only the rest is simulated. Cached and
+        reused results carry no trajectories, so runs that export them always
+        simulate every cell. A run with a `refinement` samples distance
+        adaptively; it neither uses nor fills the cache and exports no
+        trajectories.
+        """
+        self._started = time.monotonic()
+        profile_dir = filemanagment.PROFILES_PATH / f"profile_{self.generation_id}"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+        settings_path = profile_dir / "settings.json"
+        with open(settings_path, "w") as f:
+            json.dump(self.settings, f)
+
+        output_path = profile_dir / "output.csv"
+        exe_abs_path = resolve_exe(self.exe_path)
+
+        jobs = []
+        try:
+            if self.refinement is not None:
+                self._run_refined(exe_abs_path, profile_dir, output_path)
+                self._report_progress(force=True)
+                return
+
+            if not self.export_trajectories and self._serve_from_cache(exe_abs_path, output_path):
+                return
+
+            shards = simulation.shard_settings(self.settings, self.shards)
+            reused = []
+            if self.incremental and self.cache is not None and not self.export_trajectories:
+                candidates = self.cache.compatible_profiles(self.settings, exe_abs_path)
+                if candidates:
+                    shards, reused = simulation.plan_incremental(self.settings, candidates, self.shards)
+                    self._emit_reused_rows(reused)
+
+            if len(shards) == 1 and not reused:
+                jobs = [(self.settings, settings_path, output_path, profile_dir / "trajectories.bin")]
+            else:
+                shard_dir = profile_dir / "shards"
+                shard_dir.mkdir(exist_ok=True)
+                jobs = self._write_jobs(shards, shard_dir)
+
+            self._simulate(exe_abs_path, jobs, shards)
+
+            if (len(jobs) > 1 or reused) and not self.failed and not self.aborted:
+                simulation.merge_shard_outputs([output for _, _, output, _ in jobs], output_path, reused)
+                if self.export_trajectories and all(arcs.is_file() for _, _, _, arcs in jobs):
+                    trajectories.merge_trajectory_files(
+                        [arcs for _, _, _, arcs in jobs], profile_dir / "trajectories.bin"
+                    )
+            if self.cache is not None and not self.failed and not self.aborted:
+                self.cache.store(self.settings, exe_abs_path, output_path)
+            if not reused and not self.failed and not self.aborted:
+                # Calibrates the cost estimates of later runs
+                RuntimeHistory().record(self.settings, len(jobs), time.monotonic() - self._started)
+            self._report_progress(force=True)
+
+        except SimulatorError as e:
+            print(f"Error: {e}")
+            self.failed = True
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+            self.failed = True
+        finally:
+            shutil.rmtree(profile_dir / "shards", ignore_errors=True)
+            filemanagment.get_catalog().update_profile(self.generation_id)
@@ -0,0 +1,433 @@
+"""
+Keeps simulator processes warm between runs:
+
+    python simulator_pool.py [--exe PATH] [--workers N] [--repeat N] SETTINGS_FILE
+
+Each worker is one simulator started with --serve. It reads one JSON request
+per line on stdin and answers on stdout with the lines --stream prints,
+closed by "done,<id>,<rows>,<seconds>" or "error,<id>,<message>", so a run
+costs its sweep rather than a process launch and a settings file. The
+command line times runs on a pool against a fresh process per run. Nothing
+here imports PySide6.
+"""
+import argparse
+import collections
+import io
+import itertools
+import json
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import simulation
+
+class SimulatorError(RuntimeError):
+    """A request the simulator could not run, or a worker that is gone."""
+
+class SimulatorWorker:
+    """One simulator process in --serve mode, running one request at a time."""
+    START_TIMEOUT_S = 5.0
+    STDERR_LINES = 20
+
+    def __init__(self, exe_path):
+        self.exe_path = Path(exe_path)
+        self.process = None
+        self.requests = 0  # served since the last start
+        self._lines = None  # stdout lines, then None once it closes
+        self._stderr = collections.deque(maxlen=self.STDERR_LINES)
+        self._exe_mtime = None
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def stale(self):
+        """Whether the binary changed since the process started, so its results would be too."""
+        try:
+            return self.exe_path.stat().st_mtime_ns != self._exe_mtime
+        except FileNotFoundError:
+            return True
+
+    def start(self):
+        """(Re)starts the process; raises SimulatorError unless it answers a ping."""
+        self.kill()
+        try:
+            self._exe_mtime = self.exe_path.stat().st_mtime_ns
+            self.process = subprocess.Popen(
+                [str(self.exe_path), "--serve"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1
+            )
+        except OSError as e:
+            raise SimulatorError(f"Cannot start {self.exe_path}: {e}") from e
+        self._lines = queue.Queue()
+        self._stderr.clear()
+        threading.Thread(target=self._pump, args=(self.process, self._lines), daemon=True).start()
+        threading.Thread(target=self._pump_stderr, args=(self.process,), daemon=True).start()
+        self.requests = 0
+        if not self.ping(self.START_TIMEOUT_S):
+            self.kill()
+            raise SimulatorError(f"{self.exe_path} does not answer in --serve mode")
+
+    @staticmethod
+    def _pump(process, lines):
+        for line in iter(process.stdout.readline, ''):
+            lines.put(line)
+        process.stdout.close()
+        lines.put(None)
+
+    def _pump_stderr(self, process):
+        for line in iter(process.stderr.readline, ''):
+            self._stderr.append(line.rstrip("\n"))
+        process.stderr.close()
+
+    def _send(self, request):
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (AttributeError, OSError, ValueError) as e:
+            raise SimulatorError(f"Simulator worker is gone: {e}") from e
+
+    def _gone(self):
+        code = self.process.wait() if self.process is not None else None
+        tail = " ".join(self._stderr)
+        return SimulatorError(f"Simulator worker exited with code {code}" + (f": {tail}" if tail else ""))
+
+    def ping(self, timeout=1.0):
+        """Whether the process answers a ping within `timeout` seconds."""
+        if not self.alive:
+            return False
+        request_id = next(self._ids)
+        try:
+            self._send({"id": request_id, "ping": True})
+        except SimulatorError:
+            return False
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                return False
+            if line is None:
+                return False
+            if line.strip() == f"pong,{request_id}":
+                return True
+
+    def run(self, settings, output_path=None, trajectories_path=None, on_line=None):
+        """
+        Runs a settings dict as a settings file would and returns its row count.
+
+        The simulator writes the rows to output_path and the shots' arcs to
+        trajectories_path when they are given. on_line(line) gets every row
+        and progress line as it arrives. Raises SimulatorError if the run
+        fails; the worker stays usable unless it died.
+        """
+        request_id = next(self._ids)
+        request = {"id": request_id, "settings": settings}
+        if output_path is not None:
+            request["output"] = str(Path(output_path).absolute())
+        if trajectories_path is not None:
+            request["trajectories"] = str(Path(trajectories_path).absolute())
+        self._send(request)
+        self.requests += 1
+
+        while True:
+            line = self._lines.get()
+            if line is None:
+                raise self._gone()
+            if line.startswith(("done,", "error,")):
+                kind, reply_id, rest = line.rstrip("\n").split(",", 2)
+                if reply_id != str(request_id):
+                    continue
+                if kind == "error":
+                    raise SimulatorError(rest)
+                return int(rest.split(",")[0])
+            if on_line is not None:
+                on_line(line)
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def stop(self, timeout=1.0):
+        """Lets the process finish its request and exit, killing it after `timeout` seconds."""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+class PoolRun:
+    """
+    A request running on a pooled worker, on a thread of its own.
+
+    It offers the part of Popen's interface SimulationRun uses (poll, wait,
+    kill, returncode, stderr), so pooled and one-off simulators are driven
+    the same way. on_exit() is called once the run is over, whatever its end.
+    """
+    KILLED = -9
+
+    def __init__(self, pool, settings, output_path, trajectories_path, on_line, on_exit):
+        self.returncode = None
+        self.rows = None
+        self.stderr = io.StringIO()
+        self._pool = pool
+        self._worker = None
+        self._killed = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        threading.Thread(
+            target=self._run, args=(settings, output_path, trajectories_path, on_line, on_exit), daemon=True
+        ).start()
+
+    def _run(self, settings, output_path, trajectories_path, on_line, on_exit):
+        try:
+            worker = self._pool.acquire()
+        except SimulatorError as e:
+            self.stderr.write(str(e))
+            self.returncode = 1
+        else:
+            with self._lock:
+                self._worker = worker
+                killed = self._killed
+            try:
+                if not killed:
+                    self.rows = worker.run(settings, output_path, trajectories_path, on_line)
+                self.returncode = self.KILLED if killed else 0
+            except SimulatorError as e:
+                self.stderr.write(str(e))
+                self.returncode = self.KILLED if self._killed else 1
+            finally:
+                self._pool.release(worker)
+        finally:
+            self.stderr.seek(0)
+            self._done.set()
+            if on_exit is not None:
+                on_exit()
+
+    def poll(self):
+        return self.returncode if self._done.is_set() else None
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired("simulator worker", timeout)
+        return self.returncode
+
+    def kill(self):
+        """Ends the run by killing its worker, which the pool restarts before its next run."""
+        with self._lock:
+            self._killed = True
+            worker = self._worker
+        if worker is not None and not self._done.is_set():
+            worker.kill()
+
+class WorkerPool:
+    """
+    Up to `size` warm SimulatorWorkers shared by any number of threads.
+
+    acquire() hands out an idle worker, waiting while all are busy, and
+    starts workers on demand up to `size`. A worker that died, or whose binary
+    was rebuilt, is restarted before it is handed out again, and the health
+    checks restart idle workers that stop answering pings, so a crash costs
+    one run rather than the pool.
+    """
+    HEALTH_INTERVAL_S = 30.0
+    PING_TIMEOUT_S = 2.0
+
+    def __init__(self, exe_path, size=None):
+        self.exe_path = Path(exe_path)
+        self.size = max(1, size or simulation.default_shard_count())
+        self.ready = False  # set once start() found the simulator serving
+        self.restarts = 0
+        self._idle = []  # most recently used last, so a busy pool keeps reusing the warmest
+        self._count = 0  # workers idle or handed out
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts every worker and the health checks. Raises SimulatorError if
+        the simulator can't be started or has no --serve mode.
+        """
+        workers = []
+        try:
+            for _ in range(self.size):
+                workers.append(self.acquire())
+        finally:
+            for worker in workers:
+                self.release(worker)
+        self.ready = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._check_periodically, daemon=True)
+            self._thread.start()
+
+    def acquire(self):
+        """Takes an idle worker, (re)starting it if needed; give it back with release()."""
+        with self._condition:
+            while not self._closed and not self._idle and self._count >= self.size:
+                self._condition.wait()
+            if self._closed:
+                raise SimulatorError("Simulator pool is closed")
+            if self._idle:
+                worker = self._idle.pop()
+            else:
+                worker = SimulatorWorker(self.exe_path)
+                self._count += 1
+        if not worker.alive or worker.stale:
+            restart = worker.process is not None
+            try:
+                worker.start()
+            except SimulatorError:
+                self._drop(worker)
+                raise
+            if restart:
+                self.restarts += 1
+        return worker
+
+    def release(self, worker):
+        with self._condition:
+            if self._closed or self._count > self.size:
+                self._count -= 1
+                worker.stop()
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def _drop(self, worker):
+        worker.kill()
+        with self._condition:
+            self._count -= 1
+            self._condition.notify()
+
+    def submit(self, settings, output_path=None, trajectories_path=None, on_line=None, on_exit=None):
+        """Runs a settings dict on the next idle worker and returns its PoolRun at once."""
+        return PoolRun(self, settings, output_path, trajectories_path, on_line, on_exit)
+
+    def run(self, settings, output_path=None, trajectories_path=None, on_line=None):
+        """Runs a settings dict on the next idle worker and returns its row count (see SimulatorWorker.run)."""
+        worker = self.acquire()
+        try:
+            return worker.run(settings, output_path, trajectories_path, on_line)
+        finally:
+            self.release(worker)
+
+    def resize(self, size):
+        """Grows on demand; shrinks by stopping idle workers now and busy ones when released."""
+        with self._condition:
+            self.size = max(1, int(size))
+            while self._count > self.size and self._idle:
+                self._idle.pop(0).stop()
+                self._count -= 1
+            self._condition.notify_all()
+
+    def check(self):
+        """Pings the idle workers and restarts those that died or don't answer; returns how many were restarted."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+        restarted = 0
+        try:
+            for worker in idle:
+                if worker.ping(self.PING_TIMEOUT_S) and not worker.stale:
+                    continue
+                try:
+                    worker.start()
+                    restarted += 1
+                except SimulatorError as e:
+                    # Left dead; acquire() tries again when it is needed
+                    print(f"Error restarting simulator worker: {e}")
+        finally:
+            with self._condition:
+                self._idle = idle + self._idle
+                self._condition.notify_all()
+        self.restarts += restarted
+        return restarted
+
+    def _check_periodically(self):
+        while not self._stop.wait(self.HEALTH_INTERVAL_S):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error checking simulator workers: {e}")
+
+    def close(self):
+        """Stops the idle workers and the health checks; busy workers stop when released."""
+        self._stop.set()
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _time_processes(exe_path, settings, repeat, directory: Path):
+    """Seconds per run of a fresh simulator process reading a settings file, as SimulationRun launches them."""
+    settings_path = directory / "settings.json"
+    with open(settings_path, "w") as f:
+        json.dump(settings, f)
+    start = time.perf_counter()
+    for i in range(repeat):
+        subprocess.run(
+            [str(exe_path), str(settings_path), str(directory / f"process_{i}.csv"), "--stream"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        )
+    return (time.perf_counter() - start) / repeat
+
+def _time_pool(pool, settings, repeat, directory: Path):
+    start = time.perf_counter()
+    for i in range(repeat):
+        pool.run(settings, directory / f"pool_{i}.csv")
+    return (time.perf_counter() - start) / repeat
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python simulator_pool.py", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("settings", type=Path, help="settings file to time")
+    parser.add_argument("--exe", default="shootingsim.exe", help="simulator binary, relative to this directory")
+    parser.add_argument("--workers", type=int, default=1, help="warm workers in the pool")
+    parser.add_argument("--repeat", type=int, default=10, help="runs timed each way")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.settings) as f:
+            settings = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {args.settings}: {e}")
+        return 2
+
+    exe_path = Path(__file__).parent.absolute() / args.exe
+    repeat = max(1, args.repeat)
+    with tempfile.TemporaryDirectory() as directory, WorkerPool(exe_path, args.workers) as pool:
+        try:
+            start = time.perf_counter()
+            pool.start()
+            warm_up = time.perf_counter() - start
+            pooled = _time_pool(pool, settings, repeat, Path(directory))
+            launched = _time_processes(exe_path, settings, repeat, Path(directory))
+        except (SimulatorError, OSError, subprocess.CalledProcessError) as e:
+            print(f"Error running {exe_path}: {e}")
+            return 1
+    print(f"pool start ({pool.size} workers): {warm_up * 1000:.1f} ms")
+    print(f"warm worker:   {pooled * 1000:.1f} ms per run")
+    print(f"fresh process: {launched * 1000:.1f} ms per run")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+Polynomial fits of a ResultTable: a known polynomial is recovered, and a
+table with fewer rows than coefficients gets no fit.
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import sys
+import unittest
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import filemanagment
+import poly_fit
+
+def speed_of(d, v):
+    return 2.0 + 0.5 * d - 0.25 * v + 0.125 * d * v + 0.0625 * d ** 2
+
+def angle_of(d, v):
+    return 1.0 - 0.125 * d + 0.03125 * v ** 2
+
+def make_table(distances, robot_speeds):
+    d, v = (grid.ravel() for grid in np.meshgrid(distances, robot_speeds, indexing="ij"))
+    columns = np.vstack([d, speed_of(d, v), v, angle_of(d, v), np.zeros_like(d)]).astype(filemanagment.COLUMNS_DTYPE)
+    return filemanagment.ResultTable(list(filemanagment.OUTPUT_COLUMNS), columns)
+
+class FitTableTest(unittest.TestCase):
+    def test_known_2d_polynomial(self):
+        table = make_table(np.arange(1.0, 5.0, 0.25), np.arange(-2.0, 2.5, 0.5))
+        fit = poly_fit.fit_table(table, 2)
+
+        self.assertTrue(fit.is_2d)
+        self.assertEqual(fit.rows, len(table))
+        self.assertEqual(len(fit.exponents), 6)
+        # float32 columns limit the recovery to about 1e-6
+        expected = {(0, 0): (2.0, 1.0), (1, 0): (0.5, -0.125), (0, 1): (-0.25, 0.0),
+                    (1, 1): (0.125, 0.0), (2, 0): (0.0625, 0.0), (0, 2): (0.0, 0.03125)}
+        for exponent, coefficient in zip(fit.exponents, fit.coefficients):
+            np.testing.assert_allclose(coefficient, expected[exponent], atol=1e-5)
+        self.assertLess(fit.max_error.max(), 1e-5)
+
+        speeds, angles = fit.evaluate([1.6, 3.3], [0.7, -1.2])
+        np.testing.assert_allclose(speeds, speed_of(np.array([1.6, 3.3]), np.array([0.7, -1.2])), atol=1e-5)
+        np.testing.assert_allclose(angles, angle_of(np.array([1.6, 3.3]), np.array([0.7, -1.2])), atol=1e-5)
+
+    def test_1d_fit_uses_the_nearest_robot_speed_line(self):
+        table = make_table(np.arange(1.0, 5.0, 0.25), np.arange(-2.0, 2.5, 0.5))
+        fit = poly_fit.fit_table(table, 2, robot_speed=0.6)
+
+        self.assertFalse(fit.is_2d)
+        self.assertEqual(fit.robot_speed, 0.5)
+        self.assertEqual(fit.rows, 16)
+        speeds, _ = fit.evaluate([1.3, 4.1], 123.0)  # a 1D fit ignores the robot speed
+        np.testing.assert_allclose(speeds, speed_of(np.array([1.3, 4.1]), 0.5), atol=1e-5)
+
+    def test_too_few_rows(self):
+        table = make_table(np.array([1.0, 2.0]), np.array([-1.0, 0.0]))
+        self.assertIsNone(poly_fit.fit_table(table, 2))  # 4 rows, 6 coefficients
+        self.assertIsNone(poly_fit.fit_table(table, 2, robot_speed=0.0))  # 2 rows, 3 coefficients
+        self.assertIsNotNone(poly_fit.fit_table(table, 1, robot_speed=0.0))
+
+    def test_empty_table(self):
+        table = filemanagment.ResultTable.empty()
+        self.assertIsNone(poly_fit.fit_table(table, 1))
+        self.assertIsNone(poly_fit.fit_table(table, 1, robot_speed=0.0))
+
+if __name__ == "__main__":
+    unittest.main()
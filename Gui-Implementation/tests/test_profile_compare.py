@@ -0,0 +1,96 @@
+"""
+Cell keys and the sorted-key join of profile_compare on small synthetic tables.
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import sys
+import unittest
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import filemanagment
+import profile_compare
+
+def make_table(cells, speed=9.5):
+    """A ResultTable with a row per (distance, robot speed) cell; `speed` is one value or a dict by cell."""
+    rows = []
+    for distance, robot_speed in cells:
+        value = speed.get((distance, robot_speed), 9.5) if isinstance(speed, dict) else speed
+        rows.append([distance, value, robot_speed, 0.7, 2.0])
+    columns = np.ascontiguousarray(np.array(rows, dtype=filemanagment.COLUMNS_DTYPE).T)
+    return filemanagment.ResultTable(list(filemanagment.OUTPUT_COLUMNS), columns)
+
+def grid(distances, robot_speeds):
+    return [(d, v) for d in distances for v in robot_speeds]
+
+class CellKeysTest(unittest.TestCase):
+    def test_keys_round_trip_and_sort_in_grid_order(self):
+        cells = grid([0.3, 1.0, 12.75], [-3.2, -0.01, 0.0, 0.01, 3.2])
+        table = make_table(cells)
+        keys = profile_compare._cell_keys(table)
+
+        self.assertEqual(len(np.unique(keys)), len(cells))
+        # Sorted by distance, then robot speed, negative speeds first
+        self.assertTrue((np.diff(keys) > 0).all())
+        comparison = profile_compare.compare_tables([0], [table])
+        np.testing.assert_allclose(comparison.distance, [d for d, _ in cells])
+        np.testing.assert_allclose(comparison.robot_speed, [v for _, v in cells])
+
+    def test_float32_coordinates_hit_the_same_key(self):
+        # Exported as float32, 0.1 and -0.3 aren't exact; scaled and rounded they still join
+        a = make_table([(1.1, -0.3), (2.2, 0.1)])
+        b = make_table([(np.float32(1.1), np.float32(-0.3)), (np.float32(2.2), np.float32(0.1))])
+        np.testing.assert_array_equal(profile_compare._cell_keys(a), profile_compare._cell_keys(b))
+
+class CompareTablesTest(unittest.TestCase):
+    def test_overlapping_grids(self):
+        base = make_table(grid([1.0, 2.0], [-0.5, 0.0, 0.5]))
+        other = make_table(grid([2.0, 3.0], [-0.5, 0.0]), speed={(2.0, 0.0): 10.0})
+        comparison = profile_compare.compare_tables([4, 7], [base, other])
+
+        self.assertEqual(len(comparison), 8)
+        self.assertEqual(int(comparison.in_all().sum()), 2)
+        self.assertEqual(int(comparison.only_in(0).sum()), 4)
+        self.assertEqual(int(comparison.only_in(1).sum()), 2)
+        # Six cells are missing from one profile, one shared cell changed speed
+        self.assertEqual(int(comparison.changed().sum()), 7)
+        self.assertEqual(int(comparison.changed(tolerance=1.0).sum()), 6)
+
+        delta = comparison.delta("speed")
+        shared = comparison.in_all()
+        np.testing.assert_allclose(np.sort(delta[shared]), [0.0, 0.5])
+        self.assertTrue(np.isnan(delta[~shared]).all())
+
+        summary = comparison.summary()
+        self.assertEqual(summary["only_in"], {4: 4, 7: 2})
+        self.assertEqual(summary["deltas"][7]["speed"]["changed"], 1)
+        self.assertAlmostEqual(summary["deltas"][7]["speed"]["max"], 0.5)
+        self.assertEqual(summary["deltas"][7]["angle"]["changed"], 0)
+
+    def test_disjoint_grids(self):
+        base = make_table(grid([1.0], [-1.0, 0.0]))
+        other = make_table(grid([2.0], [-1.0, 0.0]))
+        comparison = profile_compare.compare_tables([0, 1], [base, other])
+
+        self.assertEqual(len(comparison), 4)
+        self.assertFalse(comparison.in_all().any())
+        self.assertEqual(int(comparison.only_in(0).sum()), 2)
+        self.assertEqual(int(comparison.only_in(1).sum()), 2)
+        self.assertTrue(comparison.changed().all())
+        self.assertTrue(np.isnan(comparison.delta("speed")).all())
+        stats = comparison.summary()["deltas"][1]["speed"]
+        self.assertEqual((stats["changed"], stats["mean"], stats["max"]), (0, 0.0, 0.0))
+
+    def test_three_profiles(self):
+        cells = grid([1.0, 2.0], [-0.5, 0.5])
+        tables = [make_table(cells), make_table(cells[:3]), make_table(cells, speed={(1.0, -0.5): 9.0})]
+        comparison = profile_compare.compare_tables([0, 1, 2], tables)
+
+        self.assertEqual(int(comparison.in_all().sum()), 3)
+        self.assertEqual([int(comparison.only_in(i).sum()) for i in range(3)], [0, 0, 0])
+        # (2.0, 0.5) is missing from profile 1, (1.0, -0.5) changed in profile 2
+        self.assertEqual(int(comparison.changed().sum()), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+The result cache against profiles the ProfileStore compresses or deletes.
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import filemanagment
+import simulation
+from profile_store import ProfileStore, RetentionPolicy
+from result_cache import ResultCache
+
+SETTINGS = {"mindistance": 1, "maxdistance": 3, "deltadistance": 1, "maxrobotspeed": 0.5, "deltarobotspeed": 0.5}
+
+class CompressedProfileTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._dir.name)
+        self._profiles_path = filemanagment.PROFILES_PATH
+        filemanagment.PROFILES_PATH = self.root / "profiles"
+        filemanagment.PROFILES_PATH.mkdir()
+
+        # A binary older than every output, so the profiles count as current
+        self.exe = self.root / "shootingsim.exe"
+        self.exe.write_bytes(b"simulator")
+        os.utime(self.exe, (1, 1))
+
+        profile_dir = filemanagment.PROFILES_PATH / "profile_0"
+        profile_dir.mkdir()
+        (profile_dir / "settings.json").write_text(json.dumps(SETTINGS))
+        lines = ["distance,speed,robot-speed,angle,max-height"]
+        for distance in simulation.distance_grid(SETTINGS):
+            for speed in simulation.robot_speed_grid(SETTINGS):
+                lines.append(f"{distance},9.5,{speed},0.7,2.0")
+        self.output = profile_dir / "output.csv"
+        self.output.write_text("".join(line + "\n" for line in lines))
+        filemanagment.get_catalog().update_profile(0)
+
+    def tearDown(self):
+        filemanagment.PROFILES_PATH = self._profiles_path
+        self._dir.cleanup()
+
+    def test_compress_then_rerun(self):
+        ProfileStore().compress(0)
+        self.assertFalse(self.output.is_file())
+
+        # Before the fix the adopted path no longer existed and store() raised FileNotFoundError
+        cache = ResultCache()
+        self.assertIsNone(cache.lookup(SETTINGS, self.exe))
+
+        # Incremental runs still reuse its lines, read through the compressed file
+        candidates = cache.compatible_profiles(SETTINGS, self.exe)
+        self.assertEqual([path for _, path in candidates], [self.output])
+        shards, reused = simulation.plan_incremental(SETTINGS, candidates, 2)
+        self.assertEqual(shards, [])
+        self.assertEqual(sum(len(rows) for reuse in reused for _, rows in reuse.blocks()), 9)
+
+    def test_plain_profile_is_adopted(self):
+        cached = ResultCache().lookup(SETTINGS, self.exe)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.read_bytes(), self.output.read_bytes())
+
+    def test_compress_evicts_the_linked_object(self):
+        cache = ResultCache()
+        cached = cache.lookup(SETTINGS, self.exe)
+        self.assertTrue(os.path.samefile(cached, self.output))
+
+        ProfileStore(cache=cache).compress(0)
+        # Otherwise the object would keep the plain output's bytes on disk
+        self.assertFalse(cached.exists())
+        self.assertIsNone(cache.lookup(SETTINGS, self.exe))
+
+    def test_deletion_evicts_the_linked_object(self):
+        cache = ResultCache()
+        cached = cache.lookup(SETTINGS, self.exe)
+        old = time.time() - 2 * ProfileStore.MIN_IDLE_S
+        os.utime(self.output, (old, old))
+        filemanagment.get_catalog().update_profile(0)
+
+        store = ProfileStore(RetentionPolicy(compress_after_days=1000, max_bytes=0), cache=cache)
+        _, _, deleted, _ = store.compact()
+        self.assertEqual(deleted, [0])
+        self.assertFalse(cached.exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+ShootingTable lookups on small synthetic grids: holes, strict mode, a
+refined distance axis and agreement of lookup() with lookup_batch().
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import simulation
+from shooting_table import ShootingTable
+
+def plane_table(distances, robot_speeds=(-1.0, 0.0, 1.0), holes=()):
+    """A table whose speed is 10 + distance + robot speed and angle 0.5 + distance / 10, with NaN holes."""
+    d, r = np.meshgrid(np.asarray(distances, dtype=np.float64), np.asarray(robot_speeds), indexing="ij")
+    speed = 10 + d + r
+    angle = 0.5 + d / 10
+    for i, j in holes:
+        speed[i, j] = angle[i, j] = np.nan
+    step = robot_speeds[1] - robot_speeds[0]
+    return ShootingTable(distances, distances[1] - distances[0], robot_speeds[0], step, speed, angle)
+
+class LookupTest(unittest.TestCase):
+    def test_grid_points_and_interpolation(self):
+        table = plane_table([1.0, 2.0, 3.0])
+        self.assertEqual(table.lookup(2.0, 1.0), (13.0, 0.7))
+        speed, angle = table.lookup(1.5, -0.5)
+        self.assertAlmostEqual(speed, 11.0)
+        self.assertAlmostEqual(angle, 0.65)
+
+    def test_outside_and_non_finite(self):
+        table = plane_table([1.0, 2.0, 3.0])
+        for distance, robot_speed in ((0.5, 0.0), (3.5, 0.0), (2.0, 1.5), (math.nan, 0.0), (math.inf, 0.0), (2.0, -math.inf)):
+            with self.subTest(distance=distance, robot_speed=robot_speed):
+                self.assertTrue(all(math.isnan(v) for v in table.lookup(distance, robot_speed)))
+                self.assertTrue(all(np.isnan(v) for v in table.lookup_batch(distance, robot_speed)))
+
+    def test_holes(self):
+        table = plane_table([1.0, 2.0, 3.0], holes=[(1, 1)])
+        self.assertEqual(table.hole_count, 1)
+        self.assertTrue(math.isnan(table.lookup(2.0, 0.0)[0]))
+        # The hole's weight is spread over the valid corners of the cell
+        speed, _ = table.lookup(1.5, -0.5)
+        self.assertAlmostEqual(speed, (10.0 + 11.0 + 11.0) / 3)
+        # Strict mode refuses any cell touching it, but not a grid point next to it
+        self.assertTrue(math.isnan(table.lookup(1.5, -0.5, strict=True)[0]))
+        self.assertEqual(table.lookup(1.0, 0.0, strict=True)[0], 11.0)
+
+    def test_single_line_table(self):
+        table = ShootingTable([2.0], 0.5, -1.0, 1.0, np.array([[11.0, 12.0, 13.0]]), np.array([[0.7, 0.7, 0.7]]))
+        self.assertEqual(table.lookup(2.0, 0.0), (12.0, 0.7))
+        self.assertTrue(math.isnan(table.lookup(2.1, 0.0)[0]))
+
+    def test_empty_table(self):
+        table = ShootingTable([], 0.5, -1.0, 1.0, np.empty((0, 3)), np.empty((0, 3)))
+        self.assertTrue(math.isnan(table.lookup(1.0, 0.0)[0]))
+        speeds, angles = table.lookup_batch([1.0, 2.0], 0.0)
+        self.assertTrue(np.isnan(speeds).all() and np.isnan(angles).all())
+
+    def test_scalar_and_batch_agree(self):
+        tables = [
+            plane_table([1.0, 2.0, 3.0, 4.0], holes=[(1, 1), (3, 0)]),
+            plane_table([1.0, 1.25, 1.5, 2.0, 3.0], holes=[(2, 2)]),
+        ]
+        rng = np.random.default_rng(0)
+        distances = np.concatenate([rng.uniform(0.5, 4.5, 300), [1.0, 1.25, 2.0, 3.0, 4.0, math.nan]])
+        robot_speeds = np.concatenate([rng.uniform(-1.5, 1.5, 300), [-1.0, 0.0, 1.0, 0.5, -0.5, 0.0]])
+        for table in tables:
+            for strict in (False, True):
+                speeds, angles = table.lookup_batch(distances, robot_speeds, strict=strict)
+                for k in range(len(distances)):
+                    with self.subTest(strict=strict, distance=distances[k], robot_speed=robot_speeds[k]):
+                        speed, angle = table.lookup(float(distances[k]), float(robot_speeds[k]), strict=strict)
+                        np.testing.assert_allclose([speed, angle], [speeds[k], angles[k]], rtol=1e-12, equal_nan=True)
+
+class RefinedAxisTest(unittest.TestCase):
+    SETTINGS = {"mindistance": 1, "maxdistance": 3, "deltadistance": 1, "maxrobotspeed": 1, "deltarobotspeed": 1}
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.profile_dir = Path(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def write_output(self, distances):
+        lines = ["distance,speed,robot-speed,angle,max-height"]
+        for distance in distances:
+            for robot_speed in simulation.robot_speed_grid(self.SETTINGS):
+                lines.append(f"{distance},{10 + distance + robot_speed},{robot_speed},0.5,2.0")
+        path = self.profile_dir / "output.csv"
+        path.write_text("".join(line + "\n" for line in lines))
+        return path
+
+    def test_refined_lines_are_on_the_axis(self):
+        csv_path = self.write_output([1, 1.25, 1.5, 1.75, 2, 3])
+        simulation.Refinement(levels=1).save(self.profile_dir)
+        table = ShootingTable.from_output(csv_path, self.SETTINGS)
+
+        self.assertEqual(table.distances.tolist(), [1, 1.25, 1.5, 1.75, 2, 3])
+        self.assertEqual(table.hole_count, 0)
+        self.assertEqual(table.lookup(1.25, 0)[0], 11.25)
+        self.assertAlmostEqual(table.lookup(1.125, 1)[0], 12.125)
+        self.assertAlmostEqual(table.lookup(2.5, -1)[0], 11.5)
+        speeds, _ = table.lookup_batch([1.25, 1.125, 2.5], [0, 1, -1])
+        np.testing.assert_allclose(speeds, [11.25, 12.125, 11.5])
+
+    def test_uniform_profile_ignores_extra_lines(self):
+        # Without a refinement.json the axis is the settings' grid alone
+        csv_path = self.write_output([1, 1.5, 2, 3])
+        table = ShootingTable.from_output(csv_path, self.SETTINGS)
+        self.assertEqual(table.distances.tolist(), [1, 2, 3])
+        self.assertEqual(table.lookup(1.5, 0)[0], 11.5)
+
+if __name__ == "__main__":
+    unittest.main()
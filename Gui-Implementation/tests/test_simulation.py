@@ -0,0 +1,242 @@
+"""
+Merging of shard outputs and planning, on small synthetic grids, of the
+distance lines a run reuses, simulates or refines.
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import filemanagment
+import simulation
+
+HEADER = ",".join(filemanagment.OUTPUT_COLUMNS)
+
+def write_output(path: Path, distances, speeds=(-0.5, 0.0, 0.5), header=True):
+    """Writes an output CSV with one row per (distance, robot speed) cell, or an empty file."""
+    lines = [HEADER] if header else []
+    for distance in distances:
+        for speed in speeds:
+            lines.append(f"{distance},9.5,{speed},0.7,2.0")
+    path.write_text("".join(line + "\n" for line in lines))
+    return path
+
+class MergeShardOutputsTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_empty_first_shard(self):
+        # The simulator writes a shard that finds no shot as a 0-byte file
+        shards = [
+            write_output(self.root / "0.csv", [], header=False),
+            write_output(self.root / "1.csv", [2, 3]),
+            write_output(self.root / "2.csv", [4]),
+        ]
+        merged = self.root / "output.csv"
+        simulation.merge_shard_outputs(shards, merged)
+
+        table = filemanagment.read_table(merged)
+        self.assertEqual(table.headers, list(filemanagment.OUTPUT_COLUMNS))
+        self.assertEqual(len(table), 9)
+        self.assertEqual(sorted(set(table.column("distance").tolist())), [2, 3, 4])
+
+    def test_grid_order_and_lines_written_once(self):
+        shards = [
+            write_output(self.root / "0.csv", [1, 3]),
+            write_output(self.root / "1.csv", [2, 3, 4]),
+        ]
+        merged = self.root / "output.csv"
+        simulation.merge_shard_outputs(shards, merged)
+
+        lines = merged.read_text().splitlines()
+        self.assertEqual(lines[0], HEADER)
+        self.assertEqual([float(line.split(",")[0]) for line in lines[1::3]], [1, 2, 3, 4])
+        self.assertEqual(len(lines), 1 + 4 * 3)
+
+    def test_header_from_reused_cells(self):
+        shards = [write_output(self.root / "0.csv", [], header=False)]
+        earlier = write_output(self.root / "earlier.csv", [1, 2])
+        reused = simulation.ReusedCells(earlier, [simulation.cell_key(1)], [simulation.cell_key(0.0)])
+        merged = self.root / "output.csv"
+        simulation.merge_shard_outputs(shards, merged, [reused])
+
+        self.assertEqual(merged.read_text().splitlines(), [HEADER, "1,9.5,0.0,0.7,2.0"])
+
+class ShareShardsTest(unittest.TestCase):
+    def test_no_sweeps(self):
+        # Every line reused: nothing is left to simulate
+        self.assertEqual(simulation.share_shards([], 4), [])
+
+    def test_spare_shards_go_to_the_longest_sweep(self):
+        self.assertEqual(simulation.share_shards([2, 8], 4), [1, 3])
+
+    def test_more_sweeps_than_shards(self):
+        self.assertEqual(simulation.share_shards([3, 3, 3], 2), [1, 1, 1])
+
+def keys(distances):
+    return sorted(simulation.cell_key(distance) for distance in distances)
+
+def planned_keys(planned):
+    """Cell keys of every distance line the planned shards sweep, with repeats."""
+    return keys(distance for shard, _ in planned for distance in simulation.distance_grid(shard))
+
+class PlanIncrementalTest(unittest.TestCase):
+    GRID = {"mindistance": 1, "maxdistance": 5, "deltadistance": 1, "maxrobotspeed": 1, "deltarobotspeed": 0.5}
+
+    def grid(self, **changes):
+        return dict(self.GRID, **changes)
+
+    def assert_plan_covers(self, settings, planned, reused, shards):
+        """Every requested line is either simulated or reused, exactly once, by at most `shards` processes per sweep."""
+        requested = keys(simulation.distance_grid(settings))
+        taken = sorted(key for cells in reused for key in cells.distances)
+        self.assertEqual(sorted(planned_keys(planned) + taken), requested)
+        for cells in reused:
+            self.assertEqual(cells.speeds, {simulation.cell_key(v) for v in simulation.robot_speed_grid(settings)})
+
+    def test_no_candidates(self):
+        planned, reused = simulation.plan_incremental(self.GRID, [], 2)
+        self.assertEqual(reused, [])
+        self.assertEqual(planned, simulation.shard_settings(self.GRID, 2))
+
+    def test_widened_distance_range(self):
+        candidates = [(self.grid(maxdistance=3), Path("a.csv"))]
+        planned, reused = simulation.plan_incremental(self.GRID, candidates, 4)
+
+        self.assertEqual([cells.distances for cells in reused], [{1.0, 2.0, 3.0}])
+        self.assertEqual(planned_keys(planned), [4.0, 5.0])
+        self.assertLessEqual(len(planned), 4)
+        self.assert_plan_covers(self.GRID, planned, reused, 4)
+
+    def test_gaps_become_separate_sweeps(self):
+        candidates = [(self.grid(mindistance=2, maxdistance=4, deltadistance=2), Path("a.csv"))]
+        planned, reused = simulation.plan_incremental(self.GRID, candidates, 2)
+
+        self.assertEqual(reused[0].distances, {2.0, 4.0})
+        # Three one-line sweeps: more than `shards`, so SimulationRun queues one of them
+        self.assertEqual([count for _, count in planned], [1, 1, 1])
+        self.assert_plan_covers(self.GRID, planned, reused, 2)
+
+    def test_robot_speeds_must_be_a_superset(self):
+        narrower = (self.grid(maxrobotspeed=0.5), Path("narrow.csv"))
+        wider = (self.grid(maxrobotspeed=2, maxdistance=2), Path("wide.csv"))
+        planned, reused = simulation.plan_incremental(self.GRID, [narrower, wider], 1)
+
+        self.assertEqual([cells.output_path for cells in reused], [Path("wide.csv")])
+        self.assertEqual(planned_keys(planned), [3.0, 4.0, 5.0])
+        self.assert_plan_covers(self.GRID, planned, reused, 1)
+
+    def test_first_candidate_wins(self):
+        candidates = [(self.grid(maxdistance=2), Path("new.csv")), (self.GRID, Path("old.csv"))]
+        planned, reused = simulation.plan_incremental(self.GRID, candidates, 2)
+
+        self.assertEqual(planned, [])
+        self.assertEqual({cells.output_path: cells.distances for cells in reused},
+                         {Path("new.csv"): {1.0, 2.0}, Path("old.csv"): {3.0, 4.0, 5.0}})
+
+    def test_float_steps(self):
+        settings = self.grid(mindistance=1.0, maxdistance=2.0, deltadistance=0.1)
+        # Accumulated as main.go does, 1.3 + 3 * 0.1 overshoots 1.6, so that run stopped at 1.5
+        candidates = [(self.grid(mindistance=1.3, maxdistance=1.6, deltadistance=0.1), Path("a.csv"))]
+        planned, reused = simulation.plan_incremental(settings, candidates, 3)
+
+        self.assertEqual(sorted(reused[0].distances), [1.3, 1.4, 1.5])
+        self.assertLessEqual(len(planned), 3)
+        self.assert_plan_covers(settings, planned, reused, 3)
+
+def make_table(distances, robot_speeds, speed, angle):
+    """A ResultTable over a grid; speed and angle are (distance, robot speed) arrays, NaN for no shot."""
+    d, v = (grid.ravel() for grid in np.meshgrid(distances, robot_speeds, indexing="ij"))
+    speed, angle = np.ravel(speed), np.ravel(angle)
+    shot = ~np.isnan(speed)
+    columns = np.vstack([d, speed, v, angle, np.zeros_like(d)])[:, shot]
+    return filemanagment.ResultTable(list(filemanagment.OUTPUT_COLUMNS), columns.astype(filemanagment.COLUMNS_DTYPE))
+
+class RoughIntervalsTest(unittest.TestCase):
+    DISTANCES = [1.0, 2.0, 3.0, 4.0, 5.0]
+    SPEEDS = [-0.5, 0.0, 0.5]
+
+    def rough(self, speed, angle, distances=DISTANCES, width=1.0, angle_step=0.0, **refinement):
+        table = make_table(distances, self.SPEEDS, speed, angle)
+        speeds = {simulation.cell_key(v) for v in self.SPEEDS}
+        return simulation.rough_intervals(
+            table, distances, speeds, simulation.Refinement(**refinement), width, angle_step
+        )
+
+    def smooth(self, distances=DISTANCES):
+        d = np.array(distances)[:, None] + np.zeros(len(self.SPEEDS))
+        return 8 + 0.5 * d, 0.9 - 0.05 * d
+
+    def test_smooth_table(self):
+        self.assertEqual(self.rough(*self.smooth()), [])
+
+    def test_hole_makes_both_its_intervals_rough(self):
+        speed, angle = self.smooth()
+        speed[2, 1] = angle[2, 1] = np.nan
+        self.assertEqual(self.rough(speed, angle), [1, 2])
+
+    def test_speed_off_the_line(self):
+        speed, angle = self.smooth()
+        speed[3, 0] += 0.3
+        self.assertEqual(self.rough(speed, angle, speed_tolerance=0.2), [2, 3])
+        self.assertEqual(self.rough(speed, angle, speed_tolerance=0.5), [])
+
+    def test_angle_tolerance_is_at_least_one_and_a_half_steps(self):
+        speed, angle = self.smooth()
+        angle[1, 2] += 0.05
+        self.assertEqual(self.rough(speed, angle, angle_tolerance=0.035), [0, 1])
+        self.assertEqual(self.rough(speed, angle, angle_tolerance=0.035, angle_step=0.04), [])
+
+    def test_only_intervals_of_the_current_width(self):
+        distances = [1.0, 2.0, 2.25, 2.5, 2.75, 3.0, 4.0]
+        speed, angle = self.smooth(distances)
+        speed[:, 0] = np.nan  # a robot speed without any shot makes no interval rough
+        speed[3, 1] = angle[3, 1] = np.nan
+        self.assertEqual(self.rough(speed, angle, distances=distances, width=0.25), [2, 3])
+
+class PlanRefinementTest(unittest.TestCase):
+    DISTANCES = [1.0, 2.0, 3.0, 4.0, 5.0]
+    SETTINGS = {"mindistance": 1, "maxdistance": 5, "deltadistance": 1}
+
+    def test_contiguous_intervals_share_a_sweep(self):
+        planned = simulation.plan_refinement(self.SETTINGS, self.DISTANCES, [0, 1, 3], 1.0, 4, 2)
+
+        self.assertEqual(len(planned), 2)
+        # The sweep over 1..3 also runs 2.0 again; the merge writes it once
+        self.assertEqual(
+            planned_keys(planned),
+            [1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 4.25, 4.5, 4.75],
+        )
+
+    def test_stays_within_the_shard_count(self):
+        for shards in (1, 2, 3, 4, 8):
+            with self.subTest(shards=shards):
+                planned = simulation.plan_refinement(self.SETTINGS, self.DISTANCES, [0, 1, 3], 1.0, 4, shards)
+                self.assertLessEqual(len(planned), max(shards, 2))
+                self.assertEqual(len(planned_keys(planned)), 10)
+
+    def test_no_intervals(self):
+        self.assertEqual(simulation.plan_refinement(self.SETTINGS, self.DISTANCES, [], 1.0, 4, 4), [])
+
+class UpgradeSettingsTest(unittest.TestCase):
+    def test_legacy_keys_are_renamed(self):
+        old = {"angledelta": 5.0, "distancedelta": 0.5, "maxshooterspeed": 20, "minshooterspeed": 2, "maxangle": 45}
+        self.assertEqual(
+            simulation.upgrade_settings(old),
+            {"deltaangle": 5.0, "deltadistance": 0.5, "maxspeed": 20, "minspeed": 2, "maxangle": 45},
+        )
+        self.assertIn("angledelta", old)  # the input is left as it is
+
+    def test_simulator_key_wins(self):
+        self.assertEqual(simulation.upgrade_settings({"deltaangle": 1.0, "angledelta": 5.0}), {"deltaangle": 1.0})
+
+if __name__ == "__main__":
+    unittest.main()
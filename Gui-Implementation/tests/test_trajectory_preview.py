@@ -0,0 +1,93 @@
+"""
+Parity of the in-process preview with the simulator: every cell that
+trajectory_preview re-simulates must give the row the simulator exported,
+bit for bit, and a cell the simulator found no shot for must give none.
+
+    python -m unittest discover -s Gui-Implementation/tests
+"""
+import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import simulation
+import trajectory_preview
+from simulation_runner import resolve_exe
+
+PROFILE = Path(__file__).resolve().parents[2] / "profiles" / "profile_0"
+
+def read_rows(csv_path: Path):
+    """The rows of an output CSV as float32 arrays, keyed by their (distance, robot speed) cell."""
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = [np.array([float(v) for v in row], dtype=np.float32) for row in reader if row]
+    return {(simulation.cell_key(float(row[0])), simulation.cell_key(float(row[2]))): row for row in rows}
+
+class PreviewParityTest(unittest.TestCase):
+    def assert_cells_match(self, csv_path: Path, settings):
+        expected = read_rows(csv_path)
+        self.assertTrue(expected, f"{csv_path} has no rows")
+        cells = 0
+        for distance in simulation.distance_grid(settings):
+            for robot_speed in simulation.robot_speed_grid(settings):
+                with self.subTest(distance=distance, robot_speed=robot_speed):
+                    want = expected.pop((simulation.cell_key(distance), simulation.cell_key(robot_speed)), None)
+                    got = trajectory_preview.preview_cell(distance, robot_speed, settings)
+                    if want is None:
+                        self.assertIsNone(got)
+                    else:
+                        self.assertIsNotNone(got)
+                        np.testing.assert_array_equal(got, want)
+                cells += 1
+        self.assertGreater(cells, 0)
+        self.assertEqual(expected, {}, "rows outside the settings' grid")
+
+    def test_tracked_profile(self):
+        with open(PROFILE / "settings.json") as f:
+            settings = json.load(f)
+        self.assert_cells_match(PROFILE / "output.csv", settings)
+
+    def test_fresh_simulator_run(self):
+        settings = {
+            "mindistance": 1.5, "maxdistance": 3.0, "deltaangle": 1.0, "maxrobotspeed": 1.0,
+            "targetheight": 1.8, "targetradius": 0.15,
+        }
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_path = directory / "settings.json"
+        with open(settings_path, "w") as f:
+            json.dump(settings, f)
+        try:
+            subprocess.run(
+                [str(resolve_exe("shootingsim.exe")), str(settings_path), str(directory / "output.csv")],
+                stdout=subprocess.DEVNULL, check=True, timeout=300
+            )
+        except OSError as e:
+            self.skipTest(f"simulator can't run here: {e}")
+        self.assert_cells_match(directory / "output.csv", settings)
+
+    def test_check_parity_reports_a_changed_row(self):
+        with open(PROFILE / "settings.json") as f:
+            settings = json.load(f)
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with open(PROFILE / "output.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        rows[1][1] = str(float(rows[1][1]) + 0.5)
+        with open(directory / "output.csv", "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerows(rows)
+
+        report = trajectory_preview.check_parity(directory / "output.csv", settings)
+        self.assertEqual(len(report["mismatches"]), 1)
+        self.assertEqual(report["matches"], report["cells"] - 1)
+        self.assertAlmostEqual(report["max_speed_error"], 0.5, places=5)
+
+if __name__ == "__main__":
+    unittest.main()
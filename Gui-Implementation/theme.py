@@ -0,0 +1,199 @@
+from functools import lru_cache
+import color_palette as cp
+
+@lru_cache(maxsize=None)
+def stylesheet():
+    """
+    Returns the application stylesheet, built once from color_palette.
+
+    Rules are scoped by widget class name, the way each widget's own
+    stylesheet used to be, and ordered from outer to inner widgets: rules of
+    equal specificity are resolved by order, so an inner widget's rules win
+    as they did when it had its own stylesheet. Widget states are pseudo
+    states (:checked, :disabled) so changing them only repaints.
+    """
+    primary = cp.BUTTON_STYLES["primary"]
+    secondary = cp.BUTTON_STYLES["secondary"]
+    success = cp.BUTTON_STYLES["success"]
+    danger = cp.BUTTON_STYLES["danger"]
+    return f"""
+        /* main.MainWindow */
+        MainWindow, MainWindow * {{
+            background-color: {cp.BACKGROUND_STYLES['main_window']['color']};
+        }}
+
+        /* mode_selection_widgets */
+        SideBar, SideBar * {{
+            background-color: {cp.BACKGROUND_DARK};
+            border-right: 1px solid {cp.BACKGROUND_STYLES["sidebar"]["color"]};
+        }}
+        SideBar QLabel {{
+            color: {cp.PRIMARY_TEXT}; font-weight: bold; padding-bottom: 10px;
+        }}
+        SideBarButton {{
+            background-color: {primary["background"]};
+            border: none;
+            color: {primary["text"]};
+            border-radius: 5px;
+            padding: 4px;
+            text-align: left;
+        }}
+        SideBarButton:hover {{ background-color: {primary["hover"]}; }}
+        SideBarButton:pressed {{ background-color: {primary["pressed"]}; }}
+        SideBarButton:checked, SideBarButton:checked:hover {{
+            background-color: {cp.INFO_HIGHLIGHT};
+            border: 1px solid {primary["border"]};
+        }}
+
+        /* initial_settings_menu and settings_menu_widgets */
+        InitialSettingsMenu, InitialSettingsMenu * {{
+            background-color: {cp.TRANSPARENT};
+        }}
+        SettingWidgetContainer, SettingWidgetContainer QFrame {{
+            background-color: {cp.CARD_SURFACE};
+            border-radius: 5px;
+        }}
+        SettingWidgetContainer QLabel {{
+            color: {cp.PRIMARY_BLUE};
+            font-weight: bold;
+            padding-bottom: 5px;
+        }}
+        SettingWidget QLabel {{
+            color: {cp.SECONDARY_TEXT};
+            padding-right: 10px;
+        }}
+        SettingWidget QLineEdit {{
+            background-color: {cp.CARD_SURFACE};
+            color: {cp.PRIMARY_TEXT};
+            border: none;
+            border-bottom: 1px solid {cp.BORDER_DIVIDER};
+            padding: 4px;
+        }}
+        SettingWidget QLineEdit:focus {{
+            border-bottom: 1px solid {cp.PRIMARY_BLUE};
+        }}
+
+        CSVGenerateButton {{
+            background-color: {success["background"]};
+            border: none;
+            color: {success["text"]};
+            border-radius: 8px;
+            padding: 10px;
+            font-weight: bold;
+        }}
+        CSVGenerateButton:hover {{ background-color: {success["hover"]}; }}
+        CSVGenerateButton:pressed {{ background-color: {success["pressed"]}; }}
+        CSVGenerateButton:disabled {{ background-color: {success["background"]}; }}
+
+        JobQueuePanel, JobQueuePanel QFrame,
+        CostEstimatePanel,
+        ShotPreviewPanel, ShotPreviewPanel QFrame {{
+            background-color: {cp.CARD_SURFACE};
+            border-radius: 5px;
+        }}
+        JobQueuePanel QLabel, JobQueuePanel QCheckBox, ShotPreviewPanel QLabel, CostEstimatePanel QLabel {{
+            color: {cp.SECONDARY_TEXT};
+        }}
+        CostEstimatePanel QLabel#warning {{ color: {cp.WARNING}; }}
+        JobQueuePanel QTableWidget {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
+            gridline-color: {cp.BORDER_DIVIDER}; border: none;
+        }}
+        JobQueuePanel QHeaderView::section {{
+            background-color: {cp.BORDER_DIVIDER}; color: {cp.PRIMARY_TEXT}; font-weight: bold;
+        }}
+        JobQueuePanel QSpinBox, ShotPreviewPanel QDoubleSpinBox {{
+            background-color: {cp.BACKGROUND_DARK}; color: {cp.PRIMARY_TEXT};
+            border: none; border-bottom: 1px solid {cp.BORDER_DIVIDER}; padding: 2px;
+        }}
+        JobQueuePanel QPushButton {{
+            background-color: {danger["background"]};
+            color: {danger["text"]};
+            border: none; border-radius: 4px; padding: 2px 6px;
+        }}
+        JobQueuePanel QPushButton:disabled {{
+            background-color: {cp.BORDER_DIVIDER};
+            color: {cp.SECONDARY_TEXT};
+        }}
+
+        /* poly_functions_widgets */
+        PolyFunctionsView, PolyFunctionsView QFrame {{
+            background-color: {cp.BACKGROUND_DARK};
+        }}
+        PolyFunctionsView QLabel {{
+            color: {cp.SECONDARY_TEXT};
+        }}
+        PolyFunctionsView QPlainTextEdit {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
+            border: none; border-radius: 5px; padding: 5px;
+        }}
+        PolyFunctionsView QSpinBox, PolyFunctionsView QDoubleSpinBox, PolyFunctionsView QComboBox {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
+            border: none; border-bottom: 1px solid {cp.BORDER_DIVIDER}; padding: 2px;
+        }}
+        ProfileSelector {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
+            border: none; border-radius: 8px; padding: 5px;
+            border-bottom: 1px solid {cp.BORDER_DIVIDER};
+        }}
+        ProfileSelector:focus {{ border-bottom: 1px solid {cp.PRIMARY_BLUE}; }}
+
+        /* profile_diff_widgets */
+        ProfileDiffView, ProfileDiffView QFrame {{
+            background-color: {cp.BACKGROUND_DARK};
+        }}
+        ProfileDiffView QLabel, ProfileDiffView QCheckBox {{
+            color: {cp.SECONDARY_TEXT};
+        }}
+        ProfileDiffView QDoubleSpinBox {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT};
+            border: none; border-bottom: 1px solid {cp.BORDER_DIVIDER}; padding: 2px;
+        }}
+        ProfileDiffView QTableView {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT}; gridline-color: {cp.BORDER_DIVIDER};
+            border: none; font-family: "Inter", "Roboto", sans-serif; font-size: 13px;
+        }}
+        ProfileDiffView QHeaderView::section {{
+            background-color: {cp.BORDER_DIVIDER}; color: {cp.PRIMARY_TEXT}; font-weight: bold;
+        }}
+
+        /* csv_view_widgets */
+        CSVDisplay, CSVDisplay QFrame {{
+            background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {cp.BACKGROUND_DARK}, stop:1 {cp.CARD_SURFACE});
+        }}
+        CSVDisplay QTableView {{
+            background-color: {cp.CARD_SURFACE}; color: {cp.PRIMARY_TEXT}; gridline-color: {cp.BORDER_DIVIDER};
+            selection-background-color: {cp.INFO_HIGHLIGHT}; selection-color: {cp.PRIMARY_TEXT};
+            border: none; font-family: "Inter", "Roboto", sans-serif; font-size: 13px;
+        }}
+        CSVDisplay QHeaderView::section {{
+            background-color: {cp.BORDER_DIVIDER}; color: {cp.PRIMARY_TEXT}; font-weight: bold;
+        }}
+        CSVDisplay QScrollBar:vertical {{ background: {cp.BACKGROUND_DARK}; width: 10px; margin: 0px; }}
+        CSVDisplay QScrollBar::handle:vertical {{ background: {cp.BORDER_DIVIDER}; }}
+        CSVDisplay QScrollBar::handle:vertical:hover {{ background: {cp.INFO_HIGHLIGHT}; }}
+
+        CSVGrid > QLabel {{ color: {cp.SECONDARY_TEXT}; }}
+
+        ResultShowcaseWidget, ResultShowcaseWidget QPushButton {{
+            background-color: {secondary["background"]};
+            border: 1px solid {secondary["border"]};
+            color: {secondary["text"]};
+            border-radius: 5px;
+            text-align: left;
+            padding: 5px;
+        }}
+        ResultShowcaseWidget:hover, ResultShowcaseWidget QPushButton:hover {{ background-color: {secondary["hover"]}; }}
+        ResultShowcaseWidget:pressed, ResultShowcaseWidget QPushButton:pressed {{ background-color: {secondary["pressed"]}; }}
+        ResultShowcaseWidget QLabel {{
+            background-color: transparent;
+            color: {cp.PRIMARY_TEXT};
+            border: none;
+            font-weight: bold;
+        }}
+        ResultShowcaseWidget QLabel#detail {{ color: {cp.SECONDARY_TEXT}; font-weight: normal; }}
+    """
+
+def apply_theme(app):
+    """Installs the application stylesheet; widgets no longer set their own."""
+    app.setStyleSheet(stylesheet())
@@ -0,0 +1,142 @@
+from pathlib import Path
+import os
+import numpy as np
+import filemanagment
+
+# Layout written by Shooting-Simulation/export/trajectories.go
+TRAJECTORY_MAGIC = b"TLTRAJ01"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("count", "<u4"), ("points", "<u4")])
+RECORD_DTYPE = np.dtype([
+    ("distance", "<f4"), ("robot_speed", "<f4"), ("speed", "<f4"), ("angle", "<f4"),
+    ("offset", "<u4"), ("length", "<u4"),
+])
+POINT_DTYPE = np.dtype("<f4")
+
+def trajectories_path(profile_id):
+    return filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "trajectories.bin"
+
+class Trajectories:
+    """Ball arcs of a profile's shots: records in output CSV order over one (points, 2) array."""
+    def __init__(self, records, points):
+        self.records = records
+        self.points = points  # float32 x, y
+
+    def __len__(self):
+        return len(self.records)
+
+    def arc(self, i):
+        record = self.records[i]
+        return self.points[record["offset"]:record["offset"] + record["length"]]
+
+    def arc_ids(self):
+        """Index of the arc each point belongs to."""
+        return np.repeat(np.arange(len(self.records)), self.records["length"])
+
+def read_trajectories(path: Path):
+    """Maps a trajectories file, or returns None if it is missing or malformed."""
+    path = Path(path)
+    try:
+        if path.stat().st_size < HEADER_DTYPE.itemsize:
+            return None
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+        if header["magic"] != TRAJECTORY_MAGIC:
+            print(f"Error reading {path}: not a trajectories file")
+            return None
+        count, point_count = int(header["count"]), int(header["points"])
+        records = np.fromfile(path, dtype=RECORD_DTYPE, count=count, offset=HEADER_DTYPE.itemsize)
+        points_offset = HEADER_DTYPE.itemsize + count * RECORD_DTYPE.itemsize
+        if point_count:
+            points = np.memmap(path, dtype=POINT_DTYPE, mode="r", offset=points_offset, shape=(point_count, 2))
+        else:
+            points = np.zeros((0, 2), dtype=POINT_DTYPE)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+        return None
+    return Trajectories(records, points)
+
+def write_trajectories(path: Path, records, points):
+    """Writes records and their points atomically; offsets are recomputed from the lengths."""
+    records = np.array(records, dtype=RECORD_DTYPE)
+    records["offset"] = np.concatenate([[0], np.cumsum(records["length"], dtype=np.uint64)[:-1]]) if len(records) else []
+    header = np.array([(TRAJECTORY_MAGIC, len(records), len(points))], dtype=HEADER_DTYPE)
+
+    tmp_path = Path(path).with_name(Path(path).name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(records.tobytes())
+        f.write(np.ascontiguousarray(points, dtype=POINT_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+def merge_trajectory_files(paths, output_path: Path):
+    """
+    Merges the trajectories files of sweep shards in the grid order of merge_shard_outputs().
+
+    Each shard owns whole distance lines in robot-speed order, so a stable
+    sort of all records by distance restores the order of a single run.
+    """
+    parts = [t for t in (read_trajectories(path) for path in paths) if t is not None]
+    if not parts:
+        return
+    records = np.concatenate([t.records for t in parts])
+    arcs = [t.arc(i) for t in parts for i in range(len(t))]
+    order = np.argsort(records["distance"], kind="stable")
+    points = np.concatenate([arcs[i] for i in order]) if arcs else np.zeros((0, 2), dtype=POINT_DTYPE)
+    write_trajectories(output_path, records[order], points)
+
+def minmax_decimate(trajectories: Trajectories, bucket_width):
+    """
+    Returns the indices of the points to keep when drawing at bucket_width world units per pixel.
+
+    Each arc's points are grouped into buckets of bucket_width in x; a bucket
+    keeps its first, last, lowest and highest point, so the drawn outline
+    is the same as the full arc's at that scale.
+    """
+    points = trajectories.points
+    if not len(points):
+        return np.zeros(0, dtype=np.int64)
+
+    arc_ids = trajectories.arc_ids()
+    buckets = np.floor(points[:, 0] / bucket_width).astype(np.int64)
+    # A new segment starts wherever the arc or the bucket changes
+    starts = np.flatnonzero(np.r_[True, (np.diff(arc_ids) != 0) | (np.diff(buckets) != 0)])
+    ends = np.r_[starts[1:], len(points)]
+    lengths = ends - starts
+
+    y = points[:, 1]
+    keep = y == np.repeat(np.minimum.reduceat(y, starts), lengths)
+    keep |= y == np.repeat(np.maximum.reduceat(y, starts), lengths)
+    keep[starts] = True
+    keep[ends - 1] = True
+    return np.flatnonzero(keep)
+
+class TrajectoryLOD:
+    """
+    Min/max decimated copies of a set of arcs, one per zoom level.
+
+    Level 0 keeps every point; each further level doubles the bucket width,
+    starting from twice the median x step between consecutive points, below
+    which decimation drops nothing. Levels are computed once, up front.
+    """
+    LEVELS = 10
+
+    def __init__(self, trajectories: Trajectories):
+        self.trajectories = trajectories
+        points = trajectories.points
+        steps = np.abs(np.diff(points[:, 0])) if len(points) > 1 else np.ones(1)
+        self.base_width = 2 * max(float(np.median(steps)), 1e-6)
+
+        arc_ids = trajectories.arc_ids()
+        self.levels = [(np.asarray(points), arc_ids)]  # (points, arc index of each point)
+        for level in range(1, self.LEVELS):
+            keep = minmax_decimate(trajectories, self.base_width * 2 ** (level - 1))
+            self.levels.append((np.asarray(points[keep]), arc_ids[keep]))
+
+    def bucket_width(self, level):
+        return 0.0 if level == 0 else self.base_width * 2 ** (level - 1)
+
+    def level_for(self, world_per_pixel):
+        """The coarsest level whose buckets are no wider than a pixel."""
+        level = 0
+        while level + 1 < self.LEVELS and self.bucket_width(level + 1) <= world_per_pixel:
+            level += 1
+        return level
@@ -0,0 +1,229 @@
+import struct
+import time
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QPainterPath, QPen, QColor, QTransform, QImage
+from PySide6.QtCore import Qt, QRectF, QPointF, QByteArray, QDataStream, QIODevice, QTimer
+from trajectories import TrajectoryLOD
+import color_palette as cp
+
+_PATH_ELEMENT_DTYPE = np.dtype([("type", ">i4"), ("x", ">f8"), ("y", ">f8")])
+_MOVE_TO, _LINE_TO = 0, 1  # QPainterPath.ElementType
+
+def arcs_to_path(points, arc_ids):
+    """
+    Builds one QPainterPath holding every arc, in a single call.
+
+    The path is deserialized from the byte layout QDataStream uses for
+    QPainterPath (element count, then type, x, y per element, then the index
+    of the last move and the fill rule), which avoids a Python call per point.
+    """
+    path = QPainterPath()
+    if not len(points):
+        return path
+    elements = np.empty(len(points), dtype=_PATH_ELEMENT_DTYPE)
+    elements["x"] = points[:, 0]
+    elements["y"] = points[:, 1]
+    starts = np.r_[True, np.diff(arc_ids) != 0]
+    elements["type"] = np.where(starts, _MOVE_TO, _LINE_TO)
+    last_move = int(np.flatnonzero(starts)[-1])
+
+    # The stream reads from the byte array, which must outlive it
+    data = QByteArray(struct.pack(">i", len(elements)) + elements.tobytes() + struct.pack(">ii", last_move, 0))
+    stream = QDataStream(data, QIODevice.ReadOnly)
+    stream >> path
+    return path
+
+class TrajectoryPlotView(QWidget):
+    """
+    Overlays the ball arcs of a profile, with wheel zoom, drag pan and double-click reset.
+
+    Arcs are drawn from the TrajectoryLOD level matching the current zoom, as
+    QPainterPaths of CHUNK_ARCS arcs each; a chunk's path is built the first
+    time its level is drawn and chunks outside the view are skipped.
+
+    Rasterizing every arc can take longer than a frame, so the arcs are
+    rendered into an image; while zooming or panning the last image is
+    stretched to the new view and re-rendered once input pauses.
+    """
+    CHUNK_ARCS = 128
+    ZOOM_STEP = 1.25
+    RENDER_DELAY_MS = 80
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(300, 200)
+        self.setMouseTracking(False)
+        self.lod = None
+        self.view_rect = QRectF(0, 0, 1, 1)  # visible world rectangle, y up
+        self.chunk_bounds = []  # QRectF per chunk
+        self._chunk_starts = np.zeros(0, dtype=np.int64)  # first arc of each chunk
+        self._paths = {}  # level -> list of QPainterPath, one per chunk
+        self._drag_origin = None
+        self._frame = None  # QImage of the arcs
+        self._frame_rect = QRectF()  # view_rect the frame was rendered for
+        self._frame_transform = QTransform()  # world to frame pixels
+        self._frame_level = 0
+        self._frame_points = 0
+        self.last_render_ms = 0.0
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(self.RENDER_DELAY_MS)
+        self.render_timer.timeout.connect(self._refresh_frame)
+
+    def set_trajectories(self, trajectories):
+        """Shows a Trajectories set, or nothing for None."""
+        self._paths.clear()
+        self.chunk_bounds = []
+        self._frame = None
+        self.lod = TrajectoryLOD(trajectories) if trajectories is not None and len(trajectories) else None
+        if self.lod is not None:
+            self._compute_chunks(trajectories)
+        self.reset_view()
+
+    def _compute_chunks(self, trajectories):
+        records = trajectories.records
+        self._chunk_starts = np.arange(0, len(records), self.CHUNK_ARCS)
+        # Arcs are stored back to back, so a chunk's points are one slice
+        point_starts = records["offset"][self._chunk_starts].astype(np.int64)
+        points = np.asarray(trajectories.points)
+        nonempty = point_starts < len(points)
+        self.chunk_bounds = [QRectF() for _ in self._chunk_starts]
+        if not nonempty.any():
+            return
+        starts = point_starts[nonempty]
+        x_min = np.minimum.reduceat(points[:, 0], starts)
+        x_max = np.maximum.reduceat(points[:, 0], starts)
+        y_min = np.minimum.reduceat(points[:, 1], starts)
+        y_max = np.maximum.reduceat(points[:, 1], starts)
+        for i, chunk in enumerate(np.flatnonzero(nonempty)):
+            self.chunk_bounds[chunk] = QRectF(
+                float(x_min[i]), float(y_min[i]), float(x_max[i] - x_min[i]), float(y_max[i] - y_min[i])
+            )
+
+    def reset_view(self):
+        bounds = QRectF()
+        for rect in self.chunk_bounds:
+            bounds = bounds.united(rect)
+        if bounds.isEmpty():
+            bounds = QRectF(0, 0, 5, 4)
+        margin = 0.05 * max(bounds.width(), bounds.height())
+        self.view_rect = bounds.adjusted(-margin, -margin, margin, margin)
+        self.update()
+
+    def _level_paths(self, level):
+        """Returns the chunk paths of a level, building it on first use."""
+        if level not in self._paths:
+            points, arc_ids = self.lod.levels[level]
+            cuts = np.searchsorted(arc_ids, self._chunk_starts)
+            ends = np.r_[cuts[1:], len(arc_ids)]
+            self._paths[level] = [
+                arcs_to_path(points[start:end], arc_ids[start:end]) for start, end in zip(cuts, ends)
+            ]
+        return self._paths[level]
+
+    def _world_to_screen(self):
+        sx = self.width() / self.view_rect.width()
+        sy = self.height() / self.view_rect.height()
+        return QTransform(sx, 0, 0, -sy, -self.view_rect.left() * sx, self.view_rect.bottom() * sy)
+
+    def _screen_to_world(self, point):
+        inverted, _ = self._world_to_screen().inverted()
+        return inverted.map(QPointF(point))
+
+    def _render_frame(self):
+        """Rasterizes the visible arcs at the current view into the frame image."""
+        start = time.perf_counter()
+        frame = QImage(self.size(), QImage.Format_ARGB32_Premultiplied)
+        frame.fill(Qt.transparent)
+        painter = QPainter(frame)
+        painter.setTransform(self._world_to_screen())
+        world_per_pixel = self.view_rect.width() / max(self.width(), 1)
+        self._frame_level = self.lod.level_for(world_per_pixel)
+        color = QColor(cp.PRIMARY_LIGHT)
+        color.setAlpha(90)
+        pen = QPen(color)
+        pen.setCosmetic(True)  # One pixel wide at any zoom
+        painter.setPen(pen)
+        self._frame_points = 0
+        for bounds, path in zip(self.chunk_bounds, self._level_paths(self._frame_level)):
+            if bounds.intersects(self.view_rect) or bounds.isEmpty() and not path.isEmpty():
+                painter.drawPath(path)
+                self._frame_points += path.elementCount()
+        painter.end()
+        self._frame = frame
+        self._frame_rect = QRectF(self.view_rect)
+        self._frame_transform = self._world_to_screen()
+        self.last_render_ms = (time.perf_counter() - start) * 1000
+
+    def _refresh_frame(self):
+        self._render_frame()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(cp.BACKGROUND_DARK))
+        if self.lod is None:
+            painter.setPen(QColor(cp.SECONDARY_TEXT))
+            painter.drawText(self.rect(), Qt.AlignCenter, "No trajectories exported for this profile")
+            return
+
+        if self._frame is None:
+            self._render_frame()
+        elif (self._frame_rect != self.view_rect or self._frame.size() != self.size()) and not self.render_timer.isActive():
+            self.render_timer.start()
+
+        painter.save()
+        painter.setTransform(self._world_to_screen())
+        ground = QPen(QColor(cp.BORDER_DIVIDER))
+        ground.setCosmetic(True)
+        painter.setPen(ground)
+        painter.drawLine(QPointF(self.view_rect.left(), 0), QPointF(self.view_rect.right(), 0))
+        # Stretch the frame from the view it was rendered for onto the current one
+        painter.setTransform(self._frame_transform.inverted()[0] * self._world_to_screen())
+        painter.drawImage(0, 0, self._frame)
+        painter.restore()
+
+        painter.setPen(QColor(cp.SECONDARY_TEXT))
+        painter.drawText(
+            6, self.height() - 6,
+            f"x {self.view_rect.left():.2f}..{self.view_rect.right():.2f} m  "
+            f"y {self.view_rect.top():.2f}..{self.view_rect.bottom():.2f} m  "
+            f"| {len(self.lod.trajectories)} arcs, level {self._frame_level}, "
+            f"{self._frame_points} points, {self.last_render_ms:.1f} ms"
+        )
+
+    def wheelEvent(self, event):
+        if self.lod is None:
+            return
+        factor = self.ZOOM_STEP ** (-event.angleDelta().y() / 120)
+        anchor = self._screen_to_world(event.position())
+        rect = self.view_rect
+        self.view_rect = QRectF(
+            anchor.x() - (anchor.x() - rect.left()) * factor,
+            anchor.y() - (anchor.y() - rect.top()) * factor,
+            rect.width() * factor,
+            rect.height() * factor,
+        )
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_origin = event.position()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is None:
+            return
+        delta = event.position() - self._drag_origin
+        self._drag_origin = event.position()
+        self.view_rect.translate(
+            -delta.x() * self.view_rect.width() / self.width(),
+            delta.y() * self.view_rect.height() / self.height(),
+        )
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_origin = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
@@ -0,0 +1,432 @@
+from fractions import Fraction
+from pathlib import Path
+import sys
+import time
+import numpy as np
+import filemanagment
+import simulation
+
+# Mirrors Shooting-Simulation/trajectory/physics/physicsConstants.go. Go evaluates
+# constant expressions exactly and rounds once, so they are derived from exact
+# fractions here to land on the same float64 values.
+_PI = Fraction("3.14159265358979323846264338327950288419716939937510582097494459")
+_BALL_RADIUS = Fraction("0.12")
+_BALL_MASS = Fraction("0.27")
+_AIR_DENSITY = Fraction("1.225")
+_CROSS_SECTIONAL_AREA = _PI * _BALL_RADIUS * _BALL_RADIUS
+
+DT = 0.01
+PI = float(_PI)
+HALF_PI = float(_PI / 2)
+TWO_PI = float(_PI * 2)
+BALL_RADIUS = float(_BALL_RADIUS)
+OMEGA_SPEED_FACTOR = float((1 - Fraction("0.5")) / (1 + Fraction("0.5")))
+ONE_OVER_BALL_MASS = float(1 / _BALL_MASS)
+AIR_RESISTANCE_FACTOR = float(Fraction("0.5") * Fraction("0.55") * _AIR_DENSITY * _CROSS_SECTIONAL_AREA)
+MAGNUS_FACTOR = float(Fraction("0.5") * _AIR_DENSITY * _CROSS_SECTIONAL_AREA * _BALL_RADIUS * Fraction("0.25"))
+GRAVITATIONAL_FORCE = float(-Fraction("9.8") * _BALL_MASS)
+TOLERANCE_TO_DECLARE_AT_START_OF_TARGET = 0.05
+INF = 1e6
+BALL_INITIAL_SPEED_FROM_COMPRESSION = 1.5
+COMPRESSION_VELOCITY_ANGLE_OFFSET = -5.0  # Added to an angle in radians, as physics.go does
+
+# A ball always ends up going down below the target, this only guards the loop
+MAX_STEPS = 100000
+
+def _wrap_angle(angle):
+    """angle.WrapAnglePlusMinusPi for arrays."""
+    wrapped = np.fmod(angle, TWO_PI)
+    return np.where(wrapped > PI, wrapped - TWO_PI, np.where(wrapped < -PI, wrapped + TWO_PI, wrapped))
+
+def _go_round(values, decimals):
+    """utils.RoundToDecimal: math.Round rounds halves away from zero."""
+    scaled = values * 10.0 ** decimals
+    return np.copysign(np.floor(np.abs(scaled) + 0.5), scaled) / 10.0 ** decimals
+
+def calc_trajectories(shot_vx, shot_vy, robot_speed, target_height, distance, target_radius):
+    """
+    trajectory.CalcTrajectory for a batch of shot velocities, integrated in lockstep.
+
+    robot_speed is a scalar or one value per shot. Returns (distance,
+    max height, impact vx, impact vy) arrays with the simulator's sentinels:
+    INF for shots that pass the target and -1 for shots that fall short or
+    hit its rim, both with a zero impact velocity. Finished shots are
+    dropped from the working arrays as they terminate.
+    """
+    shot_vx = np.asarray(shot_vx, dtype=np.float64)
+    shot_vy = np.asarray(shot_vy, dtype=np.float64)
+    count = len(shot_vx)
+    out_distance = np.full(count, -1.0)
+    out_height = np.full(count, -1.0)
+    out_vx = np.zeros(count)
+    out_vy = np.zeros(count)
+
+    robot_speed = np.broadcast_to(np.asarray(robot_speed, dtype=np.float64), (count,))
+    compression_angle = _wrap_angle(np.arctan2(shot_vy, shot_vx) + COMPRESSION_VELOCITY_ANGLE_OFFSET)
+    vx = shot_vx + robot_speed + np.cos(compression_angle) * BALL_INITIAL_SPEED_FROM_COMPRESSION
+    vy = shot_vy + 0.0 + np.sin(compression_angle) * BALL_INITIAL_SPEED_FROM_COMPRESSION
+    abs_omega = np.abs(OMEGA_SPEED_FACTOR * np.hypot(shot_vx, shot_vy) / BALL_RADIUS)
+
+    start_of_target = distance - target_radius
+    end_of_target = distance + target_radius
+    rim_height = target_height + BALL_RADIUS
+
+    lanes = np.arange(count)
+    x = np.zeros(count)
+    y = np.zeros(count)
+    max_height = np.zeros(count)
+    prev_above = np.zeros(count, dtype=bool)
+
+    with np.errstate(invalid="ignore"):
+        for _ in range(MAX_STEPS):
+            above = y > target_height
+            max_height = np.maximum(y, max_height)
+
+            entered = prev_above & ~above
+            passed = x > end_of_target
+            hitting = (np.abs(start_of_target - x) <= TOLERANCE_TO_DECLARE_AT_START_OF_TARGET) & (y < rim_height)
+            # atan2(vy, vx) < 0 exactly when vy < 0
+            done = entered | passed | ((vy < 0) & ~above) | hitting
+            if done.any():
+                # Checked in CalcTrajectory's order: entering wins over passing
+                finished = lanes[entered]
+                out_distance[finished] = x[entered]
+                out_height[finished] = max_height[entered]
+                out_vx[finished] = vx[entered]
+                out_vy[finished] = vy[entered]
+                passed &= ~entered
+                out_distance[lanes[passed]] = INF
+                out_height[lanes[passed]] = INF
+
+                keep = ~done
+                lanes, x, y, vx, vy = lanes[keep], x[keep], y[keep], vx[keep], vy[keep]
+                max_height, above = max_height[keep], above[keep]
+                abs_omega = abs_omega[keep]
+                if not len(lanes):
+                    break
+
+            # physics.CalcVelocity and physics.CalcPosition
+            norm = np.hypot(vx, vy)
+            drag_factor = -norm * AIR_RESISTANCE_FACTOR
+            # The Magnus force is the velocity turned a quarter left, scaled to
+            # |v| * |omega| * MAGNUS_FACTOR; the unit vector cancels the norm
+            magnus_factor = abs_omega * MAGNUS_FACTOR
+            force_x = vx * drag_factor - vy * magnus_factor
+            force_y = vy * drag_factor + vx * magnus_factor + GRAVITATIONAL_FORCE
+            vx = vx + force_x * ONE_OVER_BALL_MASS * DT
+            vy = vy + force_y * ONE_OVER_BALL_MASS * DT
+            x = x + vx * DT
+            y = y + vy * DT
+            prev_above = above
+
+    return out_distance, out_height, out_vx, out_vy
+
+def angle_grid(settings):
+    """Returns the shot angles FindShotsOnTarget tries, in radians, accumulated as it does."""
+    resolved = simulation.resolve_settings(settings)
+    if resolved["deltaangle"] <= 0:
+        return np.zeros(0)
+
+    degrees = []
+    angle = resolved["minangle"]
+    while angle <= resolved["maxangle"]:
+        degrees.append(angle)
+        angle += resolved["deltaangle"]
+    return np.array(degrees) * PI / 180
+
+class ShotBatch:
+    """Shots found for every angle of one (distance, robot speed) cell; found marks those that exist."""
+    def __init__(self, distance, robot_speed, angles, speeds, distances, max_heights, impact_vx, impact_vy, found):
+        self.distance = distance
+        self.robot_speed = robot_speed
+        self.angles = angles
+        self.speeds = speeds
+        self.distances = distances
+        self.max_heights = max_heights
+        self.impact_vx = impact_vx
+        self.impact_vy = impact_vy
+        self.found = found
+
+def find_shots(distance, robot_speed, settings):
+    """
+    trajectory.FindShotsOnTarget for all angles at once.
+
+    Every angle runs its own bisection on shot speed; all bisections step in
+    lockstep, each step integrating the still-searching angles as one batch.
+    """
+    resolved = simulation.resolve_settings(settings)
+    target_height = resolved["targetheight"]
+    target_radius = resolved["targetradius"]
+    tolerance = resolved["distancetolerance"]
+    stop_tolerance = resolved["speedtolerancetostopsearch"]
+
+    angles = angle_grid(settings)
+    count = len(angles)
+    cos_angles, sin_angles = np.cos(angles), np.sin(angles)
+    low = np.full(count, resolved["minspeed"])
+    high = np.full(count, resolved["maxspeed"])
+
+    speeds = np.full(count, np.nan)
+    distances = np.full(count, np.nan)
+    max_heights = np.full(count, np.nan)
+    impact_vx = np.zeros(count)
+    impact_vy = np.zeros(count)
+    found = np.zeros(count, dtype=bool)
+
+    searching = np.arange(count)
+    while len(searching):
+        speed = (low[searching] + high[searching]) / 2
+        shot_distance, shot_height, shot_vx, shot_vy = calc_trajectories(
+            cos_angles[searching] * speed, sin_angles[searching] * speed,
+            robot_speed, target_height, distance, target_radius,
+        )
+
+        hit = np.abs(distance - shot_distance) <= tolerance
+        hits = searching[hit]
+        speeds[hits] = speed[hit]
+        distances[hits] = shot_distance[hit]
+        max_heights[hits] = shot_height[hit]
+        impact_vx[hits] = shot_vx[hit]
+        impact_vy[hits] = shot_vy[hit]
+        found[hits] = True
+
+        short = shot_distance < distance
+        low[searching] = np.where(short, speed, low[searching])
+        high[searching] = np.where(short, high[searching], speed)
+        gave_up = high[searching] - low[searching] < stop_tolerance
+        searching = searching[~hit & ~gave_up]
+
+    return ShotBatch(distance, robot_speed, angles, speeds, distances, max_heights, impact_vx, impact_vy, found)
+
+def shot_costs(shots: ShotBatch, settings):
+    """trajectory.calculateCost for the found shots of a batch; NaN where no shot was found."""
+    resolved = simulation.resolve_settings(settings)
+    d_tangential = resolved["dtangential"]
+    d_radial = resolved["dradial"]
+    d_robot_speed = resolved["drobotspeed"]
+
+    costs = np.full(len(shots.angles), np.nan)
+    index = np.flatnonzero(shots.found)
+    if not len(index):
+        return costs
+
+    angles, speeds = shots.angles[index], shots.speeds[index]
+    shot_vx, shot_vy = np.cos(angles) * speeds, np.sin(angles) * speeds
+    radial_angles = angles + HALF_PI
+
+    # The three perturbed shots of calcDistanceDerivative, integrated as one batch
+    changed_vx = np.concatenate([
+        shot_vx + np.cos(angles) * d_tangential, shot_vx + np.cos(radial_angles) * d_radial, shot_vx,
+    ])
+    changed_vy = np.concatenate([
+        shot_vy + np.sin(angles) * d_tangential, shot_vy + np.sin(radial_angles) * d_radial, shot_vy,
+    ])
+    changed_robot_speed = np.concatenate([
+        np.full(2 * len(index), float(shots.robot_speed)), np.full(len(index), shots.robot_speed + d_robot_speed),
+    ])
+    changed_distance, _, changed_vx, changed_vy = calc_trajectories(
+        changed_vx, changed_vy, changed_robot_speed, resolved["targetheight"], np.inf, 0.0,
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = (changed_distance - np.tile(shots.distances[index], 3)) / np.arctan2(changed_vy, changed_vx)
+        tangential, radial, robot_speed = np.split(delta, 3)
+        tangential, radial, robot_speed = tangential / d_tangential, radial / d_radial, robot_speed / d_robot_speed
+        distance_derivative = np.sqrt(tangential * tangential + radial * radial + robot_speed * robot_speed)
+
+        speed_of_impact = np.hypot(shots.impact_vx[index], shots.impact_vy[index])
+        derivative_cost = np.hypot(speed_of_impact * resolved["impactvelocitycostweight"], distance_derivative)
+        max_heights = shots.max_heights[index]
+        max_height_cost = np.where(
+            max_heights < resolved["minheightformaxheightcost"], 0.0,
+            resolved["maxheightcostfactor"] * (max_heights - resolved["minheightformaxheightcost"]),
+        )
+        costs[index] = derivative_cost + max_height_cost
+    return costs
+
+def best_shot(shots: ShotBatch, costs):
+    """Index of the shot MinimizeCost picks (the first strictly cheapest), or None."""
+    finite = np.where(np.isnan(costs), np.inf, costs)
+    if not len(finite) or not np.isfinite(finite.min()):
+        return None
+    return int(np.argmin(finite))
+
+def preview_cell(distance, robot_speed, settings):
+    """
+    Simulates one (distance, robot speed) cell and returns its output row as
+    export.ExportData writes it, as float32 values in OUTPUT_COLUMNS order,
+    or None where the simulator finds no shot.
+    """
+    shots = find_shots(distance, robot_speed, settings)
+    best = best_shot(shots, shot_costs(shots, settings))
+    if best is None:
+        return None
+
+    resolved = simulation.resolve_settings(settings)
+    row_distance = _go_round(
+        _go_round((shots.distances[best] - resolved["mindistance"]) / resolved["deltadistance"], 0)
+        * resolved["deltadistance"] + resolved["mindistance"], 2,
+    )
+    row_robot_speed = _go_round(
+        _go_round((robot_speed + resolved["maxrobotspeed"]) / resolved["deltarobotspeed"], 0)
+        * resolved["deltarobotspeed"] - resolved["maxrobotspeed"], 2,
+    )
+    return np.array(
+        [row_distance, shots.speeds[best], row_robot_speed, shots.angles[best], shots.max_heights[best]],
+        dtype=np.float32,
+    )
+
+# Preview sweep: angles sampled down to at most this many, shot speeds sampled
+# on this many points before the brackets are refined
+PREVIEW_ANGLES = 91
+PREVIEW_SPEEDS = 24
+PREVIEW_REFINEMENTS = 6
+
+def shot_envelope(distance, settings, robot_speed=0.0):
+    """
+    Feasible shots at one sample distance, fast enough to follow settings edits.
+
+    Instead of one bisection per angle, a single batch integrates an angle x
+    speed grid under the simulator's target rules. Each angle's bracket around
+    the target distance is then refined by false position over a few batches,
+    and a shot counts as found once it lands within the distance tolerance.
+    Speeds agree with find_shots() to within the hit window, not bit for bit.
+    Returns (shots, best index or None); the speeds of shots.found angles
+    trace the envelope of shot speed over angle.
+    """
+    resolved = simulation.resolve_settings(settings)
+    target_height = resolved["targetheight"]
+    target_radius = resolved["targetradius"]
+    tolerance = resolved["distancetolerance"]
+
+    angles = angle_grid(settings)
+    angles = angles[::max(1, -(-len(angles) // PREVIEW_ANGLES))]
+    count = len(angles)
+    cos_angles, sin_angles = np.cos(angles), np.sin(angles)
+    sample_speeds = np.linspace(resolved["minspeed"], resolved["maxspeed"], PREVIEW_SPEEDS)
+
+    grid_distance, _, _, _ = calc_trajectories(
+        np.outer(cos_angles, sample_speeds).ravel(), np.outer(sin_angles, sample_speeds).ravel(),
+        robot_speed, target_height, distance, target_radius,
+    )
+    grid_distance = grid_distance.reshape(count, PREVIEW_SPEEDS)
+
+    # First sample pair where the shot goes from short of the target to not
+    # short, the same side test bisection steers by
+    crossing = (grid_distance[:, :-1] < distance) & (grid_distance[:, 1:] >= distance)
+    first = np.argmax(crossing, axis=1)
+    rows = np.arange(count)
+    low, high = sample_speeds[first], sample_speeds[first + 1]
+    low_distance, high_distance = grid_distance[rows, first], grid_distance[rows, first + 1]
+
+    shots = ShotBatch(
+        distance, robot_speed, angles, np.full(count, np.nan), np.full(count, np.nan),
+        np.full(count, np.nan), np.zeros(count), np.zeros(count), np.zeros(count, dtype=bool),
+    )
+    searching = np.flatnonzero(crossing.any(axis=1))
+    for _ in range(PREVIEW_REFINEMENTS):
+        if not len(searching):
+            break
+        lo, hi = low[searching], high[searching]
+        lo_distance, hi_distance = low_distance[searching], high_distance[searching]
+        # False position where both ends landed, bisection across the sentinels
+        landed = (lo_distance > 0) & (hi_distance < INF)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            interpolated = lo + (distance - lo_distance) * (hi - lo) / (hi_distance - lo_distance)
+        speed = np.where(landed & (interpolated > lo) & (interpolated < hi), interpolated, (lo + hi) / 2)
+
+        shot_distance, shot_height, shot_vx, shot_vy = calc_trajectories(
+            cos_angles[searching] * speed, sin_angles[searching] * speed,
+            robot_speed, target_height, distance, target_radius,
+        )
+        hit = np.abs(distance - shot_distance) <= tolerance
+        hits = searching[hit]
+        shots.speeds[hits] = speed[hit]
+        shots.distances[hits] = shot_distance[hit]
+        shots.max_heights[hits] = shot_height[hit]
+        shots.impact_vx[hits] = shot_vx[hit]
+        shots.impact_vy[hits] = shot_vy[hit]
+        shots.found[hits] = True
+
+        short = shot_distance < distance
+        low[searching] = np.where(short, speed, lo)
+        low_distance[searching] = np.where(short, shot_distance, lo_distance)
+        high[searching] = np.where(short, hi, speed)
+        high_distance[searching] = np.where(short, hi_distance, shot_distance)
+        searching = searching[~hit]
+
+    return shots, best_shot(shots, shot_costs(shots, settings))
+
+def check_parity(csv_path: Path, settings, max_cells=None):
+    """
+    Re-simulates the cells of a simulator output and compares the rows.
+
+    Returns a dict with the cells compared, the rows that match exactly, the
+    mismatching cells as (distance, robot speed, expected row, preview row)
+    and the largest speed and angle differences.
+    """
+    table = filemanagment.read_table(Path(csv_path))
+    expected = {}
+    if table is not None:
+        for row in table.columns.T:
+            expected[(simulation.cell_key(float(row[0])), simulation.cell_key(float(row[2])))] = row
+
+    cells = [
+        (distance, robot_speed)
+        for distance in simulation.distance_grid(settings)
+        for robot_speed in simulation.robot_speed_grid(settings)
+    ]
+    if max_cells is not None:
+        cells = cells[::max(1, len(cells) // max_cells)]
+
+    report = {"cells": 0, "matches": 0, "mismatches": [], "max_speed_error": 0.0, "max_angle_error": 0.0}
+    for distance, robot_speed in cells:
+        want = expected.get((simulation.cell_key(distance), simulation.cell_key(robot_speed)))
+        got = preview_cell(distance, robot_speed, settings)
+        report["cells"] += 1
+        if want is None and got is None:
+            report["matches"] += 1
+        elif want is None or got is None:
+            report["mismatches"].append((distance, robot_speed, want, got))
+        else:
+            report["max_speed_error"] = max(report["max_speed_error"], abs(float(got[1]) - float(want[1])))
+            report["max_angle_error"] = max(report["max_angle_error"], abs(float(got[3]) - float(want[3])))
+            if np.array_equal(got, want):
+                report["matches"] += 1
+            else:
+                report["mismatches"].append((distance, robot_speed, want, got))
+    return report
+
+def main(argv):
+    """
+    Parity check against simulator outputs:
+    python trajectory_preview.py [--max-cells N] [profile_id ...]
+
+    Checks every finished profile when no id is given and exits non-zero if
+    any re-simulated cell differs from the simulator's row.
+    """
+    max_cells = None
+    if len(argv) >= 2 and argv[0] == "--max-cells":
+        max_cells = int(argv[1])
+        argv = argv[2:]
+
+    catalog = filemanagment.get_catalog()
+    profile_ids = [int(arg) for arg in argv] or [i for i in catalog.ids() if catalog.row_count(i)]
+    failed = False
+    for profile_id in profile_ids:
+        csv_path = filemanagment.PROFILES_PATH / f"profile_{profile_id}" / "output.csv"
+        start = time.perf_counter()
+        report = check_parity(csv_path, catalog.settings(profile_id), max_cells)
+        elapsed = time.perf_counter() - start
+        print(
+            f"profile_{profile_id}: {report['matches']}/{report['cells']} cells match "
+            f"(max speed error {report['max_speed_error']:.3g}, max angle error {report['max_angle_error']:.3g}) "
+            f"in {elapsed:.2f}s"
+        )
+        for distance, robot_speed, want, got in report["mismatches"]:
+            print(f"  distance {distance:.2f}, robot speed {robot_speed:.2f}: simulator {want}, preview {got}")
+        failed |= bool(report["mismatches"])
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
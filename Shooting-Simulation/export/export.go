@@ -4,6 +4,8 @@ import (
 	"io/fs"
 	"os"
 	"path"
+	"strconv"
+	"time"
 
 	"golang.org/x/xerrors"
 	"shooting-simulator.com/shooting-simulator/constants"
@@ -19,16 +21,51 @@ type outputDataPoint struct {
 	MaxHeight  float32 `csv:"max-height"`
 }
 
+func toOutputDataPoint(point *trajectory.ShootingPoint) *outputDataPoint {
+	return &outputDataPoint{
+		Distance:   float32(utils.RoundToNearest(point.Distance, constants.DeltaDistance, constants.MinDistance)),
+		Speed:      float32(point.Speed),
+		RobotSpeed: float32(utils.RoundToNearest(point.RobotSpeed, constants.DeltaRobotSpeed, -constants.MaxRobotSpeed)),
+		Angle:      float32(point.Angle),
+		MaxHeight:  float32(point.MaxHeight),
+	}
+}
+
+// StreamPoint writes a single exported row to stdout as "row,<csv fields>",
+// so a reader of the progress output can show results while the sweep runs.
+func StreamPoint(point *trajectory.ShootingPoint) {
+	p := toOutputDataPoint(point)
+	fields := []float32{p.Distance, p.Speed, p.RobotSpeed, p.Angle, p.MaxHeight}
+
+	line := []byte("row")
+	for _, field := range fields {
+		line = append(line, ',')
+		line = strconv.AppendFloat(line, float64(field), 'g', -1, 32)
+	}
+	line = append(line, '\n')
+	os.Stdout.Write(line)
+}
+
+// StreamProgress writes a progress record to stdout as
+// "progress,<cells done>,<cells total>,<shots found>,<elapsed seconds>",
+// where a cell is one (distance, robot speed) point of the sweep grid.
+func StreamProgress(cellsDone, cellsTotal, shotsFound int, elapsed time.Duration) {
+	line := []byte("progress,")
+	line = strconv.AppendInt(line, int64(cellsDone), 10)
+	line = append(line, ',')
+	line = strconv.AppendInt(line, int64(cellsTotal), 10)
+	line = append(line, ',')
+	line = strconv.AppendInt(line, int64(shotsFound), 10)
+	line = append(line, ',')
+	line = strconv.AppendFloat(line, elapsed.Seconds(), 'f', 3, 64)
+	line = append(line, '\n')
+	os.Stdout.Write(line)
+}
+
 func ExportData(data []*trajectory.ShootingPoint, fileName string) error {
 	var out []*outputDataPoint
 	for _, point := range data {
-		out = append(out, &outputDataPoint{
-			Distance:   float32(utils.RoundToNearest(point.Distance, constants.DeltaDistance, constants.MinDistance)),
-			Speed:      float32(point.Speed),
-			RobotSpeed: float32(utils.RoundToNearest(point.RobotSpeed, constants.DeltaRobotSpeed, -constants.MaxRobotSpeed)),
-			Angle:      float32(point.Angle),
-			MaxHeight:  float32(point.MaxHeight),
-		})
+		out = append(out, toOutputDataPoint(point))
 	}
 
 	// Use the fileName as the full path, ensuring the directory exists.
@@ -0,0 +1,86 @@
+package export
+
+import (
+	"bufio"
+	"encoding/binary"
+	"io/fs"
+	"os"
+	"path"
+
+	"golang.org/x/xerrors"
+	"shooting-simulator.com/shooting-simulator/trajectory"
+)
+
+// trajectoryMagic starts a trajectories file, followed by:
+//
+//	uint32 number of trajectories, uint32 total number of points
+//	one trajectoryRecord per trajectory, in output CSV order
+//	every point as float32 x, y; a record's points are consecutive
+//
+// All values are little endian.
+var trajectoryMagic = [8]byte{'T', 'L', 'T', 'R', 'A', 'J', '0', '1'}
+
+type trajectoryRecord struct {
+	Distance   float32
+	RobotSpeed float32
+	Speed      float32
+	Angle      float32
+	Offset     uint32 // index of the first point
+	Length     uint32 // number of points
+}
+
+// ExportTrajectories writes the ball positions of every shot in compact binary form.
+func ExportTrajectories(data []*trajectory.ShootingPoint, fileName string) error {
+	if err := os.MkdirAll(path.Dir(fileName), fs.ModePerm); err != nil {
+		return xerrors.Errorf("error creating output directory: %w", err)
+	}
+
+	f, err := os.Create(fileName)
+	if err != nil {
+		return xerrors.Errorf("error creating file [%s]: %w", fileName, err)
+	}
+	defer f.Close()
+
+	records := make([]trajectoryRecord, 0, len(data))
+	pointCount := 0
+	for _, shot := range data {
+		p := toOutputDataPoint(shot)
+		records = append(records, trajectoryRecord{
+			Distance:   p.Distance,
+			RobotSpeed: p.RobotSpeed,
+			Speed:      p.Speed,
+			Angle:      p.Angle,
+			Offset:     uint32(pointCount),
+			Length:     uint32(len(shot.Trajectory)),
+		})
+		pointCount += len(shot.Trajectory)
+	}
+
+	w := bufio.NewWriter(f)
+	header := struct {
+		Magic  [8]byte
+		Count  uint32
+		Points uint32
+	}{trajectoryMagic, uint32(len(records)), uint32(pointCount)}
+	if err := binary.Write(w, binary.LittleEndian, header); err != nil {
+		return xerrors.Errorf("error writing file [%s]: %w", fileName, err)
+	}
+	if err := binary.Write(w, binary.LittleEndian, records); err != nil {
+		return xerrors.Errorf("error writing file [%s]: %w", fileName, err)
+	}
+
+	point := make([]float32, 2)
+	for _, shot := range data {
+		for _, position := range shot.Trajectory {
+			point[0], point[1] = float32(position.X), float32(position.Y)
+			if err := binary.Write(w, binary.LittleEndian, point); err != nil {
+				return xerrors.Errorf("error writing file [%s]: %w", fileName, err)
+			}
+		}
+	}
+
+	if err := w.Flush(); err != nil {
+		return xerrors.Errorf("error writing file [%s]: %w", fileName, err)
+	}
+	return nil
+}
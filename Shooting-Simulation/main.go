@@ -1,9 +1,12 @@
 package main
 
 import (
+	"bufio"
 	"encoding/json"
 	"fmt"
 	"os"
+	"strings"
+	"time"
 
 	"shooting-simulator.com/shooting-simulator/constants"
 	"shooting-simulator.com/shooting-simulator/export"
@@ -11,99 +14,238 @@ import (
 	"shooting-simulator.com/shooting-simulator/utils"
 )
 
-func main() {
-
-	// settings import
-	if len(os.Args) < 3 {
-		fmt.Println("Usage: program <config.json> <output_file.csv>")
-		return
+// settingTargets maps every key a settings file may set to the constant it overrides.
+// Keys are matched case-insensitively; any other key is ignored.
+func settingTargets() map[string]*float64 {
+	return map[string]*float64{
+		"targetheight":               &constants.TargetHeight,
+		"targetradius":               &constants.TargetRadius,
+		"distancetolerance":          &constants.DistanceTolerance,
+		"dtangential":                &constants.DTangential,
+		"dradial":                    &constants.DRadial,
+		"drobotspeed":                &constants.DRobotSpeed,
+		"minheightformaxheightcost":  &constants.MinHeightForMaxHeightCost,
+		"maxheightcostfactor":        &constants.MaxHeightCostFactor,
+		"mindistance":                &constants.MinDistance,
+		"maxdistance":                &constants.MaxDistance,
+		"deltadistance":              &constants.DeltaDistance,
+		"minangle":                   &constants.MinAngle,
+		"maxangle":                   &constants.MaxAngle,
+		"deltaangle":                 &constants.DeltaAngle,
+		"minspeed":                   &constants.MinSpeed,
+		"maxspeed":                   &constants.MaxSpeed,
+		"speedtolerancetostopsearch": &constants.SpeedToleranceToStopSearch,
+		"maxrobotspeed":              &constants.MaxRobotSpeed,
+		"deltarobotspeed":            &constants.DeltaRobotSpeed,
+		"impactvelocitycostweight":   &constants.ImpactVelocityCostWeight,
 	}
+}
 
-	configPath := os.Args[1]
-	outputPath := os.Args[2]
-
-	data, err := os.ReadFile(configPath)
-	if err != nil {
-		panic(err)
+// defaultSettings snapshots the current value of every setting, so a worker
+// can go back to the defaults between requests.
+func defaultSettings() map[string]float64 {
+	defaults := map[string]float64{}
+	for key, target := range settingTargets() {
+		defaults[key] = *target
 	}
+	return defaults
+}
 
-	// temporary struct with pointers
-	cfg := struct {
-		TargetHeight               *float64 `json:"targetheight"`
-		TargetRadius               *float64 `json:"targetradius"`
-		DistanceTolerance          *float64 `json:"distancetolerance"`
-		DTangential                *float64 `json:"dtangential"`
-		DRadial                    *float64 `json:"dradial"`
-		DRobotSpeed                *float64 `json:"drobotspeed"`
-		MinHeightForMaxHeightCost  *float64 `json:"minheightformaxheightcost"`
-		MaxHeightCostFactor        *float64 `json:"maxheightcostfactor"`
-		MinDistance                *float64 `json:"mindistance"`
-		MaxDistance                *float64 `json:"maxdistance"`
-		DeltaDistance              *float64 `json:"deltadistance"`
-		MinAngle                   *float64 `json:"minangle"`
-		MaxAngle                   *float64 `json:"maxangle"`
-		DeltaAngle                 *float64 `json:"deltaangle"`
-		MinSpeed                   *float64 `json:"minspeed"`
-		MaxSpeed                   *float64 `json:"maxspeed"`
-		SpeedToleranceToStopSearch *float64 `json:"speedtolerancetostopsearch"`
-		MaxRobotSpeed              *float64 `json:"maxrobotspeed"`
-		DeltaRobotSpeed            *float64 `json:"deltarobotspeed"`
-		ImpactVelocityCostWeight   *float64 `json:"impactvelocitycostweight"`
-	}{}
-
-	if err := json.Unmarshal(data, &cfg); err != nil {
-		panic(err)
+// applySettings resets every setting to its default, then overrides the ones
+// the JSON config provides a value for.
+func applySettings(data []byte, defaults map[string]float64) error {
+	targets := settingTargets()
+	for key, target := range targets {
+		*target = defaults[key]
+	}
+	if len(data) == 0 {
+		return nil
 	}
 
-	// helper function to override only if JSON provides value
-	override := func(ptr *float64, target *float64) {
-		if ptr != nil {
-			*target = *ptr
+	var values map[string]json.RawMessage
+	if err := json.Unmarshal(data, &values); err != nil {
+		return err
+	}
+	for key, raw := range values {
+		target, ok := targets[strings.ToLower(key)]
+		if !ok {
+			continue
+		}
+		// null keeps the default, as an absent key does
+		if err := json.Unmarshal(raw, target); err != nil {
+			return fmt.Errorf("setting %s: %w", key, err)
 		}
 	}
+	return nil
+}
 
-	override(cfg.TargetHeight, &constants.TargetHeight)
-	override(cfg.TargetRadius, &constants.TargetRadius)
-	override(cfg.DistanceTolerance, &constants.DistanceTolerance)
-	override(cfg.DTangential, &constants.DTangential)
-	override(cfg.DRadial, &constants.DRadial)
-	override(cfg.DRobotSpeed, &constants.DRobotSpeed)
-	override(cfg.MinHeightForMaxHeightCost, &constants.MinHeightForMaxHeightCost)
-	override(cfg.MaxHeightCostFactor, &constants.MaxHeightCostFactor)
-	override(cfg.MinDistance, &constants.MinDistance)
-	override(cfg.MaxDistance, &constants.MaxDistance)
-	override(cfg.DeltaDistance, &constants.DeltaDistance)
-	override(cfg.MinAngle, &constants.MinAngle)
-	override(cfg.MaxAngle, &constants.MaxAngle)
-	override(cfg.DeltaAngle, &constants.DeltaAngle)
-	override(cfg.MinSpeed, &constants.MinSpeed)
-	override(cfg.MaxSpeed, &constants.MaxSpeed)
-	override(cfg.SpeedToleranceToStopSearch, &constants.SpeedToleranceToStopSearch)
-	override(cfg.MaxRobotSpeed, &constants.MaxRobotSpeed)
-	override(cfg.DeltaRobotSpeed, &constants.DeltaRobotSpeed)
-	override(cfg.ImpactVelocityCostWeight, &constants.ImpactVelocityCostWeight)
-
-	// main program
+// sweep finds the minimum cost shot of every (distance, robot speed) cell of
+// the grid. With streamRows it prints each row and a progress record per cell,
+// otherwise a percentage per distance.
+func sweep(streamRows bool) []*trajectory.ShootingPoint {
 	var minCostShots []*trajectory.ShootingPoint
 
+	// The grid is counted with the same float accumulation as the sweep below
+	cellsTotal := 0
+	for distanceToTarget := constants.MinDistance; distanceToTarget <= constants.MaxDistance; distanceToTarget += constants.DeltaDistance {
+		for robotSpeed := -constants.MaxRobotSpeed; robotSpeed <= constants.MaxRobotSpeed; robotSpeed += constants.DeltaRobotSpeed {
+			cellsTotal++
+		}
+	}
+	cellsDone := 0
+	start := time.Now()
+
 	for distanceToTarget := constants.MinDistance; distanceToTarget <= constants.MaxDistance; distanceToTarget += constants.DeltaDistance {
 
-		percentageOfCalculation := 100 * (distanceToTarget - constants.MinDistance) / (constants.MaxDistance - constants.MinDistance)
-		fmt.Println(utils.RoundToDecimal(percentageOfCalculation, 2), "%")
+		if !streamRows {
+			percentageOfCalculation := 100 * (distanceToTarget - constants.MinDistance) / (constants.MaxDistance - constants.MinDistance)
+			fmt.Println(utils.RoundToDecimal(percentageOfCalculation, 2), "%")
+		}
 
 		for robotSpeed := -constants.MaxRobotSpeed; robotSpeed <= constants.MaxRobotSpeed; robotSpeed += constants.DeltaRobotSpeed {
 			shotsOnTarget := trajectory.FindShotsOnTarget(distanceToTarget, robotSpeed)
+			cellsDone++
+
+			if len(shotsOnTarget) > 0 {
+				minCostShot := trajectory.MinimizeCost(shotsOnTarget)
+				minCostShots = append(minCostShots, minCostShot)
+
+				if streamRows {
+					export.StreamPoint(minCostShot)
+				}
+			}
 
-			if len(shotsOnTarget) == 0 {
-				continue
+			if streamRows {
+				export.StreamProgress(cellsDone, cellsTotal, len(minCostShots), time.Since(start))
 			}
+		}
+	}
+	return minCostShots
+}
+
+// workerRequest is one line of a --serve worker's stdin. A ping only asks the
+// worker to answer; otherwise Settings is run like a settings file, and the
+// rows are written to Output and the trajectories to Trajectories when set.
+type workerRequest struct {
+	ID           int64           `json:"id"`
+	Ping         bool            `json:"ping"`
+	Settings     json.RawMessage `json:"settings"`
+	Output       string          `json:"output"`
+	Trajectories string          `json:"trajectories"`
+}
+
+// runRequest runs one worker request, turning a panic of the sweep or the
+// export into an error, so one bad request doesn't take the worker down.
+func runRequest(request workerRequest, defaults map[string]float64) (rows int, err error) {
+	defer func() {
+		if r := recover(); r != nil {
+			err = fmt.Errorf("%v", r)
+		}
+	}()
+	if err := applySettings(request.Settings, defaults); err != nil {
+		return 0, err
+	}
+	minCostShots := sweep(true)
+	if request.Output != "" {
+		if err := export.ExportData(minCostShots, request.Output); err != nil {
+			return 0, err
+		}
+	}
+	if request.Trajectories != "" {
+		if err := export.ExportTrajectories(minCostShots, request.Trajectories); err != nil {
+			return 0, err
+		}
+	}
+	return len(minCostShots), nil
+}
+
+// serve runs requests read from stdin, one JSON object per line, until stdin
+// closes. A ping is answered with "pong,<id>". A run streams its rows and
+// progress as --stream does and ends with "done,<id>,<rows>,<elapsed seconds>",
+// or with "error,<id>,<message>" if it failed.
+func serve() {
+	defaults := defaultSettings()
+	scanner := bufio.NewScanner(os.Stdin)
+	scanner.Buffer(make([]byte, 64*1024), 16*1024*1024)
+	for scanner.Scan() {
+		line := strings.TrimSpace(scanner.Text())
+		if line == "" {
+			continue
+		}
+		var request workerRequest
+		if err := json.Unmarshal([]byte(line), &request); err != nil {
+			fmt.Printf("error,-1,%s\n", oneLine(err))
+			continue
+		}
+		if request.Ping {
+			fmt.Printf("pong,%d\n", request.ID)
+			continue
+		}
+
+		start := time.Now()
+		rows, err := runRequest(request, defaults)
+		if err != nil {
+			fmt.Printf("error,%d,%s\n", request.ID, oneLine(err))
+			continue
+		}
+		fmt.Printf("done,%d,%d,%.3f\n", request.ID, rows, time.Since(start).Seconds())
+	}
+}
+
+// oneLine keeps an error message on a single line of the framed output.
+func oneLine(err error) string {
+	return strings.ReplaceAll(err.Error(), "\n", " ")
+}
+
+func main() {
+
+	if len(os.Args) == 2 && os.Args[1] == "--serve" {
+		serve()
+		return
+	}
 
-			minCostShot := trajectory.MinimizeCost(shotsOnTarget)
-			minCostShots = append(minCostShots, minCostShot)
+	// settings import
+	if len(os.Args) < 3 {
+		fmt.Println("Usage: program <config.json> <output_file.csv> [--stream] [--trajectories <file.bin>]")
+		fmt.Println("       program --serve")
+		fmt.Println("  --stream prints each exported row and a progress record per grid cell instead of percentages")
+		fmt.Println("  --serve runs settings read from stdin, one JSON request per line, until stdin closes")
+		return
+	}
+
+	configPath := os.Args[1]
+	outputPath := os.Args[2]
+	streamRows := false
+	trajectoriesPath := ""
+	for i := 3; i < len(os.Args); i++ {
+		switch os.Args[i] {
+		case "--stream":
+			streamRows = true
+		case "--trajectories":
+			if i+1 < len(os.Args) {
+				i++
+				trajectoriesPath = os.Args[i]
+			}
 		}
 	}
 
+	data, err := os.ReadFile(configPath)
+	if err != nil {
+		panic(err)
+	}
+	if err := applySettings(data, defaultSettings()); err != nil {
+		panic(err)
+	}
+
+	// main program
+	minCostShots := sweep(streamRows)
+
 	export.ExportData(minCostShots, outputPath)
+	if trajectoriesPath != "" {
+		if err := export.ExportTrajectories(minCostShots, trajectoriesPath); err != nil {
+			panic(err)
+		}
+	}
 	// fmt.Println("complete")
 	// generateGraph(minCostShots)
 	// http.ListenAndServe(":8081", nil)